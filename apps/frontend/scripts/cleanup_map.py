@@ -1,262 +1,1713 @@
+"""
+Turn the downtown .blend into game-ready GLBs, colliders, navmesh and PVS.
+
+Usage:
+  blender --background --python cleanup_map.py -- <map.blend> <output_dir> [--jobs N] [--force]
+
+Options:
+  --jobs N   Process tiles in N background Blender workers (0 = one per core,
+             less one for the main process, which bakes colliders, navmesh
+             and PVS meanwhile). Worker shard, log and profile files go in
+             .cache/workers/, not the published tiles/.
+             Writes tiles/tile_<x>_<y>.glb instead of a single downtown.glb,
+             plus scene.glb holding the SpawnPoint node.
+             Reruns are incremental: only tiles, buildings and navmesh tiles
+             whose content hash changed are rebuilt (cached in .cache/).
+  --force    Ignore the cache and rebuild everything.
+
+The cache is only used by the --jobs pipeline; a serial run (no --jobs)
+always rebuilds everything. In --jobs mode the horizontal recenter offset is
+snapped to the tile grid, so edits that nudge the map's bounds keep the same
+offset and tile grid; a change in the map's lowest point still shifts every
+height and rebakes the navmesh.
+
+Every stage is timed: profile.json (wall/CPU time, peak RSS, mesh counts)
+and profile.trace.json (load in chrome://tracing) are written next to
+manifest.json.
+"""
+
 import bpy
 import bmesh
 import os
 import sys
+import subprocess
+import math
+import shutil
+import struct
+import numpy as np
 from mathutils import Vector
+from mathutils.bvhtree import BVHTree
 import json
+import base64
+import hashlib
+import time
+import functools
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
 
 # Configuration
 DECIMATE_RATIO = 0.5  # 50% poly reduction for LOD0
-MAX_BUILDING_COLLIDERS = 100
+MIN_COLLIDER_EXTENT = 1.0  # Skip building slivers thinner than this on any axis (meters)
+MAX_COLLIDER_VERTS = 32  # Per-collider vertex budget for convex hulls
+OBB_FILL_RATIO = 0.85  # Use a box when the hull fills at least this much of its OBB
+CONCAVITY_GAIN = 0.15  # Split a part when its halves' hulls are this much smaller in total
+MAX_DECOMPOSITION_DEPTH = 3  # Up to 2**depth convex parts per building
+BVH_LEAF_SIZE = 4
+BROADPHASE_MAGIC = b"PTBV"
+BROADPHASE_VERSION = 1
+NAV_CELL_SIZE = 0.5  # Voxel column width (meters)
+NAV_HEIGHT_STEP = 0.1  # Cells whose walkable heights quantize equal merge into one polygon
+NAV_TILE_SIZE = 32.0  # Navmesh tile edge (meters), the unit the client loads lazily
+AGENT_RADIUS = 0.4
+AGENT_HEIGHT = 1.8
+AGENT_MAX_CLIMB = 0.4  # Largest step between neighbouring cells
+AGENT_MAX_SLOPE = 45.0  # Degrees
+NAVMESH_MAGIC = b"PTNM"
+NAVMESH_VERSION = 1
+PVS_MAX_DISTANCE = 600.0  # Tiles farther apart than this are never marked visible (meters)
+PVS_VIEW_SAMPLES = 3  # Viewpoints per tile axis, at street level
+PVS_TARGET_SAMPLES = 3  # Target points per tile axis, at two heights
+PVS_EYE_HEIGHT = 1.7
+PVS_TARGET_MARGIN = 1.0  # Hits this close to a target count as seeing it
+TILE_SIZE = 64.0  # Spatial tile edge (meters) used to group static meshes
+OBJECT_ID_ATTRIBUTE = "_object_id"  # Exported as a custom glTF vertex attribute
 
-args = sys.argv[sys.argv.index('--') + 1:]
-blend_path = args[0]
-output_dir = args[1]
 
-print(f"\n{'='*70}")
-print("GAME-READY MAP CLEANUP")
-print(f"{'='*70}")
-print(f"Input: {blend_path}")
-print(f"Output: {output_dir}")
+def tile_of(obj):
+    """Return the (x, y) tile index containing the object's bounds center"""
+    bbox = [obj.matrix_world @ Vector(corner) for corner in obj.bound_box]
+    cx = sum(v.x for v in bbox) / len(bbox)
+    cy = sum(v.y for v in bbox) / len(bbox)
+    return (math.floor(cx / TILE_SIZE), math.floor(cy / TILE_SIZE))
 
-os.makedirs(output_dir, exist_ok=True)
 
-bpy.ops.wm.read_factory_settings(use_empty=True)
-bpy.ops.wm.open_mainfile(filepath=blend_path)
+def is_static(obj):
+    """Static meshes can be baked together without breaking animation or skinning"""
+    if obj.animation_data is not None:
+        return False
+    if obj.parent is not None and obj.parent.type == 'ARMATURE':
+        return False
+    if any(mod.type == 'ARMATURE' for mod in obj.modifiers):
+        return False
+    return obj.data is not None and obj.data.shape_keys is None
 
-meshes = [obj for obj in bpy.data.objects if obj.type == 'MESH']
-print(f"\nLoaded {len(meshes)} meshes")
 
-# ============================================================
-# STEP 1: SCALE CHECK
-# ============================================================
-print("\n[1/8] CHECKING SCALE...")
+def draw_calls(obj):
+    """Each material slot becomes its own glTF primitive, i.e. one draw call"""
+    return max(1, len(obj.material_slots))
 
-buildings = [obj for obj in meshes if 'building' in obj.name.lower()]
-if buildings:
-    heights = []
-    for obj in buildings[:20]:
-        bbox = [obj.matrix_world @ Vector(corner) for corner in obj.bound_box]
-        h = max(v.z for v in bbox) - min(v.z for v in bbox)
-        heights.append(h)
-    print(f"  Sample building heights: {min(heights):.0f}m - {max(heights):.0f}m")
-    print(f"  Scale appears correct (1 unit = 1 meter)")
 
-# ============================================================
-# STEP 2: RECENTER
-# ============================================================
-print("\n[2/8] RECENTERING TO ORIGIN...")
+def merge_static_meshes(objects):
+    """Join static meshes that share a material set within each tile.
+
+    Every vertex is tagged with OBJECT_ID_ATTRIBUTE, an index into the merged
+    object's "objects" custom property (exported as glTF extras), so the
+    client can still resolve a picked triangle back to its source object.
+    """
+    groups = {}
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    for obj in objects:
+        if not is_static(obj):
+            continue
+        if obj.modifiers:
+            # join() keeps only the target's modifier stack, so bake each
+            # object's own modifiers into its mesh before grouping
+            obj.data = bpy.data.meshes.new_from_object(obj.evaluated_get(depsgraph), preserve_all_data_layers=True, depsgraph=depsgraph)
+            obj.modifiers.clear()
+        materials = tuple(slot.material.name if slot.material else "" for slot in obj.material_slots)
+        groups.setdefault((tile_of(obj), materials), []).append(obj)
 
-all_verts = []
-for obj in meshes:
-    if obj.data and hasattr(obj.data, 'vertices'):
-        for v in obj.data.vertices:
-            all_verts.append(obj.matrix_world @ v.co)
+    merged = []
+    for ((tx, ty), materials), group in groups.items():
+        if len(group) < 2:
+            continue
 
-min_x = min(v.x for v in all_verts)
-max_x = max(v.x for v in all_verts)
-min_y = min(v.y for v in all_verts)
-max_y = max(v.y for v in all_verts)
-min_z = min(v.z for v in all_verts)
+        names = [obj.name for obj in group]
+        for index, obj in enumerate(group):
+            # Linked duplicates share mesh data; give each its own copy to tag
+            if obj.data.users > 1:
+                obj.data = obj.data.copy()
+            attr = obj.data.attributes.get(OBJECT_ID_ATTRIBUTE)
+            if attr is None:
+                attr = obj.data.attributes.new(OBJECT_ID_ATTRIBUTE, 'FLOAT', 'POINT')
+            attr.data.foreach_set("value", [float(index)] * len(obj.data.vertices))
 
-center_x = (min_x + max_x) / 2
-center_y = (min_y + max_y) / 2
+        target = group[0]
+        with bpy.context.temp_override(active_object=target, selected_editable_objects=group):
+            bpy.ops.object.join()
 
-for obj in bpy.data.objects:
-    obj.location.x -= center_x
-    obj.location.y -= center_y
-    obj.location.z -= min_z
+        target.name = f"Merged_{tx}_{ty}_{len(merged)}"
+        target["tile"] = [tx, ty]
+        target["objects"] = names
+        merged.append(target)
 
-width = max_x - min_x
-depth = max_y - min_y
-print(f"  Map size: {width:.0f} x {depth:.0f} meters")
-print(f"  Centered at origin, ground at Z=0")
+        if len(merged) % 100 == 0:
+            print(f"  Merged {len(merged)} groups...")
 
-# ============================================================
-# STEP 3: REMOVE HIDDEN GEOMETRY
-# ============================================================
-print("\n[3/8] REMOVING HIDDEN GEOMETRY...")
+    return merged
 
-removed_faces = 0
-processed = 0
 
-for obj in meshes:
-    if obj.data is None:
-        continue
+BOX_FACES = [(3, 2, 1, 0), (4, 5, 6, 7), (0, 1, 5, 4), (1, 2, 6, 5), (2, 3, 7, 6), (3, 0, 4, 7)]
 
+
+def world_segments(obj):
+    """Mesh edges as world-space segments, shape (E, 2, 3)"""
+    mesh = obj.data
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", co)
+    matrix = np.array(obj.matrix_world)
+    co = co.reshape(-1, 3).astype(np.float64) @ matrix[:3, :3].T + matrix[:3, 3]
+    edges = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+    mesh.edges.foreach_get("vertices", edges)
+    return co[edges.reshape(-1, 2)]
+
+
+def segment_points(segments):
+    """Unique segment endpoints, rounded to the millimeter"""
+    return np.unique(np.round(segments.reshape(-1, 3), 3), axis=0)
+
+
+def convex_hull(points):
+    """Return (verts, faces, volume) of the convex hull of an (N, 3) point array"""
     bm = bmesh.new()
-    bm.from_mesh(obj.data)
+    for p in points:
+        bm.verts.new(p)
+    result = bmesh.ops.convex_hull(bm, input=bm.verts)
+    unused = [g for g in result["geom_interior"] + result["geom_unused"] if isinstance(g, bmesh.types.BMVert)]
+    bmesh.ops.delete(bm, geom=unused, context='VERTS')
+    bm.verts.index_update()
+    verts = np.array([v.co[:] for v in bm.verts])
+    faces = [tuple(v.index for v in f.verts) for f in bm.faces]
+    volume = abs(bm.calc_volume())
+    bm.free()
+    return verts, faces, volume
+
+
+def footprint_hull(xy):
+    """2D convex hull of XY points (monotone chain), counter-clockwise"""
+    pts = sorted(set(map(tuple, np.round(xy, 4))))
+    if len(pts) < 3:
+        return np.array(pts)
+
+    def cross(o, a, b):
+        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+    lower, upper = [], []
+    for p in pts:
+        while len(lower) >= 2 and cross(lower[-2], lower[-1], p) <= 0:
+            lower.pop()
+        lower.append(p)
+    for p in reversed(pts):
+        while len(upper) >= 2 and cross(upper[-2], upper[-1], p) <= 0:
+            upper.pop()
+        upper.append(p)
+    return np.array(lower[:-1] + upper[:-1])
+
+
+def upright_obb(points):
+    """Z-aligned oriented box from the minimum-area footprint rectangle.
+
+    Returns (corners, volume, long_axis), long_axis being the unit XY
+    direction of the footprint's longest side.
+    """
+    hull2d = footprint_hull(points[:, :2])
+    edges = np.roll(hull2d, -1, axis=0) - hull2d
+    best = None
+    for angle in np.unique(np.mod(np.arctan2(edges[:, 1], edges[:, 0]), np.pi / 2)):
+        c, s = math.cos(angle), math.sin(angle)
+        rot = np.array([[c, s], [-s, c]])
+        local = hull2d @ rot.T
+        lo, hi = local.min(axis=0), local.max(axis=0)
+        area = float(np.prod(hi - lo))
+        if best is None or area < best[0]:
+            best = (area, rot, lo, hi)
+
+    area, rot, lo, hi = best
+    zmin, zmax = points[:, 2].min(), points[:, 2].max()
+    rect = np.array([[lo[0], lo[1]], [hi[0], lo[1]], [hi[0], hi[1]], [lo[0], hi[1]]]) @ rot
+    corners = np.vstack([np.column_stack([rect, np.full(4, zmin)]),
+                         np.column_stack([rect, np.full(4, zmax)])])
+    size = hi - lo
+    long_axis = rot[0] if size[0] >= size[1] else rot[1]
+    return corners, area * (zmax - zmin), long_axis
+
+
+def split_segments(segments, normal, offset):
+    """Split segments by the plane normal . p = offset, clipping those that cross it"""
+    d = segments @ normal - offset
+    below = (d <= 0).all(axis=1)
+    above = (d >= 0).all(axis=1)
+    crossing = ~(below | above)
+
+    a, b = segments[crossing, 0], segments[crossing, 1]
+    da, db = d[crossing, 0], d[crossing, 1]
+    cut = a + (da / (da - db))[:, None] * (b - a)
+    a_below = (da < 0)[:, None]
+    low_end = np.where(a_below, a, b)
+    high_end = np.where(a_below, b, a)
 
-    faces_to_remove = []
-    for face in bm.faces:
-        # Underground faces (pointing down)
-        if face.normal.z < -0.95:
-            faces_to_remove.append(face)
+    left = np.concatenate([segments[below], np.stack([low_end, cut], axis=1)])
+    right = np.concatenate([segments[above], np.stack([cut, high_end], axis=1)])
+    return left, right
+
+
+def decompose(segments, depth=0):
+    """Approximate convex decomposition by recursive footprint splits.
+
+    A part is halved across its footprint's long axis while the halves'
+    hulls are at least CONCAVITY_GAIN smaller than the part's own hull,
+    which separates L, U and courtyard footprints but leaves boxes whole.
+    """
+    points = segment_points(segments)
+    if depth >= MAX_DECOMPOSITION_DEPTH or len(points) < 8:
+        return [points]
+
+    _, _, volume = convex_hull(points)
+    _, _, long_axis = upright_obb(points)
+    normal = np.array([long_axis[0], long_axis[1], 0.0])
+    proj = points @ normal
+    left, right = split_segments(segments, normal, (proj.min() + proj.max()) / 2)
+    if len(left) < 4 or len(right) < 4:
+        return [points]
+
+    split_volume = convex_hull(segment_points(left))[2] + convex_hull(segment_points(right))[2]
+    if split_volume > (1 - CONCAVITY_GAIN) * volume:
+        return [points]
+    return decompose(left, depth + 1) + decompose(right, depth + 1)
+
+
+def support_points(points, count):
+    """Extreme points along `count` evenly spread directions (k-DOP style reduction)"""
+    i = np.arange(count) + 0.5
+    phi = np.arccos(1 - 2 * i / count)
+    theta = math.pi * (1 + 5 ** 0.5) * i
+    dirs = np.column_stack([np.cos(theta) * np.sin(phi), np.sin(theta) * np.sin(phi), np.cos(phi)])
+    return points[np.unique(np.argmax(points @ dirs.T, axis=0))]
+
+
+def collider_shape(points):
+    """Pick the cheapest fitting shape: an OBB if the hull nearly fills it, else a budgeted hull"""
+    verts, faces, volume = convex_hull(points)
+    corners, box_volume, _ = upright_obb(verts)
+    if box_volume <= 0 or volume >= OBB_FILL_RATIO * box_volume:
+        return "box", corners, BOX_FACES
+    if len(verts) > MAX_COLLIDER_VERTS:
+        verts, faces, _ = convex_hull(support_points(verts, MAX_COLLIDER_VERTS))
+    return "hull", verts, faces
+
+
+def create_collider(name, kind, verts, faces):
+    mesh = bpy.data.meshes.new(name)
+    mesh.from_pydata([tuple(v) for v in verts], [], faces)
+    mesh.update()
+    col = bpy.data.objects.new(name, mesh)
+    bpy.context.collection.objects.link(col)
+    col["collider"] = kind
+    return col
+
+
+def build_bvh(mins, maxs):
+    """Median-split BVH over AABBs, flattened in depth-first order.
+
+    Nodes are (min, max, a, count). Leaves have count > 0 and `a` is the
+    first slot in the returned leaf order; interior nodes have count == 0,
+    their left child at node + 1 and their right child at `a`.
+    """
+    centers = (mins + maxs) / 2
+    nodes = []
+    order = []
+
+    def build(indices):
+        node = len(nodes)
+        nodes.append(None)
+        lo, hi = mins[indices].min(axis=0), maxs[indices].max(axis=0)
+        if len(indices) <= BVH_LEAF_SIZE:
+            nodes[node] = (lo, hi, len(order), len(indices))
+            order.extend(int(i) for i in indices)
+            return node
+        spread = centers[indices].max(axis=0) - centers[indices].min(axis=0)
+        indices = indices[np.argsort(centers[indices, int(np.argmax(spread))], kind='stable')]
+        mid = len(indices) // 2
+        build(indices[:mid])
+        right = build(indices[mid:])
+        nodes[node] = (lo, hi, right, 0)
+        return node
+
+    if len(mins):
+        build(np.arange(len(mins)))
+    return nodes, order
+
+
+def write_broadphase(path, colliders):
+    """Write collider bounds and their BVH as a single little-endian file.
+
+    Coordinates are glTF/three.js Y-up, i.e. Blender (x, y, z) -> (x, z, -y).
+
+      header  4s magic, u32 version, u32 node_count, u32 collider_count
+      nodes   node_count x (6 f32 min/max, u32 a, u32 count)
+      order   collider_count x u32 collider index, referenced by leaves
+      bounds  collider_count x 6 f32 min/max
+      names   collider_count x (u16 byte length, utf-8 glTF node name)
+    """
+    mins, maxs = [], []
+    for col in colliders:
+        co = np.array([col.matrix_world @ v.co for v in col.data.vertices])
+        gltf = co[:, [0, 2, 1]] * np.array([1.0, 1.0, -1.0])
+        mins.append(gltf.min(axis=0))
+        maxs.append(gltf.max(axis=0))
+    mins, maxs = np.array(mins), np.array(maxs)
+    nodes, order = build_bvh(mins, maxs)
+
+    with open(path, 'wb') as f:
+        f.write(struct.pack('<4sIII', BROADPHASE_MAGIC, BROADPHASE_VERSION, len(nodes), len(colliders)))
+        for lo, hi, a, count in nodes:
+            f.write(struct.pack('<6fII', *lo, *hi, a, count))
+        f.write(struct.pack(f'<{len(order)}I', *order))
+        for lo, hi in zip(mins, maxs):
+            f.write(struct.pack('<6f', *lo, *hi))
+        for col in colliders:
+            name = col.name.encode('utf-8')
+            f.write(struct.pack('<H', len(name)) + name)
+
+    return len(nodes)
+
+
+def collider_planes(col):
+    """Outward face planes of a convex collider in world space: (normals (F, 3), offsets (F,))"""
+    matrix = col.matrix_world
+    normal_matrix = matrix.to_3x3().inverted_safe().transposed()
+    co = np.array([matrix @ v.co for v in col.data.vertices])
+    centroid = co.mean(axis=0)
+    normals, offsets = [], []
+    for poly in col.data.polygons:
+        n = np.array(normal_matrix @ poly.normal)
+        length = np.linalg.norm(n)
+        if length < 1e-9:
             continue
-        # Below ground level
-        avg_z = sum((obj.matrix_world @ v.co).z for v in face.verts) / len(face.verts)
-        if avg_z < -2:
-            faces_to_remove.append(face)
+        n /= length
+        d = n @ co[poly.vertices[0]]
+        if n @ centroid > d:
+            n, d = -n, -d
+        normals.append(n)
+        offsets.append(d)
+    return np.array(normals), np.array(offsets)
 
-    for face in faces_to_remove:
-        bm.faces.remove(face)
-        removed_faces += 1
 
-    bm.to_mesh(obj.data)
-    bm.free()
+def column_spans(normals, offsets, x, y):
+    """Vertical extent of a convex collider over grid columns.
 
-    processed += 1
-    if processed % 500 == 0:
-        print(f"  Processed {processed}/{len(meshes)} meshes...")
+    Returns (low, high, top_nz) arrays shaped like x; columns that miss the
+    collider have low = +inf. top_nz is the Z component of the face that
+    bounds the column from above, used for the walkable slope test.
+    """
+    rhs = offsets[:, None, None] - normals[:, 0, None, None] * x - normals[:, 1, None, None] * y
+    nz = normals[:, 2]
+    up, down = nz > 1e-6, nz < -1e-6
+    side = ~(up | down)
 
-print(f"  Removed {removed_faces} hidden faces")
+    inside = np.ones(x.shape, dtype=bool)
+    if side.any():
+        inside &= (rhs[side] >= -1e-6).all(axis=0)
+    if not up.any() or not down.any():
+        return np.full(x.shape, np.inf), np.full(x.shape, -np.inf), np.zeros(x.shape)
 
-# ============================================================
-# STEP 4: DECIMATE (LOD0)
-# ============================================================
-print("\n[4/8] DECIMATING MESHES...")
+    upper = rhs[up] / nz[up, None, None]
+    high = upper.min(axis=0)
+    top_nz = nz[up][upper.argmin(axis=0)]
+    low = (rhs[down] / nz[down, None, None]).max(axis=0)
 
-tris_before = sum(len(obj.data.polygons) for obj in meshes if obj.data)
-print(f"  Starting triangles: {tris_before:,}")
+    miss = ~inside | (low >= high)
+    return np.where(miss, np.inf, low), np.where(miss, -np.inf, high), top_nz
 
-decimated = 0
-for obj in meshes:
-    if obj.data is None or len(obj.data.polygons) < 50:
-        continue
 
-    bpy.ops.object.select_all(action='DESELECT')
-    obj.select_set(True)
-    bpy.context.view_layer.objects.active = obj
+def shifted(a, dy, dx, fill):
+    """a shifted by (dy, dx) with vacated cells set to fill"""
+    out = np.full_like(a, fill)
+    h, w = a.shape
+    out[max(dy, 0):h + min(dy, 0), max(dx, 0):w + min(dx, 0)] = \
+        a[max(-dy, 0):h + min(-dy, 0), max(-dx, 0):w + min(-dx, 0)]
+    return out
+
+
+def walkable_heights(tx, ty, solids, ground_z):
+    """Lowest walkable surface per cell of a navmesh tile (NaN where blocked).
+
+    The tile is voxelized as solid spans per column: the ground plus every
+    collider overlapping the tile. A span top is walkable when its slope is
+    within AGENT_MAX_SLOPE and no span intrudes into the AGENT_HEIGHT above
+    it; the lowest such surface is kept, so this is the street-level layer.
+    Cells are then eroded by AGENT_RADIUS, treating steps above
+    AGENT_MAX_CLIMB as walls. A margin is baked around the tile so erosion
+    is seamless across tile borders.
+    """
+    cells = int(round(NAV_TILE_SIZE / NAV_CELL_SIZE))
+    radius = int(math.ceil(AGENT_RADIUS / NAV_CELL_SIZE))
+    margin = radius + 1
+    offsets = (np.arange(-margin, cells + margin) + 0.5) * NAV_CELL_SIZE
+    x, y = np.meshgrid(tx * NAV_TILE_SIZE + offsets, ty * NAV_TILE_SIZE + offsets)
+    lo_xy = np.array([x.min(), y.min()])
+    hi_xy = np.array([x.max(), y.max()])
+
+    lows, highs, slopes_ok = [], [], []
+    min_nz = math.cos(math.radians(AGENT_MAX_SLOPE))
+    for normals, plane_offsets, bmin, bmax in solids:
+        if (bmax[:2] < lo_xy).any() or (bmin[:2] > hi_xy).any():
+            continue
+        low, high, top_nz = column_spans(normals, plane_offsets, x, y)
+        lows.append(low)
+        highs.append(high)
+        slopes_ok.append(top_nz >= min_nz)
+
+    surfaces = [np.full(x.shape, ground_z)] + highs
+    candidates_ok = [np.ones(x.shape, dtype=bool)] + [ok & np.isfinite(h) for ok, h in zip(slopes_ok, highs)]
+    heights = np.full(x.shape, np.inf)
+    for surface, ok in zip(surfaces, candidates_ok):
+        for low, high in zip(lows, highs):
+            ok = ok & ~((low < surface + AGENT_HEIGHT) & (high > surface + 0.01))
+        heights = np.where(ok & (surface < heights), surface, heights)
 
-    mod = obj.modifiers.new(name="Decimate", type='DECIMATE')
-    mod.ratio = DECIMATE_RATIO
-    bpy.ops.object.modifier_apply(modifier=mod.name)
-    decimated += 1
+    walkable = np.isfinite(heights)
+    for _ in range(radius):
+        eroded = walkable.copy()
+        for dy, dx in ((0, 1), (0, -1), (1, 0), (-1, 0)):
+            neighbour_ok = shifted(walkable, dy, dx, False)
+            neighbour_h = shifted(heights, dy, dx, np.inf)
+            eroded &= neighbour_ok & (np.abs(heights - neighbour_h) <= AGENT_MAX_CLIMB)
+        walkable = eroded
 
-    if decimated % 500 == 0:
-        print(f"  Decimated {decimated} meshes...")
+    heights = np.where(walkable, heights, np.nan)
+    return heights[margin:margin + cells, margin:margin + cells]
+
+
+def merge_rectangles(heights):
+    """Merge cells with equal quantized height into rectangles.
+
+    Equal runs in each row are extended downward while the next row has the
+    identical run. Returns a list of [x0, y0, x1, y1, level] in cell units
+    (x1/y1 exclusive, level in NAV_HEIGHT_STEP units).
+    """
+    levels = np.where(np.isnan(heights), np.iinfo(np.int32).min,
+                      np.round(np.nan_to_num(heights) / NAV_HEIGHT_STEP)).astype(np.int64)
+    blocked = np.iinfo(np.int32).min
+    rects = []
+    open_runs = {}
+    for row in range(levels.shape[0]):
+        line = levels[row]
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(line)) + 1])
+        ends = np.concatenate([starts[1:], [len(line)]])
+        next_runs = {}
+        for x0, x1 in zip(starts, ends):
+            level = int(line[x0])
+            if level == blocked:
+                continue
+            run = (int(x0), int(x1), level)
+            if run in open_runs:
+                index = open_runs[run]
+                rects[index][3] = row + 1
+            else:
+                index = len(rects)
+                rects.append([run[0], row, run[1], row + 1, level])
+            next_runs[run] = index
+        open_runs = next_runs
+    return rects
+
+
+def rectangle_links(rects):
+    """Pairs of rectangles sharing an edge whose heights are within AGENT_MAX_CLIMB"""
+    if len(rects) < 2:
+        return []
+    r = np.array(rects, dtype=np.int64)
+    x0, y0, x1, y1, level = (r[:, i] for i in range(5))
+    overlap_x = np.minimum(x1[:, None], x1[None]) - np.maximum(x0[:, None], x0[None])
+    overlap_y = np.minimum(y1[:, None], y1[None]) - np.maximum(y0[:, None], y0[None])
+    touch_x = ((x1[:, None] == x0[None]) | (x0[:, None] == x1[None])) & (overlap_y > 0)
+    touch_y = ((y1[:, None] == y0[None]) | (y0[:, None] == y1[None])) & (overlap_x > 0)
+    climb = np.abs(level[:, None] - level[None]) * NAV_HEIGHT_STEP <= AGENT_MAX_CLIMB
+    a, b = np.nonzero(np.triu((touch_x | touch_y) & climb, k=1))
+    return list(zip(a.tolist(), b.tolist()))
+
+
+def write_navmesh(bin_path, index_path, tiles):
+    """Write navmesh tiles to one binary plus a JSON tile index with byte ranges.
+
+    Coordinates are glTF/three.js Y-up. Each tile record is
+      header  i32 tile_x, i32 tile_y, u32 poly_count, u32 link_count
+      polys   poly_count x 5 f32 (min_x, min_z, max_x, max_z, y): walkable rectangles
+      links   link_count x 2 u16 poly indices sharing an edge
+    Polygons touching a tile border connect to the neighbouring tile's
+    polygons with an overlapping edge; the client stitches those on load.
+    """
+    header = struct.pack('<4sI4f', NAVMESH_MAGIC, NAVMESH_VERSION,
+                         NAV_CELL_SIZE, AGENT_RADIUS, AGENT_HEIGHT, AGENT_MAX_CLIMB)
+    index = []
+    with open(bin_path, 'wb') as f:
+        f.write(header)
+        for (tx, ty), rects, links in tiles:
+            origin_x, origin_y = tx * NAV_TILE_SIZE, ty * NAV_TILE_SIZE
+            record = [struct.pack('<iiII', tx, ty, len(rects), len(links))]
+            for x0, y0, x1, y1, level in rects:
+                record.append(struct.pack(
+                    '<5f',
+                    origin_x + x0 * NAV_CELL_SIZE, -(origin_y + y1 * NAV_CELL_SIZE),
+                    origin_x + x1 * NAV_CELL_SIZE, -(origin_y + y0 * NAV_CELL_SIZE),
+                    level * NAV_HEIGHT_STEP,
+                ))
+            record.extend(struct.pack('<HH', a, b) for a, b in links)
+            data = b"".join(record)
+            index.append({
+                "x": tx,
+                "y": ty,
+                "bounds": [origin_x, -(origin_y + NAV_TILE_SIZE), origin_x + NAV_TILE_SIZE, -origin_y],
+                "offset": f.tell(),
+                "length": len(data),
+                "polygons": len(rects),
+            })
+            f.write(data)
+
+    with open(index_path, 'w') as f:
+        json.dump({
+            "version": NAVMESH_VERSION,
+            "file": os.path.basename(bin_path),
+            "tile_size": NAV_TILE_SIZE,
+            "cell_size": NAV_CELL_SIZE,
+            "agent": {
+                "radius": AGENT_RADIUS,
+                "height": AGENT_HEIGHT,
+                "max_climb": AGENT_MAX_CLIMB,
+                "max_slope": AGENT_MAX_SLOPE,
+            },
+            "tiles": index,
+        }, f, indent=2)
+    return index
+
+
+def build_occluder_bvh(colliders):
+    """BVH over collider faces in world space, used for visibility raycasts"""
+    verts, polys = [], []
+    for col in colliders:
+        base = len(verts)
+        verts.extend(col.matrix_world @ v.co for v in col.data.vertices)
+        polys.extend([base + i for i in poly.vertices] for poly in col.data.polygons)
+    return BVHTree.FromPolygons(verts, polys)
+
+
+def tile_viewpoints(tile, bvh, ground_z):
+    """Street-level sample points in a tile, skipping those inside buildings"""
+    tx, ty = tile
+    up = Vector((0, 0, 1))
+    points = []
+    for i in range(PVS_VIEW_SAMPLES):
+        for j in range(PVS_VIEW_SAMPLES):
+            point = Vector((
+                (tx + (i + 0.5) / PVS_VIEW_SAMPLES) * TILE_SIZE,
+                (ty + (j + 0.5) / PVS_VIEW_SAMPLES) * TILE_SIZE,
+                ground_z + PVS_EYE_HEIGHT,
+            ))
+            # Looking up from inside a collider hits the back of an outward face
+            _, normal, _, _ = bvh.ray_cast(point, up)
+            if normal is not None and normal.z > 0:
+                continue
+            points.append(point)
+    return points
+
+
+def tile_targets(bmin, bmax):
+    """Sample points spread over a tile's content bounds, near the ground and at the top"""
+    points = []
+    low_z = min(bmin.z + 1.0, bmax.z)
+    for i in range(PVS_TARGET_SAMPLES):
+        for j in range(PVS_TARGET_SAMPLES):
+            fx = i / max(PVS_TARGET_SAMPLES - 1, 1)
+            fy = j / max(PVS_TARGET_SAMPLES - 1, 1)
+            x = bmin.x + (bmax.x - bmin.x) * fx
+            y = bmin.y + (bmax.y - bmin.y) * fy
+            points.append(Vector((x, y, low_z)))
+            points.append(Vector((x, y, bmax.z)))
+    return points
+
+
+def any_ray_clear(bvh, eyes, targets):
+    for eye in eyes:
+        for target in targets:
+            ray = target - eye
+            distance = ray.length
+            if distance <= PVS_TARGET_MARGIN:
+                return True
+            location, _, _, _ = bvh.ray_cast(eye, ray.normalized(), distance - PVS_TARGET_MARGIN)
+            if location is None:
+                return True
+    return False
+
+
+def compute_pvs(tile_bounds, bvh, ground_z):
+    """Potentially visible set per tile, as base64 bitsets over the sorted tile list.
+
+    Bit j of tile i is set when tile j is visible from tile i: some ray from
+    a street-level viewpoint in i reaches a sample point of j's content
+    without hitting a collider. Tiles always see themselves and their eight
+    neighbours, since the viewer can stand anywhere between samples.
+    """
+    tiles = sorted(tile_bounds)
+    index = {tile: i for i, tile in enumerate(tiles)}
+    targets = {tile: tile_targets(*tile_bounds[tile]) for tile in tiles}
+    bitsets = []
+    visible_total = 0
+
+    for n, tile in enumerate(tiles):
+        bits = bytearray((len(tiles) + 7) // 8)
+        eyes = tile_viewpoints(tile, bvh, ground_z)
+        for other in tiles:
+            dx, dy = other[0] - tile[0], other[1] - tile[1]
+            if max(abs(dx), abs(dy)) > 1:
+                if math.hypot(dx, dy) * TILE_SIZE > PVS_MAX_DISTANCE:
+                    continue
+                if not any_ray_clear(bvh, eyes, targets[other]):
+                    continue
+            j = index[other]
+            bits[j >> 3] |= 1 << (j & 7)
+            visible_total += 1
+        bitsets.append(base64.b64encode(bytes(bits)).decode('ascii'))
+
+        if (n + 1) % 50 == 0:
+            print(f"  PVS {n + 1}/{len(tiles)} tiles...")
+
+    return tiles, bitsets, visible_total
 
-tris_after = sum(len(obj.data.polygons) for obj in meshes if obj.data)
-reduction = 100 - (100 * tris_after // tris_before) if tris_before > 0 else 0
-print(f"  Final triangles: {tris_after:,} ({reduction}% reduction)")
 
 # ============================================================
-# STEP 5: CREATE COLLIDERS
+# INCREMENTAL REBUILD CACHE
 # ============================================================
-print("\n[5/8] CREATING COLLISION MESHES...")
-
-# Ground collider
-bpy.ops.mesh.primitive_plane_add(size=1, location=(0, 0, -0.1))
-ground = bpy.context.active_object
-ground.name = "COL_Ground"
-ground.scale = ((width + 100)/2, (depth + 100)/2, 1)
-bpy.ops.object.transform_apply(scale=True)
-
-# Building colliders
-col_count = 1
-for obj in buildings[:MAX_BUILDING_COLLIDERS]:
-    bbox = [obj.matrix_world @ Vector(corner) for corner in obj.bound_box]
-    bmin = Vector((min(v.x for v in bbox), min(v.y for v in bbox), min(v.z for v in bbox)))
-    bmax = Vector((max(v.x for v in bbox), max(v.y for v in bbox), max(v.z for v in bbox)))
-    size = bmax - bmin
 
-    if size.x > 5 and size.y > 5 and size.z > 5:
-        center = (bmin + bmax) / 2
-        bpy.ops.mesh.primitive_cube_add(size=1, location=center)
-        col = bpy.context.active_object
-        col.name = f"COL_Building_{col_count}"
-        col.scale = (size.x/2, size.y/2, size.z/2)
-        bpy.ops.object.transform_apply(scale=True)
-        col_count += 1
+CACHE_VERSION = 2  # Bump when a fingerprint starts covering more of the scene
+
+
+def pipeline_hash():
+    """Hash of this script; any change to the pipeline invalidates every cache entry"""
+    with open(os.path.abspath(__file__), 'rb') as f:
+        return combine_fingerprints(CACHE_VERSION, hashlib.sha1(f.read()).hexdigest())
+
+
+def rna_value(value, seen):
+    """Stable, hashable form of an RNA property value.
+
+    Images contribute their file path, node trees their digest and objects
+    their world matrix, so edits to what a pointer refers to are seen too.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, bpy.types.Image):
+        return ("image", value.name, value.source, value.filepath)
+    if isinstance(value, bpy.types.NodeTree):
+        return ("tree", value.name, node_tree_digest(value, seen))
+    if isinstance(value, bpy.types.Object):
+        return ("object", value.name, rna_value(value.matrix_world, seen))
+    if isinstance(value, bpy.types.ID):
+        return (type(value).__name__, value.name)
+    if isinstance(value, bpy.types.bpy_struct):
+        return type(value).__name__  # Nested settings structs; their repr holds an address
+    if hasattr(value, "to_dict"):
+        value = value.to_dict()
+    if isinstance(value, dict):
+        return tuple(sorted((key, rna_value(item, seen)) for key, item in value.items()))
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(value))
+    return tuple(rna_value(item, seen) for item in value)
+
+
+def rna_properties(struct, skip, seen):
+    """(identifier, value) for every non-collection RNA property not in skip"""
+    return [(prop.identifier, rna_value(getattr(struct, prop.identifier, None), seen))
+            for prop in struct.bl_rna.properties
+            if prop.identifier not in skip and prop.type != 'COLLECTION']
+
+
+def node_tree_digest(tree, seen=frozenset()):
+    """Hash of a node tree's nodes, their settings, unlinked input values and links"""
+    if tree.name in seen:
+        return tree.name
+    seen = seen | {tree.name}
+    node_base = {prop.identifier for prop in bpy.types.Node.bl_rna.properties}
+    h = hashlib.sha1()
+    for node in sorted(tree.nodes, key=lambda n: n.name):
+        inputs = [(socket.identifier, rna_value(getattr(socket, "default_value", None), seen))
+                  for socket in node.inputs if not socket.is_linked]
+        h.update(repr((node.name, node.bl_idname, node.mute,
+                       rna_properties(node, node_base, seen), inputs)).encode())
+    links = sorted((link.from_node.name, link.from_socket.identifier,
+                    link.to_node.name, link.to_socket.identifier) for link in tree.links)
+    h.update(repr(links).encode())
+    return h.hexdigest()
+
+
+def modifier_fingerprint(mod):
+    """Type, render visibility and every setting of a modifier, including
+    geometry-nodes inputs (stored as ID properties)"""
+    modifier_base = {prop.identifier for prop in bpy.types.Modifier.bl_rna.properties}
+    inputs = [(key, rna_value(mod[key], frozenset())) for key in mod.keys()]
+    return repr((mod.type, mod.show_render, rna_properties(mod, modifier_base, frozenset()), inputs))
+
+
+def material_fingerprint(material):
+    """Hash of a material's settings and node tree, including image file paths"""
+    if material is None:
+        return ""
+    id_base = {prop.identifier for prop in bpy.types.ID.bl_rna.properties}
+    return combine_fingerprints(material.name, rna_properties(material, id_base, frozenset()))
+
+
+def object_fingerprint(obj):
+    """Content hash of an object's mesh data, world transform, modifier stack
+    and materials (settings, node trees and image paths)"""
+    mesh = obj.data
+    h = hashlib.sha1()
+    for collection, prop, dtype, width in (
+        (mesh.vertices, "co", np.float32, 3),
+        (mesh.loops, "vertex_index", np.int32, 1),
+        (mesh.polygons, "loop_total", np.int32, 1),
+        (mesh.polygons, "material_index", np.int32, 1),
+    ):
+        data = np.empty(len(collection) * width, dtype=dtype)
+        collection.foreach_get(prop, data)
+        h.update(data.tobytes())
+    for layer in mesh.uv_layers:
+        uv = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+        layer.data.foreach_get("uv", uv)
+        h.update(uv.tobytes())
+    h.update(np.array(obj.matrix_world, dtype=np.float64).tobytes())
+    for mod in obj.modifiers:
+        h.update(modifier_fingerprint(mod).encode())
+    h.update("|".join(material_fingerprint(slot.material) for slot in obj.material_slots).encode())
+    return h.hexdigest()
+
+
+def combine_fingerprints(*parts):
+    h = hashlib.sha1()
+    for part in parts:
+        h.update(str(part).encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def geometry_fingerprint(obj):
+    """Hash of a generated collider's world-space vertices"""
+    co = np.array([obj.matrix_world @ v.co for v in obj.data.vertices], dtype=np.float64)
+    return hashlib.sha1(co.tobytes()).hexdigest()
+
+
+def load_cache(cache_dir, name, pipeline):
+    """Load a cache file, discarding it if it was written by a different pipeline"""
+    if cache_dir is None:
+        return {}
+    path = os.path.join(cache_dir, f"{name}.json")
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        data = json.load(f)
+    if data.get("pipeline") != pipeline:
+        return {}
+    return data["entries"]
+
+
+def save_cache(cache_dir, name, pipeline, entries):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f"{name}.json")
+    with open(path + ".tmp", 'w') as f:
+        json.dump({"pipeline": pipeline, "entries": entries}, f)
+    os.replace(path + ".tmp", path)
+
+
+def tile_fingerprint(objects, fingerprints):
+    return combine_fingerprints(*sorted(f"{obj.name}:{fingerprints[obj.name]}" for obj in objects))
 
-print(f"  Created {col_count} colliders (1 ground + {col_count-1} buildings)")
 
 # ============================================================
-# STEP 6: SPAWN POINT
+# PROFILING
 # ============================================================
-print("\n[6/8] ADDING SPAWN POINT...")
 
-bpy.ops.object.empty_add(type='ARROWS', location=(0, 0, 2))
-spawn = bpy.context.active_object
-spawn.name = "SpawnPoint"
-print(f"  Spawn at (0, 0, 2)")
+PROFILE = []  # Finished stage records, appended as each stage exits
+PROFILE_STACK = []  # Names of the stages currently running
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, or None where unavailable"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux but bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def scene_counts():
+    meshes = [obj for obj in bpy.data.objects if obj.type == 'MESH' and obj.data is not None]
+    return len(meshes), sum(len(obj.data.polygons) for obj in meshes)
+
+
+@contextmanager
+def profile_stage(name):
+    """Record wall time, CPU time, peak RSS and mesh object/face counts around a block.
+
+    A stage that raises is still recorded, with an "error" field, so the
+    failing stage shows up in the trace.
+    """
+    objects_in, faces_in = scene_counts()
+    start = time.time()
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    error = None
+    PROFILE_STACK.append(name)
+    try:
+        yield
+    except BaseException as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        PROFILE_STACK.pop()
+        objects_out, faces_out = scene_counts()
+        record = {
+            "name": name,
+            "depth": len(PROFILE_STACK),
+            "start": start,
+            "wall_s": round(time.perf_counter() - wall, 3),
+            "cpu_s": round(time.process_time() - cpu, 3),
+            "peak_rss_mb": peak_rss_mb(),
+            "objects_in": objects_in,
+            "objects_out": objects_out,
+            "faces_in": faces_in,
+            "faces_out": faces_out,
+        }
+        if error is not None:
+            record["error"] = error
+        PROFILE.append(record)
+
+
+def profiled(name):
+    """Decorator form of profile_stage"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with profile_stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def save_profile(path):
+    with open(path, 'w') as f:
+        json.dump(PROFILE, f)
+
+
+def trace_events(records, pid, process_name):
+    """Chrome trace 'complete' events (microseconds) for one process's records"""
+    events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": process_name}}]
+    for record in records:
+        events.append({
+            "name": record["name"],
+            "ph": "X",
+            "pid": pid,
+            "tid": 0,
+            "ts": int(record["start"] * 1e6),
+            "dur": int(record["wall_s"] * 1e6),
+            "args": {key: value for key, value in record.items() if key not in ("name", "start", "depth")},
+        })
+    return events
+
+
+def write_profile(output_dir, worker_paths=()):
+    """Write profile.json and profile.trace.json (chrome://tracing) next to the manifest,
+    merging the per-worker records so the whole run shares one timeline"""
+    workers = {}
+    for path in worker_paths:
+        if os.path.exists(path):
+            with open(path) as f:
+                workers[os.path.basename(path).split(".")[0]] = json.load(f)
+
+    with open(os.path.join(output_dir, "profile.json"), 'w') as f:
+        json.dump({"stages": PROFILE, "workers": workers}, f, indent=2)
+
+    events = trace_events(PROFILE, 0, "main")
+    for pid, (name, records) in enumerate(sorted(workers.items()), start=1):
+        events.extend(trace_events(records, pid, name))
+    with open(os.path.join(output_dir, "profile.trace.json"), 'w') as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    print(f"\n  {'Stage':<20} {'Wall':>8} {'CPU':>8} {'Peak RSS':>10} {'Faces in -> out':>24}")
+    for record in PROFILE:
+        if record["depth"] == 0:
+            rss = f"{record['peak_rss_mb']:.0f} MB" if record["peak_rss_mb"] is not None else "-"
+            faces = f"{record['faces_in']:,} -> {record['faces_out']:,}"
+            print(f"  {record['name']:<20} {record['wall_s']:>7.1f}s {record['cpu_s']:>7.1f}s {rss:>10} {faces:>24}")
+    print(f"  Profile saved (open profile.trace.json in chrome://tracing)")
+
 
 # ============================================================
-# STEP 7: EXPORT
+# PIPELINE STAGES
 # ============================================================
-print("\n[7/8] EXPORTING GLB FILES...")
-
-# Hide colliders for visual export
-for obj in bpy.data.objects:
-    if obj.name.startswith("COL_"):
-        obj.hide_set(True)
-
-visual_path = os.path.join(output_dir, "downtown.glb")
-print(f"  Exporting visual mesh...")
-bpy.ops.export_scene.gltf(
-    filepath=visual_path,
-    export_format='GLB',
-    use_selection=False,
-    export_apply=True,
-    export_materials='EXPORT',
-)
-visual_size = os.path.getsize(visual_path) / 1024 / 1024
-print(f"  Visual: {visual_size:.1f} MB")
-
-# Collision only
-for obj in bpy.data.objects:
-    obj.hide_set(True)
-for obj in bpy.data.objects:
-    if obj.name.startswith("COL_"):
-        obj.hide_set(False)
-
-collision_path = os.path.join(output_dir, "downtown_collision.glb")
-print(f"  Exporting collision mesh...")
-bpy.ops.export_scene.gltf(
-    filepath=collision_path,
-    export_format='GLB',
-    use_selection=False,
-    export_apply=True,
-    export_materials='NONE',
-)
-col_size = os.path.getsize(collision_path) / 1024
-print(f"  Collision: {col_size:.0f} KB")
+
+def mesh_objects():
+    return [obj for obj in bpy.data.objects if obj.type == 'MESH' and not obj.name.startswith("COL_")]
+
+
+def check_scale(buildings):
+    if buildings:
+        heights = []
+        for obj in buildings[:20]:
+            bbox = [obj.matrix_world @ Vector(corner) for corner in obj.bound_box]
+            h = max(v.z for v in bbox) - min(v.z for v in bbox)
+            heights.append(h)
+        print(f"  Sample building heights: {min(heights):.0f}m - {max(heights):.0f}m")
+        print(f"  Scale appears correct (1 unit = 1 meter)")
+
+
+def measure_recenter(meshes):
+    """Return (offset, width, depth) that centers the map and puts the ground at Z=0"""
+    all_verts = []
+    for obj in meshes:
+        if obj.data and hasattr(obj.data, 'vertices'):
+            for v in obj.data.vertices:
+                all_verts.append(obj.matrix_world @ v.co)
+
+    min_x = min(v.x for v in all_verts)
+    max_x = max(v.x for v in all_verts)
+    min_y = min(v.y for v in all_verts)
+    max_y = max(v.y for v in all_verts)
+    min_z = min(v.z for v in all_verts)
+
+    offset = [(min_x + max_x) / 2, (min_y + max_y) / 2, min_z]
+    return offset, max_x - min_x, max_y - min_y
+
+
+def snap_offset(offset):
+    """Round the horizontal offset to whole tiles so the tile grid stays put under small edits"""
+    return [round(offset[0] / TILE_SIZE) * TILE_SIZE, round(offset[1] / TILE_SIZE) * TILE_SIZE, offset[2]]
+
+
+def apply_offset(objects, offset):
+    # Children follow their parents, so only roots are moved
+    for obj in objects:
+        if obj.parent is None:
+            obj.location.x -= offset[0]
+            obj.location.y -= offset[1]
+            obj.location.z -= offset[2]
+    # Refresh matrix_world before anything reads world-space positions
+    bpy.context.view_layer.update()
+
+
+def remove_hidden_geometry(meshes):
+    removed_faces = 0
+    processed = 0
+
+    for obj in meshes:
+        if obj.data is None:
+            continue
+
+        bm = bmesh.new()
+        bm.from_mesh(obj.data)
+
+        faces_to_remove = []
+        for face in bm.faces:
+            # Underground faces (pointing down)
+            if face.normal.z < -0.95:
+                faces_to_remove.append(face)
+                continue
+            # Below ground level
+            avg_z = sum((obj.matrix_world @ v.co).z for v in face.verts) / len(face.verts)
+            if avg_z < -2:
+                faces_to_remove.append(face)
+
+        for face in faces_to_remove:
+            bm.faces.remove(face)
+            removed_faces += 1
+
+        bm.to_mesh(obj.data)
+        bm.free()
+
+        processed += 1
+        if processed % 500 == 0:
+            print(f"  Processed {processed}/{len(meshes)} meshes...")
+
+    return removed_faces
+
+
+def decimate_meshes(meshes):
+    """Apply the LOD0 decimation; returns (triangles_before, triangles_after)"""
+    tris_before = sum(len(obj.data.polygons) for obj in meshes if obj.data)
+
+    decimated = 0
+    for obj in meshes:
+        if obj.data is None or len(obj.data.polygons) < 50:
+            continue
+
+        bpy.ops.object.select_all(action='DESELECT')
+        obj.select_set(True)
+        bpy.context.view_layer.objects.active = obj
+
+        mod = obj.modifiers.new(name="Decimate", type='DECIMATE')
+        mod.ratio = DECIMATE_RATIO
+        bpy.ops.object.modifier_apply(modifier=mod.name)
+        decimated += 1
+
+        if decimated % 500 == 0:
+            print(f"  Decimated {decimated} meshes...")
+
+    tris_after = sum(len(obj.data.polygons) for obj in meshes if obj.data)
+    return tris_before, tris_after
+
+
+def create_colliders(buildings, width, depth, cache=None, fingerprints=None, offset=(0, 0, 0)):
+    """Ground plane plus an OBB, a convex hull or a convex decomposition per building.
+
+    With a cache dict and per-object fingerprints, buildings whose
+    fingerprint is unchanged reuse their cached parts instead of being
+    decomposed again; the cache is updated in place. Fingerprints hash the
+    pre-recenter transform, so cached parts are stored in pre-recenter space
+    (offset added back) and shifted by the current offset on reuse.
+    """
+    shift = np.array(offset, dtype=np.float64)
+    bpy.ops.mesh.primitive_plane_add(size=1, location=(0, 0, -0.1))
+    ground = bpy.context.active_object
+    ground.name = "COL_Ground"
+    ground.scale = ((width + 100)/2, (depth + 100)/2, 1)
+    bpy.ops.object.transform_apply(scale=True)
+
+    colliders = [ground]
+    stats = {"boxes": 0, "hulls": 0, "compound_buildings": 0, "max_hull_vertices": MAX_COLLIDER_VERTS}
+    reused = 0
+    for index, obj in enumerate(buildings, start=1):
+        if obj.data is None or len(obj.data.edges) == 0:
+            continue
+
+        entry = cache.get(obj.name) if cache is not None else None
+        if entry is not None and entry["fingerprint"] == fingerprints[obj.name]:
+            shapes = [dict(part, verts=(np.array(part["verts"]) - shift).tolist()) for part in entry["parts"]]
+            reused += 1
+        else:
+            segments = world_segments(obj)
+            extent = np.ptp(segments.reshape(-1, 3), axis=0)
+            if extent.min() < MIN_COLLIDER_EXTENT:
+                shapes = []
+            else:
+                shapes = []
+                for points in decompose(segments):
+                    kind, verts, faces = collider_shape(points)
+                    shapes.append({"kind": kind, "verts": np.asarray(verts).tolist(), "faces": faces})
+            if cache is not None:
+                cache[obj.name] = {
+                    "fingerprint": fingerprints[obj.name],
+                    "parts": [dict(part, verts=(np.array(part["verts"]) + shift).tolist()) for part in shapes],
+                }
+
+        if len(shapes) > 1:
+            stats["compound_buildings"] += 1
+        for part_index, shape in enumerate(shapes):
+            kind = shape["kind"]
+            col = create_collider(f"COL_Building_{index}_{part_index}", kind, shape["verts"], shape["faces"])
+            col["building"] = obj.name
+            colliders.append(col)
+            stats["boxes" if kind == "box" else "hulls"] += 1
+
+        if index % 500 == 0:
+            print(f"  Processed {index}/{len(buildings)} buildings...")
+
+    if cache is not None:
+        print(f"  Reused cached colliders for {reused}/{len(buildings)} buildings")
+    return colliders, stats
+
+
+def bake_navmesh(colliders, width, depth, output_dir, cache=None):
+    """Bake and write the tiled navmesh; returns (stats, ground_z).
+
+    With a cache dict, a navmesh tile is only re-baked when the set of
+    colliders overlapping it (plus the erosion margin) has changed.
+    """
+    ground = colliders[0]
+    solids = []
+    solid_prints = []
+    for col in colliders[1:]:
+        normals, plane_offsets = collider_planes(col)
+        co = np.array([col.matrix_world @ v.co for v in col.data.vertices])
+        solids.append((normals, plane_offsets, co.min(axis=0), co.max(axis=0)))
+        solid_prints.append(geometry_fingerprint(col) if cache is not None else None)
+    ground_z = max((ground.matrix_world @ v.co).z for v in ground.data.vertices)
+    if solids:
+        solid_min = np.array([solid[2] for solid in solids])
+        solid_max = np.array([solid[3] for solid in solids])
+    margin = AGENT_RADIUS + 2 * NAV_CELL_SIZE
+
+    nav_tiles = []
+    rebaked = 0
+    tile_range_x = range(math.floor(-width / 2 / NAV_TILE_SIZE), math.floor(width / 2 / NAV_TILE_SIZE) + 1)
+    tile_range_y = range(math.floor(-depth / 2 / NAV_TILE_SIZE), math.floor(depth / 2 / NAV_TILE_SIZE) + 1)
+    for ty in tile_range_y:
+        for tx in tile_range_x:
+            key = f"{tx}_{ty}"
+            if cache is not None:
+                lo = np.array([tx * NAV_TILE_SIZE - margin, ty * NAV_TILE_SIZE - margin])
+                hi = lo + NAV_TILE_SIZE + 2 * margin
+                overlapping = []
+                if solids:
+                    hits = ~((solid_max[:, :2] < lo).any(axis=1) | (solid_min[:, :2] > hi).any(axis=1))
+                    overlapping = sorted(solid_prints[i] for i in np.flatnonzero(hits))
+                fingerprint = combine_fingerprints(ground_z, *overlapping)
+                entry = cache.get(key)
+                if entry is not None and entry["fingerprint"] == fingerprint:
+                    rects, links = entry["rects"], [tuple(link) for link in entry["links"]]
+                    if rects:
+                        nav_tiles.append(((tx, ty), rects, links))
+                    continue
+
+            rects = merge_rectangles(walkable_heights(tx, ty, solids, ground_z))
+            links = rectangle_links(rects)
+            rebaked += 1
+            if cache is not None:
+                cache[key] = {"fingerprint": fingerprint, "rects": rects, "links": links}
+            if rects:
+                nav_tiles.append(((tx, ty), rects, links))
+        print(f"  Baked tile row {ty - tile_range_y.start + 1}/{len(tile_range_y)}...")
+
+    if cache is not None:
+        print(f"  Re-baked {rebaked}/{len(tile_range_x) * len(tile_range_y)} navmesh tiles")
+
+    navmesh_path = os.path.join(output_dir, "downtown_navmesh.bin")
+    write_navmesh(navmesh_path, os.path.join(output_dir, "downtown_navmesh.json"), nav_tiles)
+    nav_polys = sum(len(rects) for _, rects, _ in nav_tiles)
+    nav_size = os.path.getsize(navmesh_path) / 1024
+    print(f"  Navmesh: {len(nav_tiles)} tiles, {nav_polys:,} polygons ({nav_size:.0f} KB)")
+
+    stats = {
+        "tiles": len(nav_tiles),
+        "polygons": nav_polys,
+        "agent_radius": AGENT_RADIUS,
+        "agent_height": AGENT_HEIGHT,
+    }
+    return stats, ground_z
+
+
+def merge_visual_meshes(objects):
+    """Run the merge stage over objects; returns (remaining objects, merge stats)"""
+    names = [obj.name for obj in objects]
+    draw_calls_before = sum(draw_calls(obj) for obj in objects)
+    merged = merge_static_meshes(objects)
+
+    # Joined objects are deleted and join targets are renamed
+    remaining = [bpy.data.objects[name] for name in names if name in bpy.data.objects] + merged
+    draw_calls_after = sum(draw_calls(obj) for obj in remaining)
+    return remaining, {
+        "tile_size": TILE_SIZE,
+        "merged_groups": len(merged),
+        "objects_before": len(objects),
+        "objects_after": len(remaining),
+        "draw_calls_before": draw_calls_before,
+        "draw_calls_after": draw_calls_after,
+        "draw_calls_saved": draw_calls_before - draw_calls_after,
+    }
+
+
+def tag_tiles(objects):
+    """Tag objects with their tile and return each tile's content bounds"""
+    tile_bounds = {}
+    for obj in objects:
+        tile = tuple(obj["tile"]) if "tile" in obj else tile_of(obj)
+        obj["tile"] = list(tile)
+        bbox = [obj.matrix_world @ Vector(corner) for corner in obj.bound_box]
+        bmin = Vector((min(v.x for v in bbox), min(v.y for v in bbox), min(v.z for v in bbox)))
+        bmax = Vector((max(v.x for v in bbox), max(v.y for v in bbox), max(v.z for v in bbox)))
+        if tile in tile_bounds:
+            lo, hi = tile_bounds[tile]
+            bmin = Vector((min(lo.x, bmin.x), min(lo.y, bmin.y), min(lo.z, bmin.z)))
+            bmax = Vector((max(hi.x, bmax.x), max(hi.y, bmax.y), max(hi.z, bmax.z)))
+        tile_bounds[tile] = (bmin, bmax)
+    return tile_bounds
+
+
+def compute_pvs_stage(colliders, tile_bounds, ground_z, cache=None):
+    """PVS over all tiles; with a cache dict it is reused while no occluder or tile bounds changed"""
+    if cache is not None:
+        fingerprint = combine_fingerprints(
+            ground_z,
+            *sorted(geometry_fingerprint(col) for col in colliders[1:]),
+            *(f"{tile}:{[round(c, 3) for c in (*lo, *hi)]}" for tile, (lo, hi) in sorted(tile_bounds.items())),
+        )
+        if cache.get("fingerprint") == fingerprint:
+            print(f"  PVS unchanged, reusing cached sets")
+            return cache["pvs"], cache["average"]
+
+    occluders = build_occluder_bvh(colliders[1:])
+    pvs_tiles, pvs_bitsets, pvs_visible = compute_pvs(tile_bounds, occluders, ground_z)
+    pvs_average = pvs_visible / len(pvs_tiles) if pvs_tiles else 0
+    print(f"  {len(pvs_tiles)} tiles, {pvs_average:.1f} visible per tile on average")
+    # Tile keys are Blender XY indices, shared with the tile files and the
+    # merged meshes' "tile" extras. Tile [x, y] covers glTF x in [x*s, (x+1)*s]
+    # and z in [-(y+1)*s, -y*s] (glTF z = -Blender y), listed per tile in
+    # "bounds" as [min_x, min_z, max_x, max_z], like the navmesh index.
+    pvs = {
+        "frame": "blender_xy",
+        "tile_size": TILE_SIZE,
+        "max_distance": PVS_MAX_DISTANCE,
+        "tiles": [list(tile) for tile in pvs_tiles],
+        "bounds": [[tx * TILE_SIZE, -(ty + 1) * TILE_SIZE, (tx + 1) * TILE_SIZE, -ty * TILE_SIZE]
+                   for tx, ty in pvs_tiles],
+        "visible": pvs_bitsets,
+    }
+    if cache is not None:
+        cache.update({"fingerprint": fingerprint, "pvs": pvs, "average": pvs_average})
+    return pvs, pvs_average
+
+
+def export_selected(path, objects, **options):
+    bpy.ops.object.select_all(action='DESELECT')
+    for obj in objects:
+        obj.select_set(True)
+    bpy.ops.export_scene.gltf(
+        filepath=path,
+        export_format='GLB',
+        use_selection=True,
+        export_apply=True,
+        export_extras=True,
+        **options,
+    )
+    return os.path.getsize(path)
+
+
+def export_visual(path, objects):
+    # Extras carry merged object tables; _object_id is a custom vertex attribute
+    return export_selected(path, objects, export_materials='EXPORT', export_attributes=True)
+
+
+def export_collision(output_dir, colliders):
+    """Export collider meshes plus the broadphase; returns the GLB size in KB"""
+    collision_path = os.path.join(output_dir, "downtown_collision.glb")
+    print(f"  Exporting collision mesh...")
+    col_size = export_selected(collision_path, colliders, export_materials='NONE') / 1024
+    print(f"  Collision: {col_size:.0f} KB")
+
+    bvh_nodes = write_broadphase(os.path.join(output_dir, "downtown_collision.bvh"), colliders)
+    print(f"  Broadphase: {bvh_nodes} BVH nodes over {len(colliders)} colliders")
+    return col_size
+
+
+def add_spawn_point():
+    bpy.ops.object.empty_add(type='ARROWS', location=(0, 0, 2))
+    spawn = bpy.context.active_object
+    spawn.name = "SpawnPoint"
+    print(f"  Spawn at (0, 0, 2)")
+    return spawn
+
+
+def write_manifest(output_dir, width, depth, stats, pvs, files):
+    manifest = {
+        "name": "Downtown Tampa",
+        "bounds": {"width": width, "depth": depth},
+        "spawn": [0, 0, 2],
+        "stats": stats,
+        "pvs": pvs,
+        "files": {
+            **files,
+            "collision": "downtown_collision.glb",
+            "broadphase": "downtown_collision.bvh",
+            "navmesh": "downtown_navmesh.bin",
+            "navmesh_index": "downtown_navmesh.json",
+        },
+    }
+
+    manifest_path = os.path.join(output_dir, "manifest.json")
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"  Manifest saved")
+
+
+def print_summary(output_dir, stats, col_size, visual_label):
+    reduction = stats["reduction"]
+    merge = stats["merge"]
+    print(f"\n{'='*70}")
+    print("CLEANUP COMPLETE!")
+    print(f"{'='*70}")
+    print(f"  Visual:        {visual_label}")
+    print(f"  Collision GLB: {col_size:.0f} KB")
+    print(f"  Triangles:     {stats['triangles_before']:,} -> {stats['triangles_after']:,} ({reduction} reduced)")
+    print(f"  Colliders:     {stats['colliders']}")
+    print(f"  Draw calls:    {merge['draw_calls_before']:,} -> {merge['draw_calls_after']:,}")
+    print(f"  Output:        {output_dir}")
+    print(f"{'='*70}\n")
+
+
+def reduction_label(tris_before, tris_after):
+    reduction = 100 - (100 * tris_after // tris_before) if tris_before > 0 else 0
+    return f"{reduction}%"
+
+
+@profiled("open")
+def open_map(blend_path):
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    bpy.ops.wm.open_mainfile(filepath=blend_path)
+    meshes = mesh_objects()
+    print(f"\nLoaded {len(meshes)} meshes")
+    return meshes
+
 
 # ============================================================
-# STEP 8: MANIFEST
+# SERIAL PIPELINE
 # ============================================================
-print("\n[8/8] CREATING MANIFEST...")
-
-manifest = {
-    "name": "Downtown Tampa",
-    "bounds": {"width": width, "depth": depth},
-    "spawn": [0, 0, 2],
-    "stats": {
-        "triangles_before": tris_before,
-        "triangles_after": tris_after,
-        "colliders": col_count,
-        "reduction": f"{reduction}%"
-    },
-    "files": {
-        "visual": "downtown.glb",
-        "collision": "downtown_collision.glb"
-    }
-}
 
-manifest_path = os.path.join(output_dir, "manifest.json")
-with open(manifest_path, 'w') as f:
-    json.dump(manifest, f, indent=2)
-print(f"  Manifest saved")
+def run_serial(blend_path, output_dir):
+    meshes = open_map(blend_path)
+
+    with profile_stage("scale"):
+        print("\n[1/11] CHECKING SCALE...")
+        buildings = [obj for obj in meshes if 'building' in obj.name.lower()]
+        check_scale(buildings)
+
+    with profile_stage("recenter"):
+        print("\n[2/11] RECENTERING TO ORIGIN...")
+        offset, width, depth = measure_recenter(meshes)
+        apply_offset(bpy.data.objects, offset)
+        print(f"  Map size: {width:.0f} x {depth:.0f} meters")
+        print(f"  Centered at origin, ground at Z=0")
+
+    with profile_stage("hidden_geometry"):
+        print("\n[3/11] REMOVING HIDDEN GEOMETRY...")
+        removed_faces = remove_hidden_geometry(meshes)
+        print(f"  Removed {removed_faces} hidden faces")
+
+    with profile_stage("decimate"):
+        print("\n[4/11] DECIMATING MESHES...")
+        tris_before, tris_after = decimate_meshes(meshes)
+        reduction = reduction_label(tris_before, tris_after)
+        print(f"  Triangles: {tris_before:,} -> {tris_after:,} ({reduction} reduction)")
+
+    with profile_stage("colliders"):
+        print("\n[5/11] CREATING COLLISION MESHES...")
+        colliders, collider_stats = create_colliders(buildings, width, depth)
+        print(f"  Created {len(colliders)} colliders (1 ground + {len(colliders)-1} building parts)")
+        print(f"  Boxes: {collider_stats['boxes']}, hulls: {collider_stats['hulls']}, "
+              f"compound buildings: {collider_stats['compound_buildings']}")
+
+    with profile_stage("navmesh"):
+        print("\n[6/11] BAKING NAVIGATION MESH...")
+        navmesh_stats, ground_z = bake_navmesh(colliders, width, depth, output_dir)
+
+    with profile_stage("merge"):
+        print("\n[7/11] MERGING STATIC MESHES BY MATERIAL...")
+        visual_objects, merge_stats = merge_visual_meshes(mesh_objects())
+        print(f"  Objects: {merge_stats['objects_before']:,} -> {merge_stats['objects_after']:,} "
+              f"({merge_stats['merged_groups']} merged groups)")
+        print(f"  Draw calls: {merge_stats['draw_calls_before']:,} -> {merge_stats['draw_calls_after']:,}")
+
+    with profile_stage("pvs"):
+        print("\n[8/11] COMPUTING POTENTIALLY VISIBLE SETS...")
+        # Tag every visual object with its tile so the client can cull by PVS
+        pvs, pvs_average = compute_pvs_stage(colliders, tag_tiles(visual_objects), ground_z)
+
+    with profile_stage("spawn"):
+        print("\n[9/11] ADDING SPAWN POINT...")
+        spawn = add_spawn_point()
+
+    with profile_stage("export"):
+        print("\n[10/11] EXPORTING GLB FILES...")
+        print(f"  Exporting visual mesh...")
+        visual_size = export_visual(os.path.join(output_dir, "downtown.glb"), visual_objects + [spawn]) / 1024 / 1024
+        print(f"  Visual: {visual_size:.1f} MB")
+        col_size = export_collision(output_dir, colliders)
+
+    with profile_stage("manifest"):
+        print("\n[11/11] CREATING MANIFEST...")
+        stats = {
+            "triangles_before": tris_before,
+            "triangles_after": tris_after,
+            "colliders": len(colliders),
+            "collider_shapes": collider_stats,
+            "reduction": reduction,
+            "navmesh": navmesh_stats,
+            "pvs_average_visible_tiles": round(pvs_average, 1),
+            "merge": merge_stats,
+        }
+        write_manifest(output_dir, width, depth, stats, pvs, {"visual": "downtown.glb"})
+
+    write_profile(output_dir)
+    print_summary(output_dir, stats, col_size, f"downtown.glb ({visual_size:.1f} MB)")
+
 
 # ============================================================
-# SUMMARY
+# PARALLEL TILE PIPELINE
 # ============================================================
-print(f"\n{'='*70}")
-print("CLEANUP COMPLETE!")
-print(f"{'='*70}")
-print(f"  Visual GLB:    {visual_size:.1f} MB")
-print(f"  Collision GLB: {col_size:.0f} KB")
-print(f"  Triangles:     {tris_before:,} -> {tris_after:,} ({reduction}% reduced)")
-print(f"  Colliders:     {col_count}")
-print(f"  Output:        {output_dir}")
-print(f"{'='*70}\n")
+
+def plan_shards(tiles, jobs):
+    """Split tiles into `jobs` shards balanced by face count (largest tile first)"""
+    shards = [{"faces": 0, "tiles": {}} for _ in range(jobs)]
+    for tile, objects in sorted(tiles.items(), key=lambda item: -sum(len(o.data.polygons) for o in item[1])):
+        shard = min(shards, key=lambda s: s["faces"])
+        shard["tiles"][f"{tile[0]}_{tile[1]}"] = [obj.name for obj in objects]
+        shard["faces"] += sum(len(obj.data.polygons) for obj in objects)
+    return [shard for shard in shards if shard["tiles"]]
+
+
+def launch_workers(blend_path, output_dir, worker_dir, shards, offset):
+    """Start one background Blender per shard; returns [(process, log_path)].
+
+    Shard specs, logs and worker profiles go in worker_dir, which is cleared
+    first so files from an earlier run with more shards don't linger.
+    """
+    shutil.rmtree(worker_dir, ignore_errors=True)
+    os.makedirs(worker_dir)
+    workers = []
+    for index, shard in enumerate(shards):
+        shard_path = os.path.join(worker_dir, f"shard_{index}.json")
+        with open(shard_path, 'w') as f:
+            json.dump({"offset": offset, "tiles": shard["tiles"]}, f)
+        log_path = os.path.join(worker_dir, f"shard_{index}.log")
+        with open(log_path, 'w') as log:
+            process = subprocess.Popen(
+                [bpy.app.binary_path, "--background", "--factory-startup",
+                 "--python", os.path.abspath(__file__), "--",
+                 blend_path, output_dir, "--worker", shard_path],
+                stdout=log, stderr=subprocess.STDOUT,
+            )
+        workers.append((process, log_path))
+    return workers
+
+
+def wait_for_workers(workers):
+    failed = []
+    for process, log_path in workers:
+        if process.wait() != 0:
+            failed.append(log_path)
+    for log_path in failed:
+        print(f"  ERROR: worker failed, see {log_path}")
+        with open(log_path) as f:
+            print("".join(f.readlines()[-20:]))
+    if failed:
+        sys.exit(1)
+
+
+def run_tile_worker(blend_path, output_dir, shard_path):
+    """Process one shard of tiles: hidden faces, decimation, merge and per-tile export"""
+    with open(shard_path) as f:
+        shard = json.load(f)
+
+    open_map(blend_path)
+
+    # Keep only this shard's objects, baking parent transforms first so
+    # deleting the rest of the hierarchy does not move them
+    keep = {name for names in shard["tiles"].values() for name in names}
+    kept = [bpy.data.objects[name] for name in keep]
+    for obj in kept:
+        matrix = obj.matrix_world.copy()
+        obj.parent = None
+        obj.matrix_world = matrix
+    bpy.data.batch_remove([obj for obj in bpy.data.objects if obj.name not in keep])
+    apply_offset(kept, shard["offset"])
+
+    for key, names in shard["tiles"].items():
+        print(f"\nTile {key}: {len(names)} meshes")
+        objects = [bpy.data.objects[name] for name in names]
+        with profile_stage(f"tile {key}"):
+            with profile_stage("hidden_geometry"):
+                remove_hidden_geometry(objects)
+            with profile_stage("decimate"):
+                tris_before, tris_after = decimate_meshes(objects)
+            with profile_stage("merge"):
+                objects, merge_stats = merge_visual_meshes(objects)
+                tag_tiles(objects)
+            with profile_stage("export"):
+                glb_path = os.path.join(output_dir, "tiles", f"tile_{key}.glb")
+                size = export_visual(glb_path, objects)
+        stats = {
+            "triangles_before": tris_before,
+            "triangles_after": tris_after,
+            "bytes": size,
+            "merge": merge_stats,
+        }
+        with open(os.path.join(output_dir, "tiles", f"tile_{key}.json"), 'w') as f:
+            json.dump(stats, f, indent=2)
+        print(f"  Exported {glb_path} ({size / 1024:.0f} KB)")
+
+        # Free the tile before moving on
+        bpy.data.batch_remove(objects)
+
+
+def run_parallel(blend_path, output_dir, jobs, force=False):
+    """Dispatch per-tile work to background Blender workers and bake the
+    city-wide data (colliders, navmesh, PVS) here while they run.
+
+    Every stage is keyed on content hashes stored in <output_dir>/.cache,
+    so a rerun only re-exports tiles, re-decomposes buildings and re-bakes
+    navmesh tiles whose inputs changed. --force ignores the cache.
+    """
+    meshes = open_map(blend_path)
+    tiles_dir = os.path.join(output_dir, "tiles")
+    cache_dir = os.path.join(output_dir, ".cache")
+    worker_dir = os.path.join(cache_dir, "workers")
+    os.makedirs(tiles_dir, exist_ok=True)
+    pipeline = pipeline_hash()
+    caches = {name: {} if force else load_cache(cache_dir, name, pipeline)
+              for name in ("tiles", "colliders", "navmesh", "pvs")}
+
+    with profile_stage("scale"):
+        print("\n[1/9] CHECKING SCALE...")
+        buildings = [obj for obj in meshes if 'building' in obj.name.lower()]
+        check_scale(buildings)
+
+    with profile_stage("recenter"):
+        print("\n[2/9] RECENTERING TO ORIGIN...")
+        # Hash before recentering: the offset moves with any edit to the map's
+        # bounds and must not invalidate untouched objects
+        fingerprints = {obj.name: object_fingerprint(obj) for obj in meshes if obj.data is not None}
+        center, width, depth = measure_recenter(meshes)
+        offset = snap_offset(center)
+        # The snapped map is off-center by up to half a tile; widen the
+        # symmetric extent so the ground and navmesh still cover it
+        width += 2 * abs(center[0] - offset[0])
+        depth += 2 * abs(center[1] - offset[1])
+        apply_offset(bpy.data.objects, offset)
+        print(f"  Map size: {width:.0f} x {depth:.0f} meters")
+
+    with profile_stage("dispatch"):
+        print("\n[3/9] HASHING AND DISPATCHING TILES...")
+        tiles = {}
+        for obj in meshes:
+            if obj.data is not None:
+                tiles.setdefault(tile_of(obj), []).append(obj)
+
+        tile_prints = {}
+        dirty = {}
+        for tile, objects in tiles.items():
+            key = f"{tile[0]}_{tile[1]}"
+            # Tile GLBs are exported recentered, so the offset is part of their key
+            tile_prints[key] = combine_fingerprints(tile_fingerprint(objects, fingerprints), *offset)
+            exported = all(os.path.exists(os.path.join(tiles_dir, f"tile_{key}.{ext}")) for ext in ("glb", "json"))
+            if not exported or caches["tiles"].get(key) != tile_prints[key]:
+                dirty[tile] = objects
+
+        # Drop exports of tiles that no longer exist in the map
+        for key in set(caches["tiles"]) - set(tile_prints):
+            for ext in ("glb", "json"):
+                path = os.path.join(tiles_dir, f"tile_{key}.{ext}")
+                if os.path.exists(path):
+                    os.remove(path)
+
+        shards = plan_shards(dirty, jobs)
+        workers = launch_workers(blend_path, output_dir, worker_dir, shards, offset)
+        print(f"  {len(tiles)} tiles, {len(dirty)} changed, dispatched in {len(shards)} shards")
+
+    with profile_stage("colliders"):
+        print("\n[4/9] CREATING COLLISION MESHES...")
+        colliders, collider_stats = create_colliders(buildings, width, depth, caches["colliders"], fingerprints, offset)
+        print(f"  Created {len(colliders)} colliders (1 ground + {len(colliders)-1} building parts)")
+
+    with profile_stage("navmesh"):
+        print("\n[5/9] BAKING NAVIGATION MESH...")
+        navmesh_stats, ground_z = bake_navmesh(colliders, width, depth, output_dir, caches["navmesh"])
+
+    with profile_stage("pvs"):
+        print("\n[6/9] COMPUTING POTENTIALLY VISIBLE SETS...")
+        pvs, pvs_average = compute_pvs_stage(colliders, tag_tiles(meshes), ground_z, caches["pvs"])
+
+    with profile_stage("export_collision"):
+        print("\n[7/9] EXPORTING COLLISION AND SPAWN POINT...")
+        col_size = export_collision(output_dir, colliders)
+        # Tiles hold only meshes; map-wide nodes like the spawn go in scene.glb
+        export_selected(os.path.join(output_dir, "scene.glb"), [add_spawn_point()], export_materials='NONE')
+
+    with profile_stage("wait_workers"):
+        print("\n[8/9] WAITING FOR TILE WORKERS...")
+        wait_for_workers(workers)
+        tile_files = []
+        tile_stats = []
+        for key in tile_prints:
+            with open(os.path.join(tiles_dir, f"tile_{key}.json")) as f:
+                tile_stats.append(json.load(f))
+            tx, ty = (int(v) for v in key.split("_"))
+            tile_files.append({"x": tx, "y": ty, "file": f"tiles/tile_{key}.glb"})
+        tile_files.sort(key=lambda t: (t["y"], t["x"]))
+        print(f"  {len(dirty)} tiles exported, {len(tiles) - len(dirty)} reused")
+
+    with profile_stage("manifest"):
+        print("\n[9/9] CREATING MANIFEST...")
+        tris_before = sum(t["triangles_before"] for t in tile_stats)
+        tris_after = sum(t["triangles_after"] for t in tile_stats)
+        merge_stats = {"tile_size": TILE_SIZE}
+        for key in ("merged_groups", "objects_before", "objects_after",
+                    "draw_calls_before", "draw_calls_after", "draw_calls_saved"):
+            merge_stats[key] = sum(t["merge"][key] for t in tile_stats)
+        stats = {
+            "triangles_before": tris_before,
+            "triangles_after": tris_after,
+            "colliders": len(colliders),
+            "collider_shapes": collider_stats,
+            "reduction": reduction_label(tris_before, tris_after),
+            "navmesh": navmesh_stats,
+            "pvs_average_visible_tiles": round(pvs_average, 1),
+            "merge": merge_stats,
+            "workers": len(shards),
+            "tiles_rebuilt": len(dirty),
+        }
+        write_manifest(output_dir, width, depth, stats, pvs, {"tiles": tile_files, "scene": "scene.glb"})
+
+        # Only record results once everything they describe is on disk
+        caches["tiles"] = tile_prints
+        for name, entries in caches.items():
+            save_cache(cache_dir, name, pipeline, entries)
+
+    write_profile(output_dir, [os.path.join(worker_dir, f"shard_{index}.profile.json") for index in range(len(shards))])
+    visual_mb = sum(t["bytes"] for t in tile_stats) / 1024 / 1024
+    print_summary(output_dir, stats, col_size, f"{len(tile_files)} tiles ({visual_mb:.1f} MB)")
+
+
+def parse_args():
+    args = sys.argv[sys.argv.index('--') + 1:]
+    if len(args) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    options = {'jobs': None, 'worker': None, 'force': False}
+    i = 2
+    while i < len(args):
+        if args[i] == '--jobs' and i + 1 < len(args):
+            # Leave a core for the main process's collider/navmesh/PVS bake
+            options['jobs'] = int(args[i + 1]) or max(1, (os.cpu_count() or 1) - 1)
+            i += 2
+        elif args[i] == '--force':
+            options['force'] = True
+            i += 1
+        elif args[i] == '--worker' and i + 1 < len(args):
+            options['worker'] = args[i + 1]
+            i += 2
+        else:
+            i += 1
+
+    return os.path.abspath(args[0]), os.path.abspath(args[1]), options
+
+
+def main():
+    blend_path, output_dir, options = parse_args()
+
+    if options['worker']:
+        try:
+            run_tile_worker(blend_path, output_dir, options['worker'])
+        finally:
+            save_profile(options['worker'].replace(".json", ".profile.json"))
+        return
+
+    print(f"\n{'='*70}")
+    print("GAME-READY MAP CLEANUP")
+    print(f"{'='*70}")
+    print(f"Input: {blend_path}")
+    print(f"Output: {output_dir}")
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    try:
+        if options['jobs']:
+            run_parallel(blend_path, output_dir, options['jobs'], options['force'])
+        else:
+            run_serial(blend_path, output_dir)
+    except Exception:
+        write_profile(output_dir)  # Keep the failed stage's record
+        raise
+
+
+if __name__ == "__main__":
+    main()
@@ -5,12 +5,15 @@ Run with: blender --background "<blend_file>" --python <this_script>
 
 import bpy
 import os
+import subprocess
+import sys
 
 # Paths
 script_dir = os.path.dirname(os.path.abspath(__file__))
 project_dir = os.path.dirname(script_dir)
 texture_dir = os.path.join(project_dir, "public/models/Foliage/Trees/Palm Tree Model_and_textures/Textures JPG")
 output_path = os.path.join(project_dir, "public/models/Foliage/Trees/palm_tree.glb")
+compressor = os.path.join(project_dir, "..", "..", "scripts", "compress-glb-textures.py")
 
 print(f"Texture dir: {texture_dir}")
 print(f"Output path: {output_path}")
@@ -162,3 +165,10 @@ print(f"\n✓ Export complete: {output_path}")
 if os.path.exists(output_path):
     size_mb = os.path.getsize(output_path) / 1024 / 1024
     print(f"  File size: {size_mb:.2f} MB")
+
+# Resize to the Foliage texture budget and re-encode as WebP, which the game
+# loads directly (no KTX2Loader yet), so no PNG/JPEG fallback is kept
+print("\n=== COMPRESSING TEXTURES ===")
+result = subprocess.run([sys.executable, compressor, output_path, "--format", "webp", "--no-fallback"])
+if result.returncode != 0:
+    print("  ⚠ Texture compression failed, keeping uncompressed textures")
@@ -0,0 +1,651 @@
+"""
+Character Export Pipeline
+=========================
+Exports a rigged character .blend to a web-ready GLB in stages:
+
+  relink     point broken image paths at local texture files, resolved
+             through a persisted filename index of texture_dirs (report in
+             <cache>/relink_report.json)
+  pack       embed image pixel data in the .blend
+  decimate   collapse-decimate meshes to the configured ratio ("skinned"
+             mode protects seams/weight boundaries, caps influences and
+             drops unused joints)
+  materials  reload missing images, wire loose textures into Base Color
+  export     write the GLB (optionally compressing its textures)
+
+Every stage saves a .blend snapshot in the cache directory together with a
+key hashed from the source .blend, this script and the stage's inputs. A
+rerun resumes from the last snapshot whose key still matches, so changing
+only the decimate ratio skips relinking and packing.
+
+Usage:
+  blender --background --python export_character.py -- <config.json> [options]
+
+Options:
+  --force          Ignore cached snapshots and run every stage
+  --from <stage>   Rerun from this stage even if it is cached
+
+Config (paths relative to the config file):
+  {
+    "blend": "Char.blend",
+    "output": "bandit.glb",
+    "texture_dirs": ["."],
+    "decimate": {"ratio": 0.15, "objects": {"Face": 0.4}, "mode": "skinned"},
+    "export": {"export_tangents": false},
+    "textures": {"format": "ktx2", "max_size": 2048}
+  }
+
+Decimate "mode" is "plain" (default) or "skinned"; skinned also accepts
+"protect_factor" (how strongly boundary vertices resist collapsing, default
+10) and "max_influences" (default 4).
+
+"decimate", "export" and "textures" are optional; "textures": null keeps
+the exported PNG/JPEGs. The game registers no KTX2Loader yet, so in-game
+characters should stay on null (or "webp") until it does. See characters/
+for the shipped configs.
+"""
+
+import bpy
+import hashlib
+import json
+import numpy as np
+import os
+import subprocess
+import sys
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+COMPRESSOR = os.path.join(SCRIPT_DIR, "..", "..", "..", "scripts", "compress-glb-textures.py")
+STAGES = ["relink", "pack", "decimate", "materials", "export"]
+
+DEFAULT_DECIMATE_RATIO = 0.15
+DEFAULT_PROTECT_FACTOR = 10.0
+DEFAULT_MAX_INFLUENCES = 4
+PROTECT_GROUP = "Decimate_Protect"
+DEFAULT_EXPORT_SETTINGS = {
+    "export_format": 'GLB',
+    "use_selection": False,
+    "export_apply": True,
+    "export_texcoords": True,
+    "export_normals": True,
+    "export_tangents": False,
+    "export_materials": 'EXPORT',
+    "export_image_format": 'AUTO',
+    "export_animations": True,
+    "export_skins": True,
+    "export_all_influences": True,
+}
+
+
+# ============================================================
+# CONFIG
+# ============================================================
+
+def load_config(path):
+    """Read the config and resolve its paths against the config's folder"""
+    with open(path) as f:
+        config = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    name = os.path.splitext(os.path.basename(path))[0]
+    config["name"] = name
+    config["blend"] = os.path.join(base, config["blend"])
+    config["output"] = os.path.join(base, config["output"])
+    config["texture_dirs"] = [os.path.join(base, d) for d in config.get("texture_dirs", ["."])]
+    config["cache_dir"] = os.path.join(base, config.get("cache_dir", ".export_cache"), name)
+    return config
+
+
+def parse_args():
+    argv = sys.argv
+    args = argv[argv.index("--") + 1:] if "--" in argv else []
+    options = {"config": None, "force": False, "from": None}
+    i = 0
+    while i < len(args):
+        if args[i] == "--force":
+            options["force"] = True
+            i += 1
+        elif args[i] == "--from" and i + 1 < len(args) and args[i + 1] in STAGES:
+            options["from"] = args[i + 1]
+            i += 2
+        elif not args[i].startswith("--") and options["config"] is None:
+            options["config"] = args[i]
+            i += 1
+        else:
+            print(__doc__)
+            sys.exit(1)
+    if options["config"] is None:
+        print(__doc__)
+        sys.exit(1)
+    return options
+
+
+# ============================================================
+# CACHE
+# ============================================================
+
+def file_hash(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def texture_listing(config):
+    """Sizes and mtimes of the indexed textures; relink and pack read these files"""
+    listing = []
+    for path in load_texture_index(config)["files"]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        listing.append([path, stat.st_size, int(stat.st_mtime)])
+    return listing
+
+
+def stage_inputs(stage, config):
+    """Everything outside the .blend that a stage's result depends on"""
+    if stage == "relink":
+        return texture_listing(config)
+    if stage == "decimate":
+        return config.get("decimate", {})
+    if stage == "export":
+        return [config.get("export", {}), config.get("textures"), config["output"]]
+    return None
+
+
+def stage_keys(config):
+    """Chained keys: a stage's key changes whenever anything before it does"""
+    key = hashlib.sha1(f"{file_hash(config['blend'])}:{file_hash(__file__)}".encode()).hexdigest()
+    keys = {}
+    for stage in STAGES:
+        payload = json.dumps([key, stage, stage_inputs(stage, config)], sort_keys=True)
+        key = hashlib.sha1(payload.encode()).hexdigest()
+        keys[stage] = key
+    return keys
+
+
+def snapshot_path(config, stage):
+    return os.path.join(config["cache_dir"], f"{stage}.blend")
+
+
+def load_manifest(config):
+    path = os.path.join(config["cache_dir"], "manifest.json")
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(config, manifest):
+    path = os.path.join(config["cache_dir"], "manifest.json")
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def is_cached(config, manifest, keys, stage):
+    if manifest.get(stage) != keys[stage]:
+        return False
+    if stage == "export":
+        return os.path.exists(config["output"])
+    return os.path.exists(snapshot_path(config, stage))
+
+
+def save_snapshot(config, stage):
+    os.makedirs(config["cache_dir"], exist_ok=True)
+    bpy.ops.wm.save_as_mainfile(filepath=snapshot_path(config, stage), copy=True, compress=False)
+
+
+# ============================================================
+# TEXTURE INDEX
+# ============================================================
+
+TEXTURE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".tga", ".tif", ".tiff", ".bmp", ".webp", ".exr")
+TEXTURE_INDEX_VERSION = 1
+
+
+def strip_number_suffix(name):
+    """'jacket_combined.003' -> 'jacket_combined'"""
+    base, _, suffix = name.rpartition(".")
+    return base if base and suffix.isdigit() else name
+
+
+def normalize_stem(name):
+    """Fuzzy key: 'Jacket-Combined.003.PNG' and 'jacket_combined.png' -> 'jacketcombined'"""
+    stem = strip_number_suffix(os.path.basename(name).lower())
+    root, ext = os.path.splitext(stem)
+    if ext in TEXTURE_EXTENSIONS:
+        stem = strip_number_suffix(root)
+    return "".join(c for c in stem if c.isalnum())
+
+
+def scan_textures(roots):
+    """Walk the texture roots once: every image file plus each directory's mtime"""
+    dirs = {}
+    files = []
+    for root_dir in roots:
+        for root, subdirs, names in os.walk(root_dir):
+            subdirs[:] = sorted(d for d in subdirs if not d.startswith("."))
+            dirs[root] = os.stat(root).st_mtime_ns
+            files.extend(os.path.join(root, n) for n in sorted(names) if n.lower().endswith(TEXTURE_EXTENSIONS))
+    return {"version": TEXTURE_INDEX_VERSION, "roots": roots, "dirs": dirs, "files": files}
+
+
+def index_is_fresh(index, roots):
+    """Adding, removing or renaming a file bumps its directory's mtime, so
+    stat'ing the known directories is enough to trust the saved index"""
+    if index.get("version") != TEXTURE_INDEX_VERSION or index.get("roots") != roots:
+        return False
+    for path, mtime in index["dirs"].items():
+        try:
+            if os.stat(path).st_mtime_ns != mtime:
+                return False
+        except OSError:
+            return False
+    return True
+
+
+def load_texture_index(config):
+    """Filename index of the texture dirs, rebuilt only when a directory changed"""
+    roots = [os.path.abspath(d) for d in config["texture_dirs"] if os.path.isdir(d)]
+    path = os.path.join(config["cache_dir"], "texture_index.json")
+    index = None
+    if os.path.exists(path):
+        with open(path) as f:
+            index = json.load(f)
+    if index is None or not index_is_fresh(index, roots):
+        index = scan_textures(roots)
+        os.makedirs(config["cache_dir"], exist_ok=True)
+        with open(path + ".tmp", "w") as f:
+            json.dump(index, f)
+        os.replace(path + ".tmp", path)
+        print(f"  Indexed {len(index['files'])} textures in {len(index['dirs'])} directories")
+    else:
+        print(f"  Texture index up to date ({len(index['files'])} textures)")
+
+    index["paths"] = set(index["files"])
+    index["by_name"] = {}
+    index["by_stem"] = {}
+    for file_path in index["files"]:
+        index["by_name"].setdefault(os.path.basename(file_path).lower(), []).append(file_path)
+        index["by_stem"].setdefault(normalize_stem(file_path), []).append(file_path)
+    # Longest stems first so prefix matches pick the most specific file
+    index["stems"] = sorted(index["by_stem"], key=len, reverse=True)
+    return index
+
+
+def resolve_texture(index, img):
+    """(path, how) for an image from the index alone, or (None, None)"""
+    wanted = os.path.basename(img.filepath.replace("\\", "/"))
+    ext = os.path.splitext(wanted)[1].lower()
+
+    def pick(candidates):
+        # Same extension as the original wins, then root order
+        return sorted(candidates, key=lambda p: not p.lower().endswith(ext) if ext else False)[0]
+
+    if wanted and wanted.lower() in index["by_name"]:
+        return pick(index["by_name"][wanted.lower()]), "filename"
+    for how, key in (("stem", normalize_stem(wanted)), ("name", normalize_stem(img.name))):
+        if key and key in index["by_stem"]:
+            return pick(index["by_stem"][key]), how
+    key = normalize_stem(img.name)
+    for stem in index["stems"]:
+        if stem and key.startswith(stem):
+            return pick(index["by_stem"][stem]), "prefix"
+    return None, None
+
+
+# ============================================================
+# STAGES
+# ============================================================
+
+def stage_relink(config):
+    """Relink every missing file image in one pass against the texture index.
+
+    Images whose file exists are left alone, even outside texture_dirs, so a
+    valid link is never re-pointed by a fuzzy match.
+    """
+    index = load_texture_index(config)
+    report = {"resolved": [], "unchanged": [], "unresolved": []}
+    for img in bpy.data.images:
+        if img.type != 'IMAGE' or img.source != 'FILE' or img.packed_file:
+            continue
+        current = os.path.abspath(bpy.path.abspath(img.filepath)) if img.filepath else ""
+        if current in index["paths"] or os.path.isfile(current):
+            report["unchanged"].append({"image": img.name, "path": current})
+            continue
+
+        path, how = resolve_texture(index, img)
+        if path is None:
+            report["unresolved"].append({"image": img.name, "filepath": img.filepath, "users": img.users})
+            continue
+        img.filepath = path
+        img.filepath_raw = path
+        try:
+            img.reload()
+        except RuntimeError as e:
+            report["unresolved"].append({"image": img.name, "filepath": path, "users": img.users, "error": str(e)})
+            continue
+        report["resolved"].append({"image": img.name, "path": path, "match": how})
+
+    report_path = os.path.join(config["cache_dir"], "relink_report.json")
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+    for entry in report["resolved"]:
+        print(f"  {entry['image']} -> {os.path.relpath(entry['path'])} ({entry['match']})")
+    for entry in report["unresolved"]:
+        print(f"  UNRESOLVED: {entry['image']} ({entry['filepath'] or 'no filepath'})")
+    if report["unresolved"]:
+        print(f"  See {report_path}")
+    return {key: len(entries) for key, entries in report.items()}
+
+
+def stage_pack(config):
+    """Embed pixel data so snapshots and the exporter never chase file paths"""
+    packed = 0
+    failed = 0
+    for img in bpy.data.images:
+        if img.type != 'IMAGE' or img.source != 'FILE' or img.packed_file:
+            continue
+        try:
+            img.pack()
+            packed += 1
+        except RuntimeError as e:
+            print(f"  {img.name}: pack failed: {e}")
+            failed += 1
+    return {"packed": packed, "failed": failed}
+
+
+def skin_armature(obj):
+    return next((m.object for m in obj.modifiers if m.type == 'ARMATURE' and m.object), None)
+
+
+def dominant_bones(obj, bone_names):
+    """Per vertex: index of the strongest deform group (-1 if unweighted) and influence count"""
+    deform = {g.index for g in obj.vertex_groups if g.name in bone_names}
+    dominant = np.full(len(obj.data.vertices), -1, dtype=np.int32)
+    influences = np.zeros(len(obj.data.vertices), dtype=np.int32)
+    for v in obj.data.vertices:
+        weights = [(g.weight, g.group) for g in v.groups if g.group in deform and g.weight > 0]
+        if weights:
+            dominant[v.index] = max(weights)[1]
+            influences[v.index] = len(weights)
+    return dominant, influences
+
+
+def boundary_vertices(obj, bone_names):
+    """Vertices on UV seams, material borders or skin-weight boundaries.
+
+    Collapsing these is what tears UVs and smears weights across joints, so
+    they go into a vertex group that makes the decimator avoid them.
+    """
+    mesh = obj.data
+    loop_count = len(mesh.loops)
+    protect = np.zeros(len(mesh.vertices), dtype=bool)
+
+    loop_verts = np.empty(loop_count, dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_verts)
+
+    def split_vertices(values):
+        # A vertex whose loops disagree on a per-loop value sits on a border
+        pairs = np.unique(np.column_stack([loop_verts, values]), axis=0)
+        counts = np.bincount(pairs[:, 0].astype(np.int64), minlength=len(mesh.vertices))
+        return counts > 1
+
+    if mesh.uv_layers.active:
+        uvs = np.empty(loop_count * 2, dtype=np.float32)
+        mesh.uv_layers.active.data.foreach_get("uv", uvs)
+        uv_keys = np.round(uvs.reshape(-1, 2) * 4096).astype(np.int64)
+        protect |= split_vertices(uv_keys[:, 0] * 8192 + uv_keys[:, 1])
+
+    if len(mesh.materials) > 1:
+        face_materials = np.empty(len(mesh.polygons), dtype=np.int32)
+        mesh.polygons.foreach_get("material_index", face_materials)
+        loop_totals = np.empty(len(mesh.polygons), dtype=np.int32)
+        mesh.polygons.foreach_get("loop_total", loop_totals)
+        protect |= split_vertices(np.repeat(face_materials, loop_totals))
+
+    if bone_names:
+        dominant, _ = dominant_bones(obj, bone_names)
+        edges = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+        mesh.edges.foreach_get("vertices", edges)
+        edges = edges.reshape(-1, 2)
+        crossing = dominant[edges[:, 0]] != dominant[edges[:, 1]]
+        protect[edges[crossing].ravel()] = True
+
+    return np.flatnonzero(protect)
+
+
+def limit_influences(obj, max_influences):
+    """Drop near-zero weights, keep the strongest N deform groups, renormalize"""
+    bpy.context.view_layer.objects.active = obj
+    bpy.ops.object.vertex_group_clean(group_select_mode='BONE_DEFORM', limit=0.001)
+    bpy.ops.object.vertex_group_limit_total(group_select_mode='BONE_DEFORM', limit=max_influences)
+    bpy.ops.object.vertex_group_normalize_all(group_select_mode='BONE_DEFORM', lock_active=False)
+
+
+def compact_joints(armature, meshes):
+    """Export only the bones vertices are weighted to, plus their ancestors
+
+    The exporter runs deform-only, so every kept ancestor is marked deform
+    too; otherwise a non-deform root/control bone would drop out of the
+    skin and its children would lose their parent.
+    """
+    used = set()
+    for obj in meshes:
+        names = {g.index: g.name for g in obj.vertex_groups}
+        for v in obj.data.vertices:
+            used.update(names[g.group] for g in v.groups if g.weight > 0)
+
+    keep = set()
+    for bone in armature.data.bones:
+        if bone.name in used:
+            keep.add(bone.name)
+            keep.update(parent.name for parent in bone.parent_recursive)
+
+    before = sum(1 for b in armature.data.bones if b.use_deform)
+    for bone in armature.data.bones:
+        bone.use_deform = bone.name in keep
+    for obj in meshes:
+        for group in list(obj.vertex_groups):
+            if group.name in armature.data.bones and group.name not in keep:
+                obj.vertex_groups.remove(group)
+    after = sum(1 for b in armature.data.bones if b.use_deform)
+    print(f"  {armature.name}: {before} -> {after} joints")
+    return before, after
+
+
+def stage_decimate(config):
+    """Collapse-decimate every mesh; per-object ratios override the default"""
+    settings = config.get("decimate", {})
+    default_ratio = settings.get("ratio", DEFAULT_DECIMATE_RATIO)
+    overrides = settings.get("objects", {})
+    skinned = settings.get("mode", "plain") == "skinned"
+    max_influences = settings.get("max_influences", DEFAULT_MAX_INFLUENCES)
+
+    if bpy.context.active_object and bpy.context.active_object.mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode='OBJECT')
+    bpy.ops.object.select_all(action='DESELECT')
+
+    stats = {"vertices_before": 0, "vertices_after": 0, "protected": 0,
+             "max_influences_before": 0, "max_influences_after": 0}
+    armatures = {}
+    for obj in [o for o in bpy.data.objects if o.type == 'MESH']:
+        obj.hide_viewport = False
+        obj.hide_render = False
+        obj.hide_set(False)
+        before = len(obj.data.vertices)
+        stats["vertices_before"] += before
+
+        armature = skin_armature(obj) if skinned else None
+        bone_names = {b.name for b in armature.data.bones if b.use_deform} if armature else set()
+        if armature:
+            armatures.setdefault(armature, []).append(obj)
+            stats["max_influences_before"] = max(stats["max_influences_before"],
+                                                 int(dominant_bones(obj, bone_names)[1].max(initial=0)))
+
+        ratio = overrides.get(obj.name, default_ratio)
+        if ratio < 1.0:
+            bpy.context.view_layer.objects.active = obj
+            obj.select_set(True)
+            for mod in list(obj.modifiers):
+                if mod.type == 'DECIMATE':
+                    obj.modifiers.remove(mod)
+            if obj.data.users > 1:
+                bpy.ops.object.make_single_user(object=True, obdata=True)
+            decimate = obj.modifiers.new("Decimate_Export", 'DECIMATE')
+            decimate.decimate_type = 'COLLAPSE'
+            decimate.ratio = ratio
+            decimate.use_collapse_triangulate = True
+
+            if skinned:
+                # Protected vertices get weight 1; inverted, that makes their edges
+                # expensive to collapse while the rest decimates normally
+                protected = boundary_vertices(obj, bone_names)
+                group = obj.vertex_groups.get(PROTECT_GROUP) or obj.vertex_groups.new(name=PROTECT_GROUP)
+                group.add(protected.tolist(), 1.0, 'REPLACE')
+                decimate.vertex_group = PROTECT_GROUP
+                decimate.invert_vertex_group = True
+                decimate.vertex_group_factor = settings.get("protect_factor", DEFAULT_PROTECT_FACTOR)
+                stats["protected"] += len(protected)
+
+            # Modifiers run in stack order; decimate must see the rest pose
+            bpy.ops.object.modifier_move_to_index(modifier="Decimate_Export", index=0)
+            bpy.ops.object.modifier_apply(modifier="Decimate_Export")
+            if PROTECT_GROUP in obj.vertex_groups:
+                obj.vertex_groups.remove(obj.vertex_groups[PROTECT_GROUP])
+            obj.select_set(False)
+
+        if armature:
+            limit_influences(obj, max_influences)
+            stats["max_influences_after"] = max(stats["max_influences_after"],
+                                                int(dominant_bones(obj, bone_names)[1].max(initial=0)))
+
+        after = len(obj.data.vertices)
+        stats["vertices_after"] += after
+        print(f"  {obj.name}: {before:,} -> {after:,} (ratio {ratio})")
+
+    if skinned:
+        stats["joints_before"] = 0
+        stats["joints_after"] = 0
+        for armature, meshes in armatures.items():
+            before, after = compact_joints(armature, meshes)
+            stats["joints_before"] += before
+            stats["joints_after"] += after
+    return stats
+
+
+def stage_materials(config):
+    """Reload images that lost their data and connect stray textures to Base Color"""
+    reloaded = 0
+    connected = 0
+    for mat in bpy.data.materials:
+        if not mat.use_nodes or not mat.node_tree:
+            continue
+        principled = next((n for n in mat.node_tree.nodes if n.type == 'BSDF_PRINCIPLED'), None)
+        if principled is None:
+            print(f"  {mat.name}: no Principled BSDF, skipping")
+            continue
+
+        base_color = principled.inputs.get('Base Color')
+        if base_color is None:
+            continue
+        if base_color.is_linked:
+            node = base_color.links[0].from_node
+            if node.type == 'TEX_IMAGE' and node.image and not node.image.has_data:
+                node.image.reload()
+                reloaded += 1
+        else:
+            node = next((n for n in mat.node_tree.nodes if n.type == 'TEX_IMAGE' and n.image), None)
+            if node:
+                mat.node_tree.links.new(node.outputs['Color'], base_color)
+                print(f"  {mat.name}: connected {node.image.name} to Base Color")
+                connected += 1
+    return {"reloaded": reloaded, "connected": connected}
+
+
+def stage_export(config):
+    output = config["output"]
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    bpy.ops.object.select_all(action='SELECT')
+    settings = dict(DEFAULT_EXPORT_SETTINGS)
+    if config.get("decimate", {}).get("mode") == "skinned":
+        # Only the joints compact_joints left deforming; at most 4 influences
+        settings.update(export_def_bones=True, export_all_influences=False)
+    settings.update(config.get("export", {}))
+    bpy.ops.export_scene.gltf(filepath=output, **settings)
+    stats = {"file_mb": round(os.path.getsize(output) / (1024 * 1024), 2)}
+
+    textures = config.get("textures")
+    if textures:
+        command = [sys.executable, COMPRESSOR, output, "--format", textures.get("format", "ktx2")]
+        if textures.get("max_size"):
+            command += ["--max-size", str(textures["max_size"])]
+        if subprocess.run(command).returncode != 0:
+            print("  WARNING: texture compression failed, keeping uncompressed textures")
+        stats["compressed_mb"] = round(os.path.getsize(output) / (1024 * 1024), 2)
+    return stats
+
+
+STAGE_FUNCTIONS = {
+    "relink": stage_relink,
+    "pack": stage_pack,
+    "decimate": stage_decimate,
+    "materials": stage_materials,
+    "export": stage_export,
+}
+
+
+# ============================================================
+# MAIN
+# ============================================================
+
+def main():
+    options = parse_args()
+    config = load_config(options["config"])
+
+    print("=" * 60)
+    print(f"CHARACTER EXPORT: {config['name']}")
+    print("=" * 60)
+
+    keys = stage_keys(config)
+    manifest = {} if options["force"] else load_manifest(config)
+
+    # Resume after the last stage whose snapshot is still valid
+    start = 0
+    for i, stage in enumerate(STAGES):
+        if stage == options["from"] or not is_cached(config, manifest, keys, stage):
+            break
+        start = i + 1
+
+    if start == len(STAGES):
+        print(f"\nUp to date: {config['output']}")
+        return
+
+    if start == 0:
+        print(f"\nOpening {config['blend']}")
+        bpy.ops.wm.open_mainfile(filepath=config["blend"])
+    else:
+        print(f"\nResuming from cached '{STAGES[start - 1]}' snapshot")
+        bpy.ops.wm.open_mainfile(filepath=snapshot_path(config, STAGES[start - 1]))
+
+    for stage in STAGES[:start]:
+        print(f"  {stage:<10} cached")
+    for stage in STAGES[start:]:
+        print(f"\n--- {stage} ---")
+        started = time.time()
+        stats = STAGE_FUNCTIONS[stage](config)
+        if stage != "export":
+            save_snapshot(config, stage)
+        manifest[stage] = keys[stage]
+        save_manifest(config, manifest)
+        print(f"  {stage} done in {time.time() - started:.1f}s: {stats}")
+
+    print(f"\n{'=' * 60}")
+    print(f"EXPORTED: {config['output']}")
+    print(f"{'=' * 60}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,10 @@ Or run interactively in Blender's scripting tab.
 """
 
 import bpy
+import numpy as np
 import os
+import subprocess
+import sys
 
 # Configuration
 MODEL_DIR = "/Users/nolangriffis/Documents/Producer Tour Official Website/Producer-Tour-Website/producer-tour-react/apps/frontend/public/models/Cliffside/alaskan-cliff-rock-9-free"
@@ -19,10 +22,22 @@ OUTPUT_GLB = os.path.join(MODEL_DIR, "alaskan_cliff_rock.glb")
 # Target polygon count (aim for 10-20k for good balance)
 TARGET_POLYS = 15000
 
+# Post-export texture compression (see scripts/compress-glb-textures.py)
+# The game's GLTFLoader reads WebP but has no KTX2Loader, so KTX2 would only
+# add a payload next to the PNG it actually loads
+TEXTURE_FORMAT = "webp"  # "webp", "ktx2" or None to keep the PNGs
+TEXTURE_MAX_SIZE = 1024  # 2k source maps are overkill for an 8m rock
+COMPRESSOR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "scripts", "compress-glb-textures.py")
+
 # Texture paths
 ALBEDO_TEX = os.path.join(TEXTURE_DIR, "CliffRock_0009_2k_Albedo.png")
 NORMAL_TEX = os.path.join(TEXTURE_DIR, "CliffRock_0009_2k_Normal.png")
 ROUGHNESS_TEX = os.path.join(TEXTURE_DIR, "CliffRock_0009_2k_Roughness.png")
+AO_TEX = os.path.join(TEXTURE_DIR, "CliffRock_0009_2k_AO.png")  # optional
+METALLIC_TEX = os.path.join(TEXTURE_DIR, "CliffRock_0009_2k_Metallic.png")  # optional
+
+# Occlusion/Roughness/Metallic packed into R/G/B, glTF's metallicRoughness layout
+ORM_TEX = os.path.join(TEXTURE_DIR, "CliffRock_0009_2k_ORM.png")
 
 
 def clear_scene():
@@ -77,6 +92,66 @@ def decimate_mesh(obj, target_polys):
     return obj
 
 
+def load_channel(path, size, default):
+    """First channel of a grayscale map as a float array, or a constant if the map is missing"""
+    if not os.path.exists(path):
+        return np.full(size[0] * size[1], default, dtype=np.float32)
+    image = bpy.data.images.load(path)
+    image.colorspace_settings.name = 'Non-Color'
+    if tuple(image.size) != tuple(size):
+        image.scale(*size)
+    pixels = np.empty(size[0] * size[1] * 4, dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+    bpy.data.images.remove(image)
+    return pixels[0::4].copy()
+
+
+def pack_orm():
+    """Merge AO, roughness and metallic into one RGB image; returns (image, has_ao)"""
+    sources = [p for p in (AO_TEX, ROUGHNESS_TEX, METALLIC_TEX) if os.path.exists(p)]
+    if os.path.exists(ORM_TEX) and all(os.path.getmtime(ORM_TEX) >= os.path.getmtime(p) for p in sources):
+        print(f"ORM up to date: {os.path.basename(ORM_TEX)}")
+    else:
+        roughness = bpy.data.images.load(ROUGHNESS_TEX)
+        size = tuple(roughness.size)
+        bpy.data.images.remove(roughness)
+
+        pixels = np.ones((size[0] * size[1], 4), dtype=np.float32)
+        pixels[:, 0] = load_channel(AO_TEX, size, 1.0)
+        pixels[:, 1] = load_channel(ROUGHNESS_TEX, size, 1.0)
+        pixels[:, 2] = load_channel(METALLIC_TEX, size, 0.0)
+
+        orm = bpy.data.images.new("CliffRock_ORM", width=size[0], height=size[1], alpha=False, float_buffer=False)
+        orm.colorspace_settings.name = 'Non-Color'
+        orm.pixels.foreach_set(pixels.ravel())
+        orm.filepath_raw = ORM_TEX
+        orm.file_format = 'PNG'
+        orm.save()
+        bpy.data.images.remove(orm)
+
+        source_bytes = sum(os.path.getsize(p) for p in sources)
+        orm_bytes = os.path.getsize(ORM_TEX)
+        print(f"Packed {len(sources)} maps into {os.path.basename(ORM_TEX)} ({size[0]}x{size[1]})")
+        print(f"  {source_bytes / 1024:.0f} KB in {len(sources)} files -> {orm_bytes / 1024:.0f} KB in 1 "
+              f"({(source_bytes - orm_bytes) / 1024:.0f} KB saved, {len(sources) - 1} fewer texture fetches)")
+
+    image = bpy.data.images.load(ORM_TEX)
+    image.colorspace_settings.name = 'Non-Color'
+    return image, os.path.exists(AO_TEX)
+
+
+def gltf_output_group():
+    """The 'glTF Material Output' group the exporter reads occlusion from"""
+    group = bpy.data.node_groups.get("glTF Material Output")
+    if group is None:
+        group = bpy.data.node_groups.new("glTF Material Output", 'ShaderNodeTree')
+        if hasattr(group, "interface"):
+            group.interface.new_socket("Occlusion", in_out='INPUT', socket_type='NodeSocketFloat')
+        else:
+            group.inputs.new('NodeSocketFloat', "Occlusion")
+    return group
+
+
 def create_pbr_material(obj):
     """Create PBR material with textures"""
     # Create new material
@@ -110,17 +185,26 @@ def create_pbr_material(obj):
     normal_map = nodes.new('ShaderNodeNormalMap')
     normal_map.location = (-100, -100)
 
-    # Roughness
-    roughness_tex = nodes.new('ShaderNodeTexImage')
-    roughness_tex.location = (-400, -400)
-    roughness_tex.image = bpy.data.images.load(ROUGHNESS_TEX)
-    roughness_tex.image.colorspace_settings.name = 'Non-Color'
+    # Occlusion/Roughness/Metallic from one packed texture
+    orm_tex = nodes.new('ShaderNodeTexImage')
+    orm_tex.location = (-400, -400)
+    orm_tex.image, has_ao = pack_orm()
+
+    separate = nodes.new('ShaderNodeSeparateColor')
+    separate.location = (-100, -400)
 
     # Connect nodes
     links.new(albedo_tex.outputs['Color'], bsdf.inputs['Base Color'])
     links.new(normal_tex.outputs['Color'], normal_map.inputs['Color'])
     links.new(normal_map.outputs['Normal'], bsdf.inputs['Normal'])
-    links.new(roughness_tex.outputs['Color'], bsdf.inputs['Roughness'])
+    links.new(orm_tex.outputs['Color'], separate.inputs['Color'])
+    links.new(separate.outputs['Green'], bsdf.inputs['Roughness'])
+    links.new(separate.outputs['Blue'], bsdf.inputs['Metallic'])
+    if has_ao:
+        occlusion = nodes.new('ShaderNodeGroup')
+        occlusion.location = (0, -500)
+        occlusion.node_tree = gltf_output_group()
+        links.new(separate.outputs['Red'], occlusion.inputs['Occlusion'])
     links.new(bsdf.outputs['BSDF'], output.inputs['Surface'])
 
     # Assign material to object
@@ -184,6 +268,18 @@ def export_glb(output_path):
         print(f"Export complete! File size: {size_mb:.2f} MB")
 
 
+def compress_textures(output_path):
+    """Resize and re-encode the embedded PNGs in the exported GLB"""
+    print(f"Compressing textures as {TEXTURE_FORMAT} (max {TEXTURE_MAX_SIZE}px)")
+    command = [sys.executable, COMPRESSOR, output_path,
+               "--format", TEXTURE_FORMAT, "--max-size", str(TEXTURE_MAX_SIZE)]
+    if TEXTURE_FORMAT == "webp":
+        command.append("--no-fallback")  # The game loads the WebP; a PNG copy is dead weight
+    result = subprocess.run(command)
+    if result.returncode != 0:
+        print("WARNING: texture compression failed, keeping uncompressed textures")
+
+
 def main():
     print("\n" + "="*60)
     print("Processing Alaskan Cliff Rock Model")
@@ -216,6 +312,11 @@ def main():
     print("\nStep 6: Exporting GLB...")
     export_glb(OUTPUT_GLB)
 
+    # Step 7: Compress textures
+    if TEXTURE_FORMAT:
+        print("\nStep 7: Compressing textures...")
+        compress_textures(OUTPUT_GLB)
+
     print("\n" + "="*60)
     print("Processing complete!")
     print(f"Output: {OUTPUT_GLB}")
@@ -85,13 +85,16 @@ function hexToColor(hex: string): THREE.Color {
 
 /**
  * Create a tintable hair material
+ * Generated hair bakes per-style shading into vertex colors, which tint
+ * multiplies with; older assets without a color attribute render flat
  */
-function createHairMaterial(color: THREE.Color): THREE.MeshStandardMaterial {
+function createHairMaterial(color: THREE.Color, geometry?: THREE.BufferGeometry): THREE.MeshStandardMaterial {
   return new THREE.MeshStandardMaterial({
     color,
     roughness: 0.7,
     metalness: 0.0,
     side: THREE.DoubleSide,
+    vertexColors: !!geometry?.getAttribute('color'),
   });
 }
 
@@ -144,7 +147,7 @@ export function HairAttachment({
     clone.traverse((child) => {
       if ((child as THREE.Mesh).isMesh) {
         const mesh = child as THREE.Mesh;
-        mesh.material = createHairMaterial(primaryColor);
+        mesh.material = createHairMaterial(primaryColor, mesh.geometry);
         mesh.castShadow = true;
         mesh.receiveShadow = true;
       }
@@ -388,7 +391,7 @@ export function HairAttachmentBoneVersion({
         const mesh = child as THREE.Mesh;
 
         // Clone and replace material with our tintable one
-        const newMaterial = createHairMaterial(primaryColor);
+        const newMaterial = createHairMaterial(primaryColor, mesh.geometry);
         mesh.material = newMaterial;
 
         // Enable shadows
@@ -0,0 +1,19 @@
+/**
+ * Face Preset Library
+ * Shared with scripts/blender/render_thumbnails.py, which renders a
+ * thumbnail for every preset in facePresets.json
+ */
+
+import type { FacePreset, FacePresetLibrary } from './types';
+import library from './facePresets.json';
+
+export const FACE_PRESET_LIBRARY = library as FacePresetLibrary;
+
+export const FACE_PRESETS: FacePreset[] = FACE_PRESET_LIBRARY.presets;
+
+/**
+ * Look up a face preset by ID
+ */
+export function getFacePreset(id: string): FacePreset | undefined {
+  return FACE_PRESETS.find((preset) => preset.id === id);
+}
@@ -101,3 +101,28 @@ export interface AvatarConfigResponse {
   createdAt: string;
   updatedAt: string;
 }
+
+/**
+ * Face preset definition (see facePresets.json)
+ * Morph values range from -1 to 1
+ */
+export interface FacePreset {
+  id: string;
+  name: string;
+  /** Thumbnail image path */
+  thumbnailPath: string;
+  /** Morph values keyed by morph ID */
+  morphs: Record<string, number>;
+}
+
+/**
+ * Face preset library file shared with the thumbnail renderer
+ */
+export interface FacePresetLibrary {
+  version: number;
+  /** Min/max morph value */
+  morphRange: [number, number];
+  /** Morph ID -> shape key name on the base avatar */
+  morphTargets: Record<string, string>;
+  presets: FacePreset[];
+}
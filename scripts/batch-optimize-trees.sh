@@ -5,7 +5,10 @@
 # Processes all tree models in a directory
 #
 # Usage:
-#   ./batch-optimize-trees.sh <input_dir> <output_dir> [max_tris]
+#   ./batch-optimize-trees.sh <input_dir> <output_dir> [max_tris] [texture_format]
+#
+# texture_format is webp (default), ktx2 or none. The game has no KTX2Loader
+# yet, so ktx2 keeps the PNG/JPEG fallback it actually loads; webp drops it.
 #
 # Example:
 #   ./batch-optimize-trees.sh ~/Downloads/tree_pack ./public/models/Foliage/Trees 1500
@@ -13,10 +16,12 @@
 
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 OPTIMIZER="$SCRIPT_DIR/optimize-tree-model.py"
+COMPRESSOR="$SCRIPT_DIR/compress-glb-textures.py"
 
 INPUT_DIR="${1:-.}"
 OUTPUT_DIR="${2:-./optimized}"
 MAX_TRIS="${3:-1500}"
+TEXTURE_FORMAT="${4:-webp}"
 
 # Create output directory
 mkdir -p "$OUTPUT_DIR"
@@ -28,6 +33,7 @@ echo "=================================================="
 echo "Input:      $INPUT_DIR"
 echo "Output:     $OUTPUT_DIR"
 echo "Max tris:   $MAX_TRIS"
+echo "Textures:   $TEXTURE_FORMAT"
 echo "=================================================="
 echo ""
 
@@ -65,6 +71,17 @@ for file in "$INPUT_DIR"/*.{glb,gltf,fbx,obj} "$INPUT_DIR"/**/scene.gltf 2>/dev/
     ((count++))
 done
 
+# Compress all textures in one parallel pass
+if [ "$TEXTURE_FORMAT" != "none" ] && [ "$count" -gt 0 ]; then
+    echo "Compressing textures ($TEXTURE_FORMAT)..."
+    if [ "$TEXTURE_FORMAT" = "webp" ]; then
+        python3 "$COMPRESSOR" "$OUTPUT_DIR" --format webp --no-fallback
+    else
+        python3 "$COMPRESSOR" "$OUTPUT_DIR" --format "$TEXTURE_FORMAT"
+    fi
+    echo ""
+fi
+
 echo "=================================================="
 echo "Processed $count models"
 echo "Output directory: $OUTPUT_DIR"
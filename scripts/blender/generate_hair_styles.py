@@ -4,7 +4,23 @@ Generate procedural hair styles for the character creator.
 Creates 12 low-poly hair styles as separate GLB files.
 
 Usage:
-  blender --background --python generate_hair_styles.py -- <output_dir>
+  blender --background --python generate_hair_styles.py -- <output_dir> [--jobs N] [--styles a,b,...]
+
+Options:
+  --jobs N           Split the styles across N background Blender processes
+                     (0 = one per core)
+  --styles a,b,...   Only build these styles
+  --combined         Also write hair_styles.glb with every style's LOD0 as a
+                     separate mesh sharing one material
+
+All styles share one "Hair" material; per-style shading is baked into
+vertex colors, and hair_material.json describes the material for the client.
+
+Each style is exported as LOD0 (<style>.glb, within its triangle budget)
+plus <style>_lod1.glb and <style>_lod2.glb. hair_manifest.json records
+triangle counts, sizes and build times per style and LOD; a --styles run
+merges its entries into the existing manifest so the other styles stay
+listed.
 """
 
 import bpy
@@ -12,6 +28,10 @@ import bmesh
 import sys
 import os
 import math
+import numpy as np
+import json
+import time
+import subprocess
 from mathutils import Vector, Matrix
 
 def get_args():
@@ -32,20 +52,142 @@ def clear_scene():
         if block.users == 0:
             bpy.data.materials.remove(block)
 
+# The one material every hair style shares. Per-style look lives in the
+# vertex colors below, so the client can use a single hair material.
+HAIR_MATERIAL = {
+    'name': "Hair",
+    'baseColor': (0.15, 0.1, 0.07, 1.0),  # Dark brown default, tinted in the game
+    'roughness': 0.7,
+    'colorAttribute': "Color",
+}
+
+# Per-style vertex shading: (root shade, tip shade), multiplied with the
+# runtime hair color from the bottom of the mesh to the top
+HAIR_STYLE_SHADING = {
+    "buzzcut": (0.55, 0.8),
+    "short_fade": (0.45, 1.0),
+    "short_textured": (0.6, 1.0),
+    "curly_short": (0.65, 0.95),
+    "medium_wavy": (0.7, 1.0),
+    "medium_straight": (0.75, 1.0),
+    "afro_medium": (0.6, 0.9),
+    "long_straight": (0.85, 1.0),
+    "long_wavy": (0.8, 1.0),
+    "ponytail": (0.75, 1.0),
+    "braids": (0.6, 0.9),
+    "mohawk": (0.5, 1.0),
+}
+DEFAULT_SHADING = (0.7, 1.0)
+
 def create_hair_material():
-    """Create a simple tintable hair material"""
-    mat = bpy.data.materials.new(name="Hair")
+    """Get (or create once) the shared tintable hair material"""
+    mat = bpy.data.materials.get(HAIR_MATERIAL['name'])
+    if mat:
+        return mat
+
+    mat = bpy.data.materials.new(name=HAIR_MATERIAL['name'])
     mat.use_nodes = True
 
-    # Simple setup - the color will be changed in the game
+    # Simple setup - the color will be changed in the game. Base color is
+    # vertex shading x tint, which glTF exports as COLOR_0 x baseColorFactor,
+    # so all styles share this material.
     nodes = mat.node_tree.nodes
     bsdf = nodes.get("Principled BSDF")
     if bsdf:
-        bsdf.inputs["Base Color"].default_value = (0.15, 0.1, 0.07, 1.0)  # Dark brown default
-        bsdf.inputs["Roughness"].default_value = 0.7
+        bsdf.inputs["Roughness"].default_value = HAIR_MATERIAL['roughness']
+        shading = nodes.new('ShaderNodeVertexColor')
+        shading.layer_name = HAIR_MATERIAL['colorAttribute']
+        tint = nodes.new('ShaderNodeMix')
+        tint.name = "HairTint"
+        tint.data_type = 'RGBA'
+        tint.blend_type = 'MULTIPLY'
+        tint.inputs[0].default_value = 1.0
+        tint.inputs[7].default_value = HAIR_MATERIAL['baseColor']  # B (color)
+        mat.node_tree.links.new(shading.outputs["Color"], tint.inputs[6])  # A (color)
+        mat.node_tree.links.new(tint.outputs[2], bsdf.inputs["Base Color"])  # Result (color)
+    mat.diffuse_color = HAIR_MATERIAL['baseColor']
 
     return mat
 
+def paint_style_shading(hair, style_id):
+    """Bake the style's root-to-tip shade into a point color attribute"""
+    mesh = hair.data
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", co)
+    z = co.reshape(-1, 3)[:, 2]
+    height = (z - z.min()) / max(float(np.ptp(z)), 1e-6)
+
+    root, tip = HAIR_STYLE_SHADING.get(style_id, DEFAULT_SHADING)
+    colors = np.ones((len(z), 4), dtype=np.float32)
+    colors[:, :3] = (root + (tip - root) * height)[:, None]
+
+    attribute = mesh.color_attributes.get(HAIR_MATERIAL['colorAttribute'])
+    if attribute is None:
+        attribute = mesh.color_attributes.new(HAIR_MATERIAL['colorAttribute'], 'BYTE_COLOR', 'POINT')
+    attribute.data.foreach_set("color", colors.ravel())
+    mesh.color_attributes.active_color = attribute
+
+def write_material_definition(output_dir):
+    """hair_material.json: the shared material plus per-style shading, for the client"""
+    definition = {
+        **HAIR_MATERIAL,
+        'vertexColors': True,
+        'shading': {style_id: HAIR_STYLE_SHADING.get(style_id, DEFAULT_SHADING) for style_id, _ in STYLES},
+    }
+    with open(os.path.join(output_dir, 'hair_material.json'), 'w') as f:
+        json.dump(definition, f, indent=2)
+
+def build_combined(output_dir, results, output_path):
+    """Import every style's LOD0 into one scene and export them as separate
+    meshes that reference the single shared material"""
+    clear_scene()
+    shared = None
+    for result in results:
+        if result['status'] != "OK":
+            continue
+        before = set(bpy.data.objects.keys())
+        bpy.ops.import_scene.gltf(filepath=os.path.join(output_dir, result['file']))
+        for obj in bpy.data.objects:
+            if obj.name in before or obj.type != 'MESH':
+                continue
+            obj.name = f"Hair_{result['style']}"
+            shared = shared or obj.data.materials[0]
+            obj.data.materials[0] = shared
+
+    # Imports bring in "Hair.001", "Hair.002", ... - drop the duplicates
+    for mat in list(bpy.data.materials):
+        if mat.users == 0:
+            bpy.data.materials.remove(mat)
+    if shared:
+        shared.name = HAIR_MATERIAL['name']
+
+    bpy.ops.object.select_all(action='SELECT')
+    bpy.ops.export_scene.gltf(
+        filepath=output_path,
+        export_format='GLB',
+        use_selection=True,
+        export_materials='EXPORT',
+    )
+    print(f"  Exported combined: {output_path}")
+
+def get_coords(obj):
+    """Vertex coordinates as an (N, 3) array"""
+    co = np.empty(len(obj.data.vertices) * 3, dtype=np.float64)
+    obj.data.vertices.foreach_get("co", co)
+    return co.reshape(-1, 3)
+
+def set_coords(obj, co):
+    obj.data.vertices.foreach_set("co", co.ravel())
+    obj.data.update()
+
+def delete_verts_below(obj, z):
+    """Delete vertices under a height, without entering edit mode"""
+    bm = bmesh.new()
+    bm.from_mesh(obj.data)
+    bmesh.ops.delete(bm, geom=[v for v in bm.verts if v.co.z < z], context='VERTS')
+    bm.to_mesh(obj.data)
+    bm.free()
+
 def create_buzz_cut():
     """Very short buzz cut - simple scaled sphere cap"""
     bpy.ops.mesh.primitive_uv_sphere_add(radius=0.11, segments=16, ring_count=8)
@@ -53,13 +195,9 @@ def create_buzz_cut():
     hair.name = "Hair_BuzzCut"
 
     # Flatten bottom
-    bpy.ops.object.mode_set(mode='EDIT')
-    bm = bmesh.from_edit_mesh(hair.data)
-    for v in bm.verts:
-        if v.co.z < 0:
-            v.co.z = 0
-    bmesh.update_edit_mesh(hair.data)
-    bpy.ops.object.mode_set(mode='OBJECT')
+    co = get_coords(hair)
+    co[:, 2] = np.maximum(co[:, 2], 0)
+    set_coords(hair, co)
 
     return hair
 
@@ -70,16 +208,11 @@ def create_short_fade():
     hair.name = "Hair_ShortFade"
 
     # Add some detail with random displacement
-    bpy.ops.object.mode_set(mode='EDIT')
-    bm = bmesh.from_edit_mesh(hair.data)
-    import random
-    random.seed(42)
-    for v in bm.verts:
-        if v.co.z > 0.02:
-            v.co.x += random.uniform(-0.01, 0.01)
-            v.co.y += random.uniform(-0.01, 0.01)
-    bmesh.update_edit_mesh(hair.data)
-    bpy.ops.object.mode_set(mode='OBJECT')
+    rng = np.random.default_rng(42)
+    co = get_coords(hair)
+    top = co[:, 2] > 0.02
+    co[top, :2] += rng.uniform(-0.01, 0.01, (top.sum(), 2))
+    set_coords(hair, co)
 
     return hair
 
@@ -95,20 +228,15 @@ def create_short_textured():
     bpy.context.object.modifiers["Subdivision"].levels = 2
     bpy.ops.object.modifier_apply(modifier="Subdivision")
 
-    # Displace top vertices
-    bpy.ops.object.mode_set(mode='EDIT')
-    bm = bmesh.from_edit_mesh(hair.data)
-    import random
-    random.seed(43)
-    for v in bm.verts:
-        if v.co.z > 0.05:
-            v.co.z += random.uniform(0, 0.04)
-            v.co.x += random.uniform(-0.02, 0.02)
-            v.co.y += random.uniform(-0.02, 0.02)
-        elif v.co.z < -0.05:
-            v.co.z = max(v.co.z, -0.05)
-    bmesh.update_edit_mesh(hair.data)
-    bpy.ops.object.mode_set(mode='OBJECT')
+    # Displace top vertices, clamp the bottom
+    rng = np.random.default_rng(43)
+    co = get_coords(hair)
+    top = co[:, 2] > 0.05
+    bottom = co[:, 2] < -0.05
+    co[top, 2] += rng.uniform(0, 0.04, top.sum())
+    co[top, :2] += rng.uniform(-0.02, 0.02, (top.sum(), 2))
+    co[bottom, 2] = -0.05
+    set_coords(hair, co)
 
     return hair
 
@@ -120,17 +248,12 @@ def create_curly_short():
     hair.name = "Hair_CurlyShort"
 
     # Add bumpy texture
-    bpy.ops.object.mode_set(mode='EDIT')
-    bm = bmesh.from_edit_mesh(hair.data)
-    import random
-    random.seed(44)
-    for v in bm.verts:
-        if v.co.z > 0:
-            noise = random.uniform(0.95, 1.05)
-            v.co *= noise
-            v.co.z += random.uniform(0, 0.02)
-    bmesh.update_edit_mesh(hair.data)
-    bpy.ops.object.mode_set(mode='OBJECT')
+    rng = np.random.default_rng(44)
+    co = get_coords(hair)
+    top = co[:, 2] > 0
+    co[top] *= rng.uniform(0.95, 1.05, (top.sum(), 1))
+    co[top, 2] += rng.uniform(0, 0.02, top.sum())
+    set_coords(hair, co)
 
     return hair
 
@@ -141,21 +264,15 @@ def create_medium_wavy():
     hair = bpy.context.active_object
     hair.name = "Hair_MediumWavy"
 
-    # Extend the bottom
-    bpy.ops.object.mode_set(mode='EDIT')
-    bm = bmesh.from_edit_mesh(hair.data)
-    import random
-    random.seed(45)
-    for v in bm.verts:
-        if v.co.z < -0.05:
-            v.co.z -= 0.05  # Extend down
-            # Add wave
-            wave = math.sin(v.co.x * 20) * 0.02
-            v.co.y += wave
-        if v.co.z < -0.02:
-            v.co.x += random.uniform(-0.01, 0.01)
-    bmesh.update_edit_mesh(hair.data)
-    bpy.ops.object.mode_set(mode='OBJECT')
+    # Extend the bottom and add a wave
+    rng = np.random.default_rng(45)
+    co = get_coords(hair)
+    bottom = co[:, 2] < -0.05
+    co[bottom, 2] -= 0.05
+    co[bottom, 1] += np.sin(co[bottom, 0] * 20) * 0.02
+    lower = co[:, 2] < -0.02
+    co[lower, 0] += rng.uniform(-0.01, 0.01, lower.sum())
+    set_coords(hair, co)
 
     return hair
 
@@ -165,17 +282,12 @@ def create_medium_straight():
     hair = bpy.context.active_object
     hair.name = "Hair_MediumStraight"
 
-    # Shape it
-    bpy.ops.object.mode_set(mode='EDIT')
-    bm = bmesh.from_edit_mesh(hair.data)
-    for v in bm.verts:
-        if v.co.z < -0.05:
-            # Taper bottom slightly
-            factor = (v.co.z + 0.1) / 0.05
-            v.co.x *= 0.95 + 0.05 * factor
-            v.co.y *= 0.95 + 0.05 * factor
-    bmesh.update_edit_mesh(hair.data)
-    bpy.ops.object.mode_set(mode='OBJECT')
+    # Taper bottom slightly
+    co = get_coords(hair)
+    bottom = co[:, 2] < -0.05
+    factor = (co[bottom, 2] + 0.1) / 0.05
+    co[bottom, :2] *= (0.95 + 0.05 * factor)[:, None]
+    set_coords(hair, co)
 
     return hair
 
@@ -186,19 +298,13 @@ def create_afro_medium():
     hair.name = "Hair_AfroMedium"
 
     # Remove bottom half
-    bpy.ops.object.mode_set(mode='EDIT')
-    bm = bmesh.from_edit_mesh(hair.data)
-    verts_to_delete = [v for v in bm.verts if v.co.z < 0]
-    bmesh.ops.delete(bm, geom=verts_to_delete, context='VERTS')
+    delete_verts_below(hair, 0)
 
     # Add fuzzy texture
-    import random
-    random.seed(46)
-    for v in bm.verts:
-        noise = random.uniform(0.96, 1.04)
-        v.co *= noise
-    bmesh.update_edit_mesh(hair.data)
-    bpy.ops.object.mode_set(mode='OBJECT')
+    rng = np.random.default_rng(46)
+    co = get_coords(hair)
+    co *= rng.uniform(0.96, 1.04, (len(co), 1))
+    set_coords(hair, co)
 
     return hair
 
@@ -209,15 +315,11 @@ def create_long_straight():
     hair.name = "Hair_LongStraight"
 
     # Taper and shape
-    bpy.ops.object.mode_set(mode='EDIT')
-    bm = bmesh.from_edit_mesh(hair.data)
-    for v in bm.verts:
-        if v.co.z < -0.1:
-            factor = 1 - ((v.co.z + 0.175) / -0.175) * 0.2
-            v.co.x *= factor
-            v.co.y *= factor
-    bmesh.update_edit_mesh(hair.data)
-    bpy.ops.object.mode_set(mode='OBJECT')
+    co = get_coords(hair)
+    bottom = co[:, 2] < -0.1
+    factor = 1 - ((co[bottom, 2] + 0.175) / -0.175) * 0.2
+    co[bottom, :2] *= factor[:, None]
+    set_coords(hair, co)
 
     return hair
 
@@ -228,15 +330,11 @@ def create_long_wavy():
     hair.name = "Hair_LongWavy"
 
     # Add waves
-    bpy.ops.object.mode_set(mode='EDIT')
-    bm = bmesh.from_edit_mesh(hair.data)
-    for v in bm.verts:
-        if v.co.z < -0.05:
-            wave = math.sin(v.co.z * 15) * 0.025
-            v.co.y += wave
-            v.co.x += math.cos(v.co.z * 15) * 0.01
-    bmesh.update_edit_mesh(hair.data)
-    bpy.ops.object.mode_set(mode='OBJECT')
+    co = get_coords(hair)
+    bottom = co[:, 2] < -0.05
+    co[bottom, 1] += np.sin(co[bottom, 2] * 15) * 0.025
+    co[bottom, 0] += np.cos(co[bottom, 2] * 15) * 0.01
+    set_coords(hair, co)
 
     return hair
 
@@ -271,12 +369,7 @@ def create_braids():
     main.name = "Hair_Main"
 
     # Cut bottom
-    bpy.ops.object.mode_set(mode='EDIT')
-    bm = bmesh.from_edit_mesh(main.data)
-    verts_to_delete = [v for v in bm.verts if v.co.z < -0.02]
-    bmesh.ops.delete(bm, geom=verts_to_delete, context='VERTS')
-    bmesh.update_edit_mesh(main.data)
-    bpy.ops.object.mode_set(mode='OBJECT')
+    delete_verts_below(main, -0.02)
 
     # Add two braids
     bpy.ops.mesh.primitive_cylinder_add(radius=0.025, depth=0.25, vertices=8, location=(0.08, -0.02, -0.08))
@@ -309,18 +402,67 @@ def create_mohawk():
     bpy.ops.object.transform_apply(scale=True)
 
     # Add spikes
-    bpy.ops.object.mode_set(mode='EDIT')
-    bm = bmesh.from_edit_mesh(hair.data)
-    for v in bm.verts:
-        if v.co.z > 0.03:
-            v.co.z += 0.03
-    bmesh.update_edit_mesh(hair.data)
-    bpy.ops.object.mode_set(mode='OBJECT')
+    co = get_coords(hair)
+    co[co[:, 2] > 0.03, 2] += 0.03
+    set_coords(hair, co)
 
     return hair
 
-def finalize_hair(hair, output_path):
-    """Apply material and export hair"""
+# LOD0 triangle budget per style; LOD1/LOD2 keep LOD_RATIOS of LOD0
+HAIR_TRIANGLE_BUDGETS = {
+    "buzzcut": 400,
+    "short_fade": 400,
+    "short_textured": 600,
+    "curly_short": 600,
+    "medium_wavy": 800,
+    "medium_straight": 800,
+    "afro_medium": 800,
+    "long_straight": 1000,
+    "long_wavy": 1000,
+    "ponytail": 1000,
+    "braids": 1200,
+    "mohawk": 400,
+}
+DEFAULT_TRIANGLE_BUDGET = 800
+LOD_RATIOS = (1.0, 0.5, 0.25)
+
+def triangle_count(mesh):
+    return sum(len(p.vertices) - 2 for p in mesh.polygons)
+
+def decimate_to(obj, target_triangles):
+    """Collapse-decimate an object down to roughly target_triangles"""
+    triangles = triangle_count(obj.data)
+    if triangles <= target_triangles:
+        return
+    mod = obj.modifiers.new(name="LOD", type='DECIMATE')
+    mod.decimate_type = 'COLLAPSE'
+    mod.ratio = target_triangles / triangles
+    bpy.context.view_layer.objects.active = obj
+    bpy.ops.object.modifier_apply(modifier=mod.name)
+
+def export_lod(obj, output_path):
+    bpy.ops.object.select_all(action='DESELECT')
+    obj.select_set(True)
+    bpy.ops.export_scene.gltf(
+        filepath=output_path,
+        export_format='GLB',
+        use_selection=True,
+        export_materials='EXPORT',
+    )
+    print(f"  Exported: {output_path} ({triangle_count(obj.data)} tris)")
+    return {
+        'file': os.path.basename(output_path),
+        'vertices': len(obj.data.vertices),
+        'triangles': triangle_count(obj.data),
+        'bytes': os.path.getsize(output_path),
+    }
+
+def finalize_hair(hair, output_dir, style_id):
+    """Apply material, fit the triangle budget and export LOD0-LOD2.
+
+    LOD0 keeps the <style>.glb name the character creator loads; reduced
+    variants are written as <style>_lod1.glb and <style>_lod2.glb.
+    """
     # Set origin to center
     bpy.context.view_layer.objects.active = hair
     bpy.ops.object.origin_set(type='ORIGIN_CENTER_OF_MASS', center='BOUNDS')
@@ -340,75 +482,190 @@ def finalize_hair(hair, output_path):
     hair.select_set(True)
     bpy.ops.object.transform_apply(location=True, rotation=True, scale=True)
 
-    # Export
-    bpy.ops.export_scene.gltf(
-        filepath=output_path,
-        export_format='GLB',
-        use_selection=True,
-        export_materials='EXPORT',
-    )
+    budget = HAIR_TRIANGLE_BUDGETS.get(style_id, DEFAULT_TRIANGLE_BUDGET)
+    decimate_to(hair, budget)
+    paint_style_shading(hair, style_id)
+    lod0_triangles = triangle_count(hair.data)
+
+    lods = [export_lod(hair, os.path.join(output_dir, f"{style_id}.glb"))]
+    for level, ratio in enumerate(LOD_RATIOS[1:], start=1):
+        lod = hair.copy()
+        lod.data = hair.data.copy()
+        lod.name = f"{hair.name}_LOD{level}"
+        bpy.context.collection.objects.link(lod)
+        decimate_to(lod, max(4, int(lod0_triangles * ratio)))
+        lods.append(export_lod(lod, os.path.join(output_dir, f"{style_id}_lod{level}.glb")))
+        bpy.data.objects.remove(lod, do_unlink=True)
+
+    return {**lods[0], 'budget': budget, 'lods': lods}
+
+# Hair style generators
+STYLES = [
+    ("buzzcut", create_buzz_cut),
+    ("short_fade", create_short_fade),
+    ("short_textured", create_short_textured),
+    ("curly_short", create_curly_short),
+    ("medium_wavy", create_medium_wavy),
+    ("medium_straight", create_medium_straight),
+    ("afro_medium", create_afro_medium),
+    ("long_straight", create_long_straight),
+    ("long_wavy", create_long_wavy),
+    ("ponytail", create_ponytail),
+    ("braids", create_braids),
+    ("mohawk", create_mohawk),
+]
+
+def build_styles(styles, output_dir):
+    """Build and export styles one after another; returns a result per style"""
+    results = []
+    for style_id, create_func in styles:
+        print(f"\nGenerating: {style_id}")
+        start = time.perf_counter()
+        clear_scene()
+
+        try:
+            hair = create_func()
+            stats = finalize_hair(hair, output_dir, style_id)
+            results.append({'style': style_id, 'status': "OK", **stats,
+                            'seconds': round(time.perf_counter() - start, 3)})
+        except Exception as e:
+            print(f"  ERROR: {e}")
+            results.append({'style': style_id, 'file': None, 'status': str(e),
+                            'seconds': round(time.perf_counter() - start, 3)})
+    return results
+
+def build_parallel(styles, output_dir, jobs):
+    """Build styles in `jobs` background Blender processes, each taking one
+    shard of the style list; a style builds in milliseconds, so paying
+    Blender's startup once per shard rather than once per style is the win"""
+    shards = [styles[index::jobs] for index in range(jobs)]
+    shards = [shard for shard in shards if shard]
+    workers = []
+    for index, shard in enumerate(shards):
+        style_ids = [style_id for style_id, _ in shard]
+        results_path = os.path.join(output_dir, f".shard_{index}.result.json")
+        log_path = os.path.join(output_dir, f".shard_{index}.log")
+        with open(log_path, 'w') as log:
+            process = subprocess.Popen(
+                [bpy.app.binary_path, "--background", "--factory-startup",
+                 "--python", os.path.abspath(__file__), "--",
+                 output_dir, "--styles", ",".join(style_ids), "--worker-results", results_path],
+                stdout=log, stderr=subprocess.STDOUT,
+            )
+        workers.append((style_ids, process, results_path, log_path))
+        print(f"  Worker {index}: {', '.join(style_ids)}")
 
-    print(f"  Exported: {output_path}")
-    return True
+    results = []
+    for style_ids, process, results_path, log_path in workers:
+        process.wait()
+        if process.returncode == 0 and os.path.exists(results_path):
+            with open(results_path) as f:
+                results.extend(json.load(f))
+            os.remove(results_path)
+            os.remove(log_path)
+        else:
+            with open(log_path) as f:
+                tail = "".join(f.readlines()[-20:])
+            print(f"  ERROR: worker for {', '.join(style_ids)} failed, see {log_path}\n{tail}")
+            results.extend({'style': style_id, 'file': None, 'status': f"worker exited with {process.returncode}"}
+                           for style_id in style_ids)
+
+    order = [style_id for style_id, _ in styles]
+    return sorted(results, key=lambda r: order.index(r['style']))
+
+def parse_options(args):
+    options = {'jobs': 1, 'styles': None, 'worker_results': None, 'combined': False}
+    positional = []
+    i = 0
+    while i < len(args):
+        if args[i] == '--jobs' and i + 1 < len(args):
+            options['jobs'] = int(args[i + 1]) or os.cpu_count()
+            i += 2
+        elif args[i] == '--styles' and i + 1 < len(args):
+            options['styles'] = args[i + 1].split(',')
+            i += 2
+        elif args[i] == '--combined':
+            options['combined'] = True
+            i += 1
+        elif args[i] == '--worker-results' and i + 1 < len(args):
+            options['worker_results'] = args[i + 1]
+            i += 2
+        else:
+            positional.append(args[i])
+            i += 1
+    return positional, options
 
 def main():
-    args = get_args()
+    args, options = parse_options(get_args())
 
     if len(args) < 1:
-        print("Usage: blender --background --python generate_hair_styles.py -- <output_dir>")
+        print(__doc__)
         sys.exit(1)
 
     output_dir = os.path.abspath(args[0])
     os.makedirs(output_dir, exist_ok=True)
 
+    styles = STYLES
+    if options['styles']:
+        known = dict(STYLES)
+        unknown = [style_id for style_id in options['styles'] if style_id not in known]
+        if unknown:
+            print(f"Unknown styles: {', '.join(unknown)}")
+            sys.exit(1)
+        styles = [(style_id, known[style_id]) for style_id in options['styles']]
+
+    if options['worker_results']:
+        # Internal: build for build_parallel and hand back the results
+        with open(options['worker_results'], 'w') as f:
+            json.dump(build_styles(styles, output_dir), f)
+        return
+
     print("=" * 60)
     print("HAIR STYLE GENERATOR")
     print("=" * 60)
     print(f"Output: {output_dir}")
 
-    # Hair style generators
-    styles = [
-        ("buzzcut", create_buzz_cut),
-        ("short_fade", create_short_fade),
-        ("short_textured", create_short_textured),
-        ("curly_short", create_curly_short),
-        ("medium_wavy", create_medium_wavy),
-        ("medium_straight", create_medium_straight),
-        ("afro_medium", create_afro_medium),
-        ("long_straight", create_long_straight),
-        ("long_wavy", create_long_wavy),
-        ("ponytail", create_ponytail),
-        ("braids", create_braids),
-        ("mohawk", create_mohawk),
-    ]
-
-    results = []
-
-    for style_id, create_func in styles:
-        print(f"\nGenerating: {style_id}")
-        clear_scene()
-
-        try:
-            hair = create_func()
-            output_path = os.path.join(output_dir, f"{style_id}.glb")
-            finalize_hair(hair, output_path)
-            results.append((style_id, output_path, "OK"))
-        except Exception as e:
-            print(f"  ERROR: {e}")
-            results.append((style_id, None, str(e)))
+    start = time.perf_counter()
+    if options['jobs'] > 1:
+        print(f"\nBuilding {len(styles)} styles in {options['jobs']} workers")
+        results = build_parallel(styles, output_dir, options['jobs'])
+    else:
+        results = build_styles(styles, output_dir)
+    elapsed = time.perf_counter() - start
+
+    # Rebuilt styles replace their old entries; the rest keep theirs
+    manifest_path = os.path.join(output_dir, 'hair_manifest.json')
+    merged = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            merged = {entry['style']: entry for entry in json.load(f).get('styles', [])}
+    merged.update((result['style'], result) for result in results)
+
+    manifest = {
+        'jobs': options['jobs'],
+        'wall_seconds': round(elapsed, 2),
+        'styles': list(merged.values()),
+    }
+    write_material_definition(output_dir)
+    if options['combined']:
+        build_combined(output_dir, manifest['styles'], os.path.join(output_dir, 'hair_styles.glb'))
+        manifest['combined'] = 'hair_styles.glb'
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
 
     print(f"\n{'='*60}")
     print("SUMMARY")
     print("=" * 60)
     success = 0
-    for style_id, path, status in results:
-        if status == "OK":
-            print(f"  ✓ {style_id}")
+    for result in results:
+        if result['status'] == "OK":
+            lod_tris = " / ".join(str(lod['triangles']) for lod in result['lods'])
+            print(f"  ✓ {result['style']:<16} {lod_tris:>18} tris  {result['seconds']:.2f}s")
             success += 1
         else:
-            print(f"  ✗ {style_id}: {status}")
+            print(f"  ✗ {result['style']}: {result['status']}")
 
-    print(f"\n{success}/{len(styles)} hair styles generated")
+    print(f"\n{success}/{len(styles)} hair styles generated in {elapsed:.1f}s")
     print("=" * 60)
 
 if __name__ == "__main__":
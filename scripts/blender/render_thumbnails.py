@@ -2,6 +2,11 @@
 """
 Render thumbnail images for hair styles and face presets.
 Creates 256x256 webp images for the character creator UI.
+
+The avatar and all hair styles are loaded once; each shot just toggles
+hair visibility and shape keys before rendering. Shots whose inputs
+(avatar, hair GLB, preset, camera/lights, render settings) are unchanged
+since the last run are skipped.
 """
 
 import bpy
@@ -9,6 +14,14 @@ import sys
 import os
 from mathutils import Vector, Euler
 import math
+import re
+import time
+import json
+import subprocess
+import tempfile
+import shutil
+import numpy as np
+import hashlib
 
 def get_args():
     argv = sys.argv
@@ -23,16 +36,26 @@ def clear_scene():
         if block.users == 0:
             bpy.data.meshes.remove(block)
 
-def setup_render_settings():
+# Render profiles: EEVEE needs a GPU context; Workbench and Cycles CPU run
+# on headless build machines
+RENDER_PROFILES = {
+    'eevee': {'engine': 'BLENDER_EEVEE_NEXT', 'samples': 16},
+    'workbench': {'engine': 'BLENDER_WORKBENCH', 'matcap': 'basic_1.exr', 'aa': '8'},
+    'cycles': {'engine': 'CYCLES', 'samples': 16, 'denoise': True},
+}
+
+# --jobs workers run headless, so they default to a CPU-only profile
+PARALLEL_PROFILE = 'cycles'
+
+def setup_render_settings(profile='eevee'):
     """Configure render settings for thumbnail output"""
     scene = bpy.context.scene
-
-    # Use Cycles for better quality (or Eevee for speed)
-    scene.render.engine = 'BLENDER_EEVEE_NEXT'  # or 'CYCLES'
+    settings = RENDER_PROFILES[profile]
+    scene.render.engine = settings['engine']
 
     # Resolution
-    scene.render.resolution_x = 256
-    scene.render.resolution_y = 256
+    scene.render.resolution_x = RENDER_SIZE
+    scene.render.resolution_y = RENDER_SIZE
     scene.render.resolution_percentage = 100
 
     # Transparent background
@@ -40,10 +63,39 @@ def setup_render_settings():
 
     # Output format
     scene.render.image_settings.file_format = 'WEBP'
-    scene.render.image_settings.quality = 90
-
-    # Anti-aliasing
-    scene.eevee.taa_render_samples = 16
+    scene.render.image_settings.quality = WEBP_QUALITY
+
+    if profile == 'eevee':
+        # Anti-aliasing
+        scene.eevee.taa_render_samples = settings['samples']
+
+    elif profile == 'workbench':
+        # Flat matcap shading with object outlines, colored by material
+        scene.display.shading.light = 'MATCAP'
+        scene.display.shading.studio_light = settings['matcap']
+        scene.display.shading.color_type = 'MATERIAL'
+        scene.display.shading.show_object_outline = True
+        scene.display.shading.object_outline_color = (0.0, 0.0, 0.0)
+        scene.display.render_aa = settings['aa']
+
+    elif profile == 'cycles':
+        # Few samples on the CPU, cleaned up by the denoiser
+        scene.cycles.device = 'CPU'
+        scene.cycles.samples = settings['samples']
+        scene.cycles.use_adaptive_sampling = True
+        scene.cycles.use_denoising = settings['denoise']
+        scene.cycles.denoiser = 'OPENIMAGEDENOISE'
+
+# Head shot camera (assuming head is at ~1.7m height) and 3-point lighting.
+# Part of every shot's fingerprint, so changing these re-renders everything.
+CAMERA = {'location': (0, -0.6, 1.7), 'rotation': (90, 0, 0), 'lens': 85}  # Portrait lens
+LIGHTS = {
+    'KeyLight': {'energy': 100, 'location': (1, -1.5, 2), 'rotation': (60, 20, 30)},  # Key light (main)
+    'FillLight': {'energy': 50, 'location': (-1.5, -1, 1.5), 'rotation': (50, -30, -20)},  # Fill light (softer)
+    'RimLight': {'energy': 30, 'location': (0, 1, 2), 'rotation': (120, 0, 0)},  # Rim light (back)
+}
+RENDER_SIZE = 256
+WEBP_QUALITY = 90
 
 def setup_camera_head_view():
     """Create camera positioned for head/face view"""
@@ -55,63 +107,140 @@ def setup_camera_head_view():
         cam_obj = bpy.data.objects.new('ThumbnailCamera', cam_data)
         bpy.context.collection.objects.link(cam_obj)
 
-    # Position camera for head shot (assuming head is at ~1.7m height)
-    cam_obj.location = (0, -0.6, 1.7)
-    cam_obj.rotation_euler = Euler((math.radians(90), 0, 0))
+    cam_obj.location = CAMERA['location']
+    cam_obj.rotation_euler = Euler([math.radians(a) for a in CAMERA['rotation']])
 
     # Set as active camera
     bpy.context.scene.camera = cam_obj
 
-    # Adjust lens for portrait
-    cam_obj.data.lens = 85  # Portrait lens
+    cam_obj.data.lens = CAMERA['lens']
 
     return cam_obj
 
 def setup_lighting():
     """Create simple 3-point lighting"""
-    # Key light (main)
-    if 'KeyLight' not in bpy.data.objects:
-        key_light_data = bpy.data.lights.new('KeyLight', type='AREA')
-        key_light_data.energy = 100
-        key_light = bpy.data.objects.new('KeyLight', key_light_data)
-        bpy.context.collection.objects.link(key_light)
-        key_light.location = (1, -1.5, 2)
-        key_light.rotation_euler = Euler((math.radians(60), math.radians(20), math.radians(30)))
-
-    # Fill light (softer)
-    if 'FillLight' not in bpy.data.objects:
-        fill_light_data = bpy.data.lights.new('FillLight', type='AREA')
-        fill_light_data.energy = 50
-        fill_light = bpy.data.objects.new('FillLight', fill_light_data)
-        bpy.context.collection.objects.link(fill_light)
-        fill_light.location = (-1.5, -1, 1.5)
-        fill_light.rotation_euler = Euler((math.radians(50), math.radians(-30), math.radians(-20)))
-
-    # Rim light (back)
-    if 'RimLight' not in bpy.data.objects:
-        rim_light_data = bpy.data.lights.new('RimLight', type='AREA')
-        rim_light_data.energy = 30
-        rim_light = bpy.data.objects.new('RimLight', rim_light_data)
-        bpy.context.collection.objects.link(rim_light)
-        rim_light.location = (0, 1, 2)
-        rim_light.rotation_euler = Euler((math.radians(120), 0, 0))
-
-def render_hair_thumbnails(avatar_path, hair_dir, output_dir):
-    """Render thumbnails for all hair styles"""
+    for name, light in LIGHTS.items():
+        if name in bpy.data.objects:
+            continue
+        light_data = bpy.data.lights.new(name, type='AREA')
+        light_data.energy = light['energy']
+        light_obj = bpy.data.objects.new(name, light_data)
+        bpy.context.collection.objects.link(light_obj)
+        light_obj.location = light['location']
+        light_obj.rotation_euler = Euler([math.radians(a) for a in light['rotation']])
+
+# Face presets live in a JSON library shared with the character creator UI
+FACE_PRESET_LIBRARY = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                   '..', '..', 'apps', 'frontend', 'src', 'lib', 'character', 'facePresets.json')
+
+HAIR_COLOR = (0.1, 0.08, 0.06, 1.0)  # Dark brown
+
+# Hex values from HAIR_COLOR_PALETTE in apps/frontend/src/lib/character/defaults.ts
+HAIR_COLOR_PALETTE = {
+    'black': '#1A1A1A', 'dark_brown': '#3B2417', 'brown': '#6B4423',
+    'light_brown': '#A67B5B', 'blonde': '#D4A853', 'platinum': '#E8E4C9',
+    'ginger': '#B55239', 'auburn': '#6D3222', 'gray': '#808080', 'white': '#E8E8E8',
+    'purple': '#7B2D8E', 'blue': '#2E5EAA', 'pink': '#E75480', 'red': '#C41E3A',
+    'green': '#228B22', 'teal': '#008B8B',
+}
+
+def hex_to_linear(hex_color):
+    """sRGB hex string to a linear RGBA tuple for shader inputs"""
+    channels = [int(hex_color[i:i + 2], 16) / 255 for i in (1, 3, 5)]
+    linear = [c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4 for c in channels]
+    return (*linear, 1.0)
+
+def import_glb(filepath):
+    """Import a GLB and return the objects it created"""
+    before = set(bpy.data.objects.keys())
+    bpy.ops.import_scene.gltf(filepath=filepath)
+    return [obj for obj in bpy.data.objects if obj.name not in before]
+
+def hair_shots(hair_dir, output_dir, colors=None):
+    """One shot per hair GLB (and per palette color, if given), plus a bald shot"""
+    shots = []
+    manifest_path = os.path.join(hair_dir, 'hair_manifest.json')
+    if os.path.exists(manifest_path):
+        # generate_hair_styles.py output: only the LOD0 file of each built style,
+        # never its _lodN files or the combined hair_styles.glb
+        with open(manifest_path) as f:
+            hair_files = sorted(style['file'] for style in json.load(f)['styles'] if style.get('file'))
+    else:
+        hair_files = sorted(f for f in os.listdir(hair_dir)
+                            if f.endswith('.glb') and not re.search(r'_lod\d+\.glb$', f) and f != 'hair_styles.glb')
+    for hair_file in hair_files:
+        hair_name = os.path.splitext(hair_file)[0]
+        variants = [(hair_name, HAIR_COLOR)]
+        if colors:
+            variants = [(f"{hair_name}_{color}", hex_to_linear(HAIR_COLOR_PALETTE[color])) for color in colors]
+        for shot_name, color in variants:
+            shots.append({
+                'name': f"hair/{shot_name}",
+                'hair': hair_name,
+                'hair_path': os.path.join(hair_dir, hair_file),
+                'color': list(color),
+                'preset': None,
+                'morphs': None,
+                'output': os.path.join(output_dir, f"{shot_name}.webp"),
+            })
+    shots.append({
+        'name': "hair/bald",
+        'hair': None,
+        'hair_path': None,
+        'color': None,
+        'preset': None,
+        'morphs': None,
+        'output': os.path.join(output_dir, "bald.webp"),
+    })
+    return shots
+
+def load_face_library(path=FACE_PRESET_LIBRARY):
+    with open(path) as f:
+        return json.load(f)
+
+def shape_key_weights(library, morphs):
+    """Map library morph values (morphRange, e.g. -1 to 1) to 0-1 shape key weights"""
+    low, high = library['morphRange']
+    return {
+        library['morphTargets'][morph_id]: (value - low) / (high - low)
+        for morph_id, value in morphs.items()
+        if morph_id in library['morphTargets']
+    }
 
-    os.makedirs(output_dir, exist_ok=True)
+def preset_shots(output_dir, library, presets=None, group='faces'):
+    """One bald shot per face preset (the library's presets unless given)"""
+    return [{
+        'name': f"{group}/{preset['id']}",
+        'hair': None,
+        'hair_path': None,
+        'color': None,
+        'preset': preset['id'],
+        'morphs': shape_key_weights(library, preset['morphs']),
+        'output': os.path.join(output_dir, f"{preset['id']}.webp"),
+    } for preset in (presets if presets is not None else library['presets'])]
+
+def random_presets(library, count, seed=0, spread=0.5):
+    """Seeded random faces for QA sheets, in the library's preset format"""
+    rng = np.random.default_rng(seed)
+    morph_ids = list(library['morphTargets'])
+    values = rng.uniform(-spread, spread, (count, len(morph_ids))).round(2)
+    return [{
+        'id': f"random_{index:03d}",
+        'name': f"Random {index}",
+        'morphs': dict(zip(morph_ids, row.tolist())),
+    } for index, row in enumerate(values)]
+
+def load_session(avatar_path, hair_paths, profile='eevee'):
+    """Load the avatar and every hair style once; hair stays hidden until a shot shows it"""
+    clear_scene()
 
-    # Load base avatar
     print(f"\nLoading avatar: {avatar_path}")
-    bpy.ops.import_scene.gltf(filepath=avatar_path)
+    avatar_objects = import_glb(avatar_path)
 
     # Find the head bone for hair attachment
-    armature = None
     head_bone = None
-    for obj in bpy.context.scene.objects:
+    for obj in avatar_objects:
         if obj.type == 'ARMATURE':
-            armature = obj
-            # Look for head bone
             for bone_name in ['Head', 'mixamorigHead', 'head', 'DEF-head']:
                 if bone_name in obj.data.bones:
                     head_bone = bone_name
@@ -121,194 +250,531 @@ def render_hair_thumbnails(avatar_path, hair_dir, output_dir):
     if not head_bone:
         print("WARNING: Could not find head bone!")
 
-    # Setup scene
-    setup_render_settings()
+    # Mesh with shape keys, used for face presets
+    morph_mesh = None
+    for obj in avatar_objects:
+        if obj.type == 'MESH' and obj.data.shape_keys:
+            morph_mesh = build_morph_proxy(obj)
+            break
+
+    setup_render_settings(profile)
     setup_camera_head_view()
     setup_lighting()
 
-    # Get list of hair GLB files
-    hair_files = [f for f in os.listdir(hair_dir) if f.endswith('.glb')]
-
-    print(f"\nFound {len(hair_files)} hair styles to render")
-
-    for hair_file in hair_files:
-        hair_name = os.path.splitext(hair_file)[0]
-        hair_path = os.path.join(hair_dir, hair_file)
-        output_path = os.path.join(output_dir, f"{hair_name}.webp")
-
-        print(f"  Rendering: {hair_name}")
-
-        # Import hair model
-        bpy.ops.import_scene.gltf(filepath=hair_path)
-
-        # Find imported hair object (newest mesh)
-        hair_obj = None
-        for obj in bpy.context.scene.objects:
-            if obj.type == 'MESH' and obj.name.lower().startswith(hair_name.lower()):
-                hair_obj = obj
-                break
-
-        if not hair_obj:
-            # Try to find any new mesh
-            for obj in bpy.context.selected_objects:
-                if obj.type == 'MESH':
-                    hair_obj = obj
-                    break
-
+    print(f"Loading {len(hair_paths)} hair styles")
+    hair = {}
+    for hair_name, hair_path in hair_paths.items():
+        objects = import_glb(hair_path)
+        meshes = [obj for obj in objects if obj.type == 'MESH']
+        hair_obj = next((obj for obj in meshes if obj.name.lower().startswith(hair_name.lower())), None)
+        if not hair_obj and meshes:
+            hair_obj = meshes[0]
         if hair_obj:
             # Position hair on head
             hair_obj.location = (0, 0, 1.7)  # Head height
-
-            # Set hair color
-            for mat in hair_obj.data.materials:
-                if mat and mat.use_nodes:
-                    bsdf = mat.node_tree.nodes.get("Principled BSDF")
-                    if bsdf:
-                        bsdf.inputs["Base Color"].default_value = (0.1, 0.08, 0.06, 1.0)  # Dark brown
-
-        # Render
-        bpy.context.scene.render.filepath = output_path
+        for obj in objects:
+            obj.hide_render = True
+        hair[hair_name] = {'objects': objects, 'mesh': hair_obj}
+
+    return {'morph_mesh': morph_mesh, 'hair': hair}
+
+def set_hair_color(hair_obj, color):
+    for mat in hair_obj.data.materials:
+        if not mat:
+            continue
+        # Workbench shades with the viewport color, not the node tree
+        mat.diffuse_color = color
+        if mat.use_nodes:
+            bsdf = mat.node_tree.nodes.get("Principled BSDF")
+            link = bsdf.inputs["Base Color"].links[0] if bsdf and bsdf.inputs["Base Color"].is_linked else None
+            if link and link.from_node.type in ('MIX', 'MIX_RGB'):
+                # Shared hair material: vertex shading x tint (the second color input)
+                link.from_node.inputs[7 if link.from_node.type == 'MIX' else 2].default_value = color
+            elif bsdf:
+                bsdf.inputs["Base Color"].default_value = color
+
+def build_morph_proxy(mesh_obj):
+    """Snapshot the shape keys as a numpy delta matrix and render a copy of the
+    mesh without shape keys, so each shot writes blended positions directly"""
+    mesh = mesh_obj.data
+    reference = mesh.shape_keys.reference_key
+    count = len(mesh.vertices)
+
+    def coords(key_block):
+        co = np.empty(count * 3, dtype=np.float32)
+        key_block.data.foreach_get("co", co)
+        return co
+
+    others = [kb for kb in mesh.shape_keys.key_blocks if kb != reference]
+    deltas = np.zeros((len(others), count * 3), dtype=np.float32)
+    for row, kb in enumerate(others):
+        deltas[row] = coords(kb) - coords(kb.relative_key)
+
+    proxy = mesh_obj.copy()
+    proxy.data = mesh.copy()
+    proxy.name = f"{mesh_obj.name}_Morphed"
+    for collection in mesh_obj.users_collection:
+        collection.objects.link(proxy)
+    proxy.shape_key_clear()
+    mesh_obj.hide_render = True
+
+    return {'object': proxy, 'basis': coords(reference), 'names': [kb.name for kb in others], 'deltas': deltas}
+
+def set_morphs(morph, weights):
+    """Write basis + weights @ deltas into the proxy mesh in one foreach_set"""
+    if not morph:
+        return
+    w = np.array([(weights or {}).get(name, 0.0) for name in morph['names']], dtype=np.float32)
+    co = morph['basis'] + w @ morph['deltas']
+    mesh = morph['object'].data
+    mesh.vertices.foreach_set("co", co)
+    mesh.update()
+
+def apply_shot(session, shot):
+    """Show only the shot's hair style and pose the face for it"""
+    for hair_name, hair in session['hair'].items():
+        visible = hair_name == shot['hair']
+        for obj in hair['objects']:
+            obj.hide_render = not visible
+        if visible and hair['mesh']:
+            set_hair_color(hair['mesh'], tuple(shot['color']))
+    set_morphs(session['morph_mesh'], shot['morphs'])
+
+def render_shots(avatar_path, shots, threads=None, profile='eevee'):
+    """Render every shot in one session; returns per-shot results with timings"""
+    hair_paths = {shot['hair']: shot['hair_path'] for shot in shots if shot['hair']}
+    session = load_session(avatar_path, hair_paths, profile)
+    if threads:
+        # Parallel workers split the machine's cores between them
+        bpy.context.scene.render.threads_mode = 'FIXED'
+        bpy.context.scene.render.threads = threads
+
+    if not session['morph_mesh'] and any(shot['preset'] for shot in shots):
+        print("ERROR: No mesh with shape keys found, skipping face presets!")
+        shots = [shot for shot in shots if not shot['preset']]
+
+    print(f"\nRendering {len(shots)} shots")
+    results = []
+    total_start = time.perf_counter()
+    for index, shot in enumerate(shots, start=1):
+        os.makedirs(os.path.dirname(shot['output']), exist_ok=True)
+        start = time.perf_counter()
+        apply_shot(session, shot)
+        bpy.context.scene.render.filepath = shot['output']
         bpy.ops.render.render(write_still=True)
-
-        # Remove hair for next iteration
-        if hair_obj:
-            bpy.data.objects.remove(hair_obj, do_unlink=True)
-
-    # Also render "bald" thumbnail (just head, no hair)
-    bald_output = os.path.join(output_dir, "bald.webp")
-    print(f"  Rendering: bald")
-    bpy.context.scene.render.filepath = bald_output
-    bpy.ops.render.render(write_still=True)
-
-    print(f"\nHair thumbnails saved to: {output_dir}")
-
-def render_face_presets(avatar_path, output_dir):
-    """Render thumbnails for face presets"""
-
-    os.makedirs(output_dir, exist_ok=True)
-
-    # Face preset configurations (morph values)
-    presets = {
-        'preset_01': {  # Default/Neutral
-            'eyeSize': 0, 'eyeSpacing': 0, 'noseWidth': 0, 'noseLength': 0,
-            'jawWidth': 0, 'chinLength': 0, 'lipFullness': 0, 'cheekboneHeight': 0
-        },
-        'preset_02': {  # Oval face
-            'eyeSize': 0.2, 'eyeSpacing': 0, 'noseWidth': -0.2, 'noseLength': 0.1,
-            'jawWidth': -0.3, 'chinLength': 0.2, 'lipFullness': 0.1, 'cheekboneHeight': 0.2
-        },
-        'preset_03': {  # Round face
-            'eyeSize': 0.3, 'eyeSpacing': 0.1, 'noseWidth': 0.2, 'noseLength': -0.1,
-            'jawWidth': 0.3, 'chinLength': -0.2, 'lipFullness': 0.2, 'cheekboneHeight': -0.1
-        },
-        'preset_04': {  # Square face
-            'eyeSize': 0, 'eyeSpacing': 0.1, 'noseWidth': 0.1, 'noseLength': 0,
-            'jawWidth': 0.5, 'chinLength': 0, 'lipFullness': 0, 'cheekboneHeight': 0.3
-        },
-        'preset_05': {  # Heart face
-            'eyeSize': 0.2, 'eyeSpacing': 0.2, 'noseWidth': -0.1, 'noseLength': 0,
-            'jawWidth': -0.3, 'chinLength': 0.3, 'lipFullness': 0.2, 'cheekboneHeight': 0.4
-        },
-        'preset_06': {  # Diamond face
-            'eyeSize': 0.1, 'eyeSpacing': 0, 'noseWidth': -0.2, 'noseLength': 0.2,
-            'jawWidth': -0.2, 'chinLength': 0.1, 'lipFullness': 0.1, 'cheekboneHeight': 0.5
-        },
+        elapsed = time.perf_counter() - start
+        print(f"  [{index}/{len(shots)}] {shot['name']}: {elapsed:.2f}s")
+        results.append({'name': shot['name'], 'output': shot['output'], 'seconds': round(elapsed, 3)})
+
+    total = time.perf_counter() - total_start
+    if results:
+        print(f"\nRendered {len(results)} shots in {total:.1f}s ({total / len(results):.2f}s per shot)")
+    return results
+
+def plan_shards(shots, jobs):
+    """Split shots into contiguous chunks; shots are ordered by hair style, so
+    each worker only imports the few hair GLBs its chunk needs"""
+    size = math.ceil(len(shots) / jobs)
+    return [shots[i:i + size] for i in range(0, len(shots), size)]
+
+def render_parallel(avatar_path, shots, jobs, profile=PARALLEL_PROFILE):
+    """Render shots across `jobs` background Blender processes and merge their results"""
+    work_dir = tempfile.mkdtemp(prefix="thumbnails_")
+    try:
+        return run_workers(avatar_path, shots, jobs, profile, work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def run_workers(avatar_path, shots, jobs, profile, work_dir):
+    threads = max(1, (os.cpu_count() or 1) // jobs)
+    shards = plan_shards(shots, jobs)
+    print(f"\nRendering {len(shots)} shots in {len(shards)} workers ({threads} threads each)")
+
+    workers = []
+    for index, shard in enumerate(shards):
+        shard_path = os.path.join(work_dir, f"shard_{index}.json")
+        with open(shard_path, 'w') as f:
+            json.dump(shard, f)
+        log_path = os.path.join(work_dir, f"shard_{index}.log")
+        with open(log_path, 'w') as log:
+            process = subprocess.Popen(
+                [bpy.app.binary_path, "--background", "--factory-startup",
+                 "--python", os.path.abspath(__file__), "--",
+                 "worker", avatar_path, shard_path, "--threads", str(threads), "--profile", profile],
+                stdout=log, stderr=subprocess.STDOUT,
+            )
+        workers.append((process, log_path, shard_path))
+
+    results = []
+    failed = False
+    for index, (process, log_path, shard_path) in enumerate(workers):
+        if process.wait() != 0:
+            failed = True
+            print(f"ERROR: worker {index} failed, last log lines:")
+            with open(log_path) as f:
+                print("".join(f.readlines()[-20:]))
+            continue
+        with open(shard_path.replace(".json", ".results.json")) as f:
+            for result in json.load(f):
+                results.append({**result, 'worker': index})
+    if failed:
+        sys.exit(1)
+    return results
+
+FILE_HASHES = {}
+
+def file_hash(path):
+    if path not in FILE_HASHES:
+        h = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+        FILE_HASHES[path] = h.hexdigest()
+    return FILE_HASHES[path]
+
+def shot_fingerprint(avatar_path, shot, profile):
+    """Hash of everything that affects a shot's pixels"""
+    inputs = {
+        'avatar': file_hash(avatar_path),
+        'hair': file_hash(shot['hair_path']) if shot['hair_path'] else None,
+        'color': shot['color'],
+        'morphs': shot['morphs'],
+        'camera': CAMERA,
+        'lights': LIGHTS,
+        'render': {'profile': profile, **RENDER_PROFILES[profile], 'size': RENDER_SIZE, 'quality': WEBP_QUALITY},
     }
-
-    # Load avatar
-    clear_scene()
-    print(f"\nLoading avatar: {avatar_path}")
-    bpy.ops.import_scene.gltf(filepath=avatar_path)
-
-    # Find mesh with shape keys
-    mesh_obj = None
-    for obj in bpy.context.scene.objects:
-        if obj.type == 'MESH' and obj.data.shape_keys:
-            mesh_obj = obj
-            break
-
-    if not mesh_obj:
-        print("ERROR: No mesh with shape keys found!")
-        return
-
-    setup_render_settings()
-    setup_camera_head_view()
-    setup_lighting()
-
-    shape_keys = mesh_obj.data.shape_keys.key_blocks
-
-    for preset_name, morph_values in presets.items():
-        print(f"  Rendering: {preset_name}")
-
-        # Reset all morphs to 0
-        for sk in shape_keys:
-            if sk.name != 'Basis':
-                sk.value = 0
-
-        # Apply preset morph values
-        morph_name_map = {
-            'eyeSize': 'EyeSize',
-            'eyeSpacing': 'EyeSpacing',
-            'noseWidth': 'NoseWidth',
-            'noseLength': 'NoseLength',
-            'jawWidth': 'JawWidth',
-            'chinLength': 'ChinLength',
-            'lipFullness': 'LipFullness',
-            'cheekboneHeight': 'CheekboneHeight',
+    return hashlib.sha1(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+def thumbnail_cache_path(shots):
+    base = os.path.commonpath([os.path.dirname(shot['output']) for shot in shots])
+    return os.path.join(base, '.thumbnail_cache.json')
+
+def stale_shots(avatar_path, shots, profile, force=False):
+    """Split shots into (to_render, cached) using the fingerprint cache;
+    returns the fresh fingerprints alongside"""
+    cache = {}
+    cache_path = thumbnail_cache_path(shots)
+    if not force and os.path.exists(cache_path):
+        with open(cache_path) as f:
+            cache = json.load(f)
+
+    fingerprints = {shot['name']: shot_fingerprint(avatar_path, shot, profile) for shot in shots}
+    to_render, cached = [], []
+    for shot in shots:
+        entry = cache.get(shot['name'])
+        if entry and entry['fingerprint'] == fingerprints[shot['name']] and os.path.exists(shot['output']):
+            cached.append({'name': shot['name'], 'output': shot['output'], 'seconds': entry['seconds'], 'cached': True})
+        else:
+            to_render.append(shot)
+    return to_render, cached, fingerprints
+
+def save_thumbnail_cache(shots, results, fingerprints):
+    cache = {r['name']: {'fingerprint': fingerprints[r['name']], 'seconds': r['seconds']} for r in results}
+    with open(thumbnail_cache_path(shots), 'w') as f:
+        json.dump(cache, f, indent=2)
+
+def write_results(shots, results, wall_seconds, jobs, profile):
+    """Write thumbnails.json (per-shot file and render time) next to the outputs"""
+    base = os.path.commonpath([os.path.dirname(shot['output']) for shot in shots])
+    rendered = [r for r in results if not r.get('cached')]
+    manifest = {
+        'profile': profile,
+        'jobs': jobs,
+        'wall_seconds': round(wall_seconds, 2),
+        'rendered': len(rendered),
+        'cached': len(results) - len(rendered),
+        'render_seconds': round(sum(r['seconds'] for r in rendered), 2),
+        'shots': [{**r, 'output': os.path.relpath(r['output'], base)} for r in results],
+    }
+    manifest_path = os.path.join(base, 'thumbnails.json')
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"\nResults manifest: {manifest_path}")
+
+def benchmark_profiles(avatar_path, hair_dir, output_dir, library, samples=3):
+    """Render the same few shots with every profile and report time per shot"""
+    shots = hair_shots(hair_dir, output_dir)[:samples] + preset_shots(output_dir, library)[:1]
+    report = {}
+    for profile in RENDER_PROFILES:
+        print(f"\n=== Profile: {profile} ===")
+        profile_shots = [{**shot, 'output': os.path.join(output_dir, profile, os.path.basename(shot['output']))}
+                         for shot in shots]
+        try:
+            results = render_shots(avatar_path, profile_shots, profile=profile)
+        except RuntimeError as e:
+            # e.g. EEVEE without a GPU context
+            print(f"  {profile} unavailable: {e}")
+            report[profile] = None
+            continue
+        seconds = [r['seconds'] for r in results]
+        report[profile] = {
+            'shots': len(seconds),
+            'total_seconds': round(sum(seconds), 2),
+            'seconds_per_shot': round(sum(seconds) / len(seconds), 3) if seconds else None,
         }
 
-        for morph_key, value in morph_values.items():
-            target_name = morph_name_map.get(morph_key)
-            if target_name and target_name in shape_keys:
-                # Convert -1 to 1 range to 0 to 1 for shape key
-                shape_keys[target_name].value = (value + 1) / 2
-
-        # Render
-        output_path = os.path.join(output_dir, f"{preset_name}.webp")
-        bpy.context.scene.render.filepath = output_path
-        bpy.ops.render.render(write_still=True)
+    print(f"\n{'Profile':<12} {'Shots':>6} {'Per shot':>10}")
+    for profile, entry in report.items():
+        if entry:
+            print(f"{profile:<12} {entry['shots']:>6} {entry['seconds_per_shot']:>9.2f}s")
+        else:
+            print(f"{profile:<12} {'-':>6} {'failed':>10}")
 
-    print(f"\nFace preset thumbnails saved to: {output_dir}")
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, 'benchmark.json'), 'w') as f:
+        json.dump(report, f, indent=2)
+
+ATLAS_MAX_SIZE = 2048  # Largest atlas page edge (pixels)
+
+def load_pixels(path):
+    """Read an image as a top-down (height, width, 4) float array"""
+    image = bpy.data.images.load(path)
+    width, height = image.size
+    pixels = np.empty(width * height * 4, dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+    bpy.data.images.remove(image)
+    # Blender stores rows bottom-up
+    return pixels.reshape(height, width, 4)[::-1]
+
+def save_pixels(pixels, path, formats):
+    """Write a top-down RGBA array as WebP (via Blender) and/or AVIF (via avifenc)"""
+    height, width = pixels.shape[:2]
+    image = bpy.data.images.new(os.path.basename(path), width, height, alpha=True)
+    image.pixels.foreach_set(np.ascontiguousarray(pixels[::-1]).ravel())
+    written = []
+    if 'webp' in formats:
+        image.filepath_raw = path + '.webp'
+        image.file_format = 'WEBP'
+        image.save()
+        written.append(path + '.webp')
+    if 'avif' in formats:
+        if shutil.which('avifenc'):
+            png_path = path + '.png'
+            image.filepath_raw = png_path
+            image.file_format = 'PNG'
+            image.save()
+            subprocess.run(['avifenc', '--speed', '6', png_path, path + '.avif'], check=True, capture_output=True)
+            os.remove(png_path)
+            written.append(path + '.avif')
+        else:
+            print("  WARNING: avifenc not found, skipping AVIF")
+    bpy.data.images.remove(image)
+    return written
+
+def downsample(pixels):
+    """Halve an RGBA image with a 2x2 box filter on premultiplied alpha"""
+    alpha = pixels[..., 3:4]
+    premultiplied = np.concatenate([pixels[..., :3] * alpha, alpha], axis=-1)
+    height, width = pixels.shape[0] // 2, pixels.shape[1] // 2
+    half = premultiplied[:height * 2, :width * 2].reshape(height, 2, width, 2, 4).mean(axis=(1, 3))
+    out_alpha = half[..., 3:4]
+    rgb = np.divide(half[..., :3], out_alpha, out=np.zeros_like(half[..., :3]), where=out_alpha > 0)
+    return np.concatenate([rgb, out_alpha], axis=-1)
+
+def pack_atlases(shots, output_dir, formats=('webp',), mips=0):
+    """Pack rendered thumbnails into grid atlas pages (one set per shot group,
+    e.g. hair/faces) and write atlas.json with pixel rects and UVs.
+
+    Rects and UVs use a top-left origin, matching CSS sprites and image
+    coordinates in the browser. Cells are power-of-two aligned, so mip
+    levels never blend neighbouring thumbnails.
+    """
+    groups = {}
+    for shot in shots:
+        if os.path.exists(shot['output']):
+            groups.setdefault(shot['name'].split('/')[0], []).append(shot)
+
+    atlases = []
+    sprites = {}
+    for group, group_shots in groups.items():
+        cell_h, cell_w = load_pixels(group_shots[0]['output']).shape[:2]
+        cols = max(1, ATLAS_MAX_SIZE // cell_w)
+        per_page = cols * max(1, ATLAS_MAX_SIZE // cell_h)
+
+        for page_start in range(0, len(group_shots), per_page):
+            page_shots = group_shots[page_start:page_start + per_page]
+            page_cols = min(cols, len(page_shots))
+            page_rows = math.ceil(len(page_shots) / page_cols)
+            width, height = page_cols * cell_w, page_rows * cell_h
+            atlas = np.zeros((height, width, 4), dtype=np.float32)
+
+            for index, shot in enumerate(page_shots):
+                pixels = load_pixels(shot['output'])
+                if pixels.shape[:2] != (cell_h, cell_w):
+                    print(f"  WARNING: {shot['name']} is {pixels.shape[1]}x{pixels.shape[0]}, expected {cell_w}x{cell_h}; skipped")
+                    continue
+                x, y = (index % page_cols) * cell_w, (index // page_cols) * cell_h
+                atlas[y:y + cell_h, x:x + cell_w] = pixels
+                sprites[shot['name']] = {
+                    'atlas': len(atlases),
+                    'x': x, 'y': y, 'w': cell_w, 'h': cell_h,
+                    'u0': x / width, 'v0': y / height,
+                    'u1': (x + cell_w) / width, 'v1': (y + cell_h) / height,
+                }
+
+            stem = f"{group}_atlas_{page_start // per_page}"
+            files = save_pixels(atlas, os.path.join(output_dir, stem), formats)
+            entry = {'files': [os.path.basename(f) for f in files], 'width': width, 'height': height, 'mips': []}
+            level = atlas
+            for mip in range(1, mips + 1):
+                level = downsample(level)
+                mip_files = save_pixels(level, os.path.join(output_dir, f"{stem}.mip{mip}"), formats)
+                entry['mips'].append({
+                    'files': [os.path.basename(f) for f in mip_files],
+                    'width': level.shape[1], 'height': level.shape[0],
+                })
+            atlases.append(entry)
+            print(f"  {stem}: {len(page_shots)} thumbnails, {width}x{height}")
+
+    with open(os.path.join(output_dir, 'atlas.json'), 'w') as f:
+        json.dump({'atlases': atlases, 'sprites': sprites}, f, indent=2)
+    print(f"  Atlas map: {os.path.join(output_dir, 'atlas.json')}")
+
+def parse_options(args):
+    """Split --flag value options out of the positional arguments"""
+    options = {'jobs': 1, 'colors': None, 'threads': None, 'profile': None, 'force': False,
+               'presets': FACE_PRESET_LIBRARY, 'count': 100, 'seed': 0, 'spread': 0.5,
+               'atlas': False, 'atlas_formats': ['webp'], 'atlas_mips': 0}
+    positional = []
+    i = 0
+    while i < len(args):
+        if args[i] == '--jobs' and i + 1 < len(args):
+            options['jobs'] = int(args[i + 1]) or os.cpu_count()
+            i += 2
+        elif args[i] == '--colors' and i + 1 < len(args):
+            options['colors'] = args[i + 1].split(',')
+            unknown = [c for c in options['colors'] if c not in HAIR_COLOR_PALETTE]
+            if unknown:
+                print(f"Unknown hair colors: {', '.join(unknown)}")
+                sys.exit(1)
+            i += 2
+        elif args[i] == '--profile' and i + 1 < len(args):
+            options['profile'] = args[i + 1]
+            if options['profile'] not in RENDER_PROFILES:
+                print(f"Unknown render profile: {options['profile']} (choose from {', '.join(RENDER_PROFILES)})")
+                sys.exit(1)
+            i += 2
+        elif args[i] == '--presets' and i + 1 < len(args):
+            options['presets'] = os.path.abspath(args[i + 1])
+            i += 2
+        elif args[i] == '--count' and i + 1 < len(args):
+            options['count'] = int(args[i + 1])
+            i += 2
+        elif args[i] == '--seed' and i + 1 < len(args):
+            options['seed'] = int(args[i + 1])
+            i += 2
+        elif args[i] == '--spread' and i + 1 < len(args):
+            options['spread'] = float(args[i + 1])
+            i += 2
+        elif args[i] == '--force':
+            options['force'] = True
+            i += 1
+        elif args[i] == '--atlas':
+            options['atlas'] = True
+            i += 1
+        elif args[i] == '--atlas-formats' and i + 1 < len(args):
+            options['atlas_formats'] = args[i + 1].split(',')
+            i += 2
+        elif args[i] == '--atlas-mips' and i + 1 < len(args):
+            options['atlas_mips'] = int(args[i + 1])
+            i += 2
+        elif args[i] == '--threads' and i + 1 < len(args):
+            options['threads'] = int(args[i + 1])
+            i += 2
+        else:
+            positional.append(args[i])
+            i += 1
+    if options['profile'] is None:
+        options['profile'] = PARALLEL_PROFILE if options['jobs'] > 1 else 'eevee'
+    return positional, options
 
 def main():
-    args = get_args()
+    args, options = parse_options(get_args())
 
     if len(args) < 1:
         print("Usage:")
         print("  Hair:    blender --background --python render_thumbnails.py -- hair <avatar.glb> <hair_dir> <output_dir>")
         print("  Presets: blender --background --python render_thumbnails.py -- presets <avatar.glb> <output_dir>")
         print("  All:     blender --background --python render_thumbnails.py -- all <avatar.glb> <hair_dir> <output_base_dir>")
+        print("  Bench:   blender --background --python render_thumbnails.py -- benchmark <avatar.glb> <hair_dir> <output_dir>")
+        print("  QA grid: blender --background --python render_thumbnails.py -- grid <avatar.glb> <output_dir> [--count 100] [--seed 0]")
+        print("")
+        print("Options:")
+        print("  --jobs N          Render in N background Blender processes (0 = one per core)")
+        print("  --colors a,b,...  Render each hair style in these HAIR_COLOR_PALETTE colors")
+        print("  --profile NAME    eevee (default, needs a GPU), workbench (matcap + outline) or cycles (CPU, denoised;")
+        print("                    the default with --jobs)")
+        print("  --presets FILE    Face preset library (default: the frontend's facePresets.json)")
+        print("  --spread X        Random face morph range for grid mode (default 0.5)")
+        print("  --force           Re-render every shot, ignoring the fingerprint cache")
+        print("  --atlas           Also pack thumbnails into sprite atlases with an atlas.json rect/UV map")
+        print("  --atlas-formats   Comma-separated atlas encodings: webp (default), avif (needs avifenc)")
+        print("  --atlas-mips N    Also write N half-resolution atlas levels")
         sys.exit(1)
 
     mode = args[0]
+    library = load_face_library(options['presets'])
+
+    if mode == 'worker' and len(args) >= 3:
+        # Internal: render one shard for render_parallel
+        with open(args[2]) as f:
+            shots = json.load(f)
+        results = render_shots(os.path.abspath(args[1]), shots, options['threads'], options['profile'])
+        with open(args[2].replace(".json", ".results.json"), 'w') as f:
+            json.dump(results, f)
+        return
+
+    if mode == 'benchmark' and len(args) >= 4:
+        benchmark_profiles(os.path.abspath(args[1]), os.path.abspath(args[2]), os.path.abspath(args[3]), library)
+        return
 
     if mode == 'hair' and len(args) >= 4:
         avatar_path = os.path.abspath(args[1])
-        hair_dir = os.path.abspath(args[2])
-        output_dir = os.path.abspath(args[3])
-        render_hair_thumbnails(avatar_path, hair_dir, output_dir)
+        shots = hair_shots(os.path.abspath(args[2]), os.path.abspath(args[3]), options['colors'])
 
     elif mode == 'presets' and len(args) >= 3:
         avatar_path = os.path.abspath(args[1])
-        output_dir = os.path.abspath(args[2])
-        render_face_presets(avatar_path, output_dir)
+        shots = preset_shots(os.path.abspath(args[2]), library)
 
     elif mode == 'all' and len(args) >= 4:
         avatar_path = os.path.abspath(args[1])
         hair_dir = os.path.abspath(args[2])
         output_base = os.path.abspath(args[3])
+        shots = (hair_shots(hair_dir, os.path.join(output_base, 'hair'), options['colors'])
+                 + preset_shots(os.path.join(output_base, 'faces'), library))
 
-        hair_output = os.path.join(output_base, 'hair')
-        faces_output = os.path.join(output_base, 'faces')
-
-        render_hair_thumbnails(avatar_path, hair_dir, hair_output)
-        clear_scene()
-        render_face_presets(avatar_path, faces_output)
+    elif mode == 'grid' and len(args) >= 3:
+        # QA sheet of random faces: rendered like presets, then packed into atlases
+        avatar_path = os.path.abspath(args[1])
+        output_dir = os.path.abspath(args[2])
+        presets = random_presets(library, options['count'], options['seed'], options['spread'])
+        os.makedirs(output_dir, exist_ok=True)
+        with open(os.path.join(output_dir, 'qa_presets.json'), 'w') as f:
+            json.dump(presets, f, indent=2)
+        shots = preset_shots(os.path.join(output_dir, 'qa'), library, presets, group='qa')
+        options['atlas'] = True
 
     else:
         print(f"Invalid arguments for mode: {mode}")
         sys.exit(1)
 
+    start = time.perf_counter()
+    to_render, cached, fingerprints = stale_shots(avatar_path, shots, options['profile'], options['force'])
+    print(f"\n{len(to_render)} shots to render, {len(cached)} unchanged")
+    results = []
+    if to_render and options['jobs'] > 1:
+        results = render_parallel(avatar_path, to_render, options['jobs'], options['profile'])
+    elif to_render:
+        results = render_shots(avatar_path, to_render, profile=options['profile'])
+    results += cached
+    write_results(shots, results, time.perf_counter() - start, options['jobs'], options['profile'])
+    save_thumbnail_cache(shots, results, fingerprints)
+
+    if options['atlas']:
+        print("\nPacking sprite atlases...")
+        base = os.path.commonpath([os.path.dirname(shot['output']) for shot in shots])
+        pack_atlases(shots, base, options['atlas_formats'], options['atlas_mips'])
+
     print("\n" + "=" * 60)
     print("THUMBNAIL RENDERING COMPLETE")
     print("=" * 60)
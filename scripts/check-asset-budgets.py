@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Asset Budget Linter
+===================
+Scans the frontend's public models, avatars and textures and checks every
+asset against per-folder performance budgets (scripts/asset-budgets.json).
+GLBs are read directly with glbtools, no Blender needed.
+
+Usage:
+  python scripts/check-asset-budgets.py [options]
+
+Options:
+  --public <dir>     Public directory to scan (default: apps/frontend/public)
+  --config <file>    Budget config (default: scripts/asset-budgets.json)
+  --jobs <n>         Parallel worker processes (default: one per core)
+  --json             Print the full report as JSON
+
+Exits with status 1 if any asset is over budget, listing the worst
+offenders first (ranked by how far over budget they are).
+"""
+
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import glbtools  # noqa: E402
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PUBLIC = os.path.join(SCRIPT_DIR, "..", "apps", "frontend", "public")
+DEFAULT_CONFIG = glbtools.BUDGETS_CONFIG
+SCAN_FOLDERS = ["models", "assets/avatars", "textures"]
+TEXTURE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".ktx2")
+
+
+def collect_assets(public_dir):
+    """GLBs and standalone textures under the scanned folders"""
+    assets = []
+    for folder in SCAN_FOLDERS:
+        root_dir = os.path.join(public_dir, folder)
+        for root, _, files in os.walk(root_dir):
+            for name in sorted(files):
+                if name.lower().endswith((".glb",) + TEXTURE_EXTENSIONS):
+                    assets.append(os.path.join(root, name))
+    return assets
+
+
+def measure(path):
+    """Metrics for one asset (runs in a worker process)"""
+    try:
+        if path.lower().endswith(".glb"):
+            return path, glbtools.asset_stats(path), None
+        # Whole file: a JPEG's SOF marker can sit behind large EXIF/ICC segments
+        with open(path, "rb") as f:
+            size = glbtools.image_size(f.read())
+        if size is None:
+            return path, None, "unknown image dimensions"
+        return path, {
+            "textures": [{"name": os.path.basename(path), "width": size[0], "height": size[1]}],
+            "file_bytes": os.path.getsize(path),
+        }, None
+    except (OSError, ValueError, KeyError) as e:
+        return path, None, str(e)
+
+
+def check(stats, budget):
+    """List of (metric, value, limit) over budget"""
+    largest_texture = max((max(t["width"] or 0, t["height"] or 0) for t in stats.get("textures", [])), default=0)
+    values = {
+        "triangles": stats.get("triangles", 0),
+        "vertices": stats.get("vertices", 0),
+        "morph_bytes": stats.get("morph_bytes", 0),
+        "texture_size": largest_texture,
+        "file_bytes": stats["file_bytes"],
+    }
+    return [(metric, value, budget[f"max_{metric}"])
+            for metric, value in values.items()
+            if f"max_{metric}" in budget and value > budget[f"max_{metric}"]]
+
+
+def severity(violations):
+    """How far over budget the worst metric is (value / limit)"""
+    return max(value / limit if limit else float("inf") for _, value, limit in violations)
+
+
+def format_value(metric, value):
+    if metric.endswith("_bytes"):
+        return f"{value / 1024 / 1024:.2f} MB" if value >= 1024 * 1024 else f"{value / 1024:.0f} KB"
+    if metric == "texture_size":
+        return f"{value}px"
+    return f"{value:,}"
+
+
+def parse_args():
+    args = sys.argv[1:]
+    options = {"public": DEFAULT_PUBLIC, "config": DEFAULT_CONFIG, "jobs": None, "json": False}
+    i = 0
+    while i < len(args):
+        if args[i] == "--public" and i + 1 < len(args):
+            options["public"] = args[i + 1]
+            i += 2
+        elif args[i] == "--config" and i + 1 < len(args):
+            options["config"] = args[i + 1]
+            i += 2
+        elif args[i] == "--jobs" and i + 1 < len(args):
+            options["jobs"] = int(args[i + 1]) or None
+            i += 2
+        elif args[i] == "--json":
+            options["json"] = True
+            i += 1
+        else:
+            print(__doc__)
+            sys.exit(2)
+    return options
+
+
+def main():
+    options = parse_args()
+    public_dir = os.path.abspath(options["public"])
+    config = glbtools.load_budgets(options["config"])
+
+    assets = collect_assets(public_dir)
+    with ProcessPoolExecutor(max_workers=options["jobs"]) as pool:
+        measured = list(pool.map(measure, assets, chunksize=8))
+
+    results = []
+    errors = []
+    for path, stats, error in measured:
+        relative = os.path.relpath(path, public_dir)
+        if error:
+            errors.append({"file": relative, "error": error})
+            continue
+        violations = check(stats, glbtools.budget_for(relative, config))
+        results.append({"file": relative, "stats": stats, "violations": violations})
+
+    offenders = sorted((r for r in results if r["violations"]), key=lambda r: -severity(r["violations"]))
+
+    if options["json"]:
+        print(json.dumps({"assets": results, "errors": errors}, indent=2))
+    else:
+        print(f"Scanned {len(assets)} assets in {public_dir}")
+        for error in errors:
+            print(f"  ERROR: {error['file']}: {error['error']}")
+        if offenders:
+            print(f"\n{len(offenders)} assets over budget (worst first):\n")
+            for rank, result in enumerate(offenders, start=1):
+                print(f"{rank:>3}. {result['file']}  ({severity(result['violations']):.1f}x over)")
+                for metric, value, limit in result["violations"]:
+                    print(f"       {metric:<13} {format_value(metric, value):>12} > {format_value(metric, limit)}")
+        else:
+            print("All assets within budget ✓")
+
+    sys.exit(1 if offenders or errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+GLB Texture Compressor
+======================
+Post-export stage: resizes the textures embedded in GLBs to a per-asset cap
+and re-encodes them as KTX2 (KHR_texture_basisu) or WebP (EXT_texture_webp).
+Normal maps use UASTC, everything else ETC1S. GLBs are rewritten with
+glbtools, no Blender needed.
+
+Usage:
+  python scripts/compress-glb-textures.py <file.glb|dir> [...] [options]
+
+Options:
+  --format <webp|ktx2>   Target encoding (default: webp; ktx2 is opt-in until
+                         the game registers a KTX2Loader)
+  --max-size <px>        Resize cap for every texture (default: max_texture_size
+                         from scripts/asset-budgets.json for the file's folder)
+  --no-fallback          Drop the original PNG/JPEG and require the extension
+  --output <dir>         Write here instead of overwriting the inputs
+  --jobs <n>             Parallel worker processes (default: one per core)
+  --json                 Print the report as JSON
+
+Requires `cwebp` for WebP and `toktx` (KTX-Software 4.3+) for KTX2. If the
+chosen encoder is missing or fails on a texture it falls back to another
+format the game can load (never to KTX2), then to leaving the original
+image untouched.
+
+By default a PNG/JPEG fallback stays as the texture's source so loaders
+without the extension still work (three.js only reads KTX2 when the
+GLTFLoader has a KTX2Loader, and the game registers none yet). The fallback
+is resized to the same cap with ImageMagick (`magick`/`convert`) or, failing
+that, cwebp + dwebp; without either it keeps the source resolution. The
+report lists download size and the estimated GPU memory of the image the
+game actually loads, before and after, for each file.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import glbtools  # noqa: E402
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PUBLIC_DIR = os.path.join(SCRIPT_DIR, "..", "apps", "frontend", "public")
+DEFAULT_MAX_SIZE = 2048
+
+EXTENSIONS = {"ktx2": "KHR_texture_basisu", "webp": "EXT_texture_webp"}
+MIME_TYPES = {"ktx2": "image/ktx2", "webp": "image/webp"}
+
+# Material slot -> texture kind. Normals need UASTC (ETC1S blocks wreck them),
+# data maps stay linear.
+SLOT_KINDS = {
+    "baseColorTexture": "color",
+    "emissiveTexture": "color",
+    "normalTexture": "normal",
+    "metallicRoughnessTexture": "data",
+    "occlusionTexture": "data",
+}
+
+# When one image feeds several slots the strongest kind wins (normals and
+# data maps must stay linear)
+KIND_PRIORITY = {"color": 0, "data": 1, "normal": 2}
+
+# GPU bytes per pixel once uploaded: PNG/JPEG/WebP decode to RGBA8; ETC1S
+# transcodes to ETC1/BC1 (BC3/ETC2 with alpha), UASTC to ASTC 4x4/BC7.
+BYTES_PER_PIXEL = {"rgba8": 4.0, "etc1s": 0.5, "etc1s_alpha": 1.0, "uastc": 1.0}
+MIP_CHAIN = 4 / 3
+
+# Extensions the game's GLTFLoader decodes today. With no KTX2Loader
+# registered, KTX2 textures load their PNG/JPEG fallback instead.
+CLIENT_EXTENSIONS = {"EXT_texture_webp"}
+
+
+def encode_ktx2(source, target, kind, size):
+    command = ["toktx", "--t2", "--genmipmap", "--resize", f"{size[0]}x{size[1]}"]
+    if kind == "normal":
+        command += ["--encode", "uastc", "--uastc_quality", "2", "--zcmp", "18", "--assign_oetf", "linear"]
+    else:
+        command += ["--encode", "etc1s", "--clevel", "2", "--qlevel", "160",
+                    "--assign_oetf", "srgb" if kind == "color" else "linear"]
+    return command + [target, source]
+
+
+def encode_webp(source, target, kind, size):
+    quality = {"color": "85", "data": "90", "normal": "95"}[kind]
+    return ["cwebp", "-quiet", "-mt", "-q", quality, "-alpha_q", "100",
+            "-resize", str(size[0]), str(size[1]), source, "-o", target]
+
+
+ENCODERS = {"ktx2": ("toktx", encode_ktx2), "webp": ("cwebp", encode_webp)}
+
+
+def target_size(size, max_size):
+    """Halve until the longest side fits, keeping power-of-two sources power-of-two"""
+    width, height = size
+    while max(width, height) > max_size:
+        width, height = max(1, width // 2), max(1, height // 2)
+    return width, height
+
+
+def has_alpha(data):
+    """PNG colour types 4/6 carry alpha; JPEG never does"""
+    head = bytes(data[:26])
+    return head.startswith(b"\x89PNG") and head[25] in (4, 6)
+
+
+def gpu_bytes(size, encoding):
+    return int(size[0] * size[1] * BYTES_PER_PIXEL[encoding] * MIP_CHAIN)
+
+
+def texture_kinds(gltf):
+    """Texture index -> kind, from every material slot that samples it"""
+    kinds = {}
+    for material in gltf.get("materials", []):
+        slots = dict(material.get("pbrMetallicRoughness", {}), **material)
+        for slot, kind in SLOT_KINDS.items():
+            if isinstance(slots.get(slot), dict) and "index" in slots[slot]:
+                index = slots[slot]["index"]
+                kinds[index] = max(kinds.get(index, kind), kind, key=KIND_PRIORITY.get)
+    return kinds
+
+
+def write_source(data, workdir, name):
+    source = os.path.join(workdir, name + (".png" if bytes(data[:4]) == b"\x89PNG" else ".jpg"))
+    with open(source, "wb") as f:
+        f.write(data)
+    return source
+
+
+def resize_fallback(source, size, workdir, name):
+    """(bytes, mimeType) of a PNG/JPEG copy of source resized to size, or (None, None)"""
+    magick = shutil.which("magick") or shutil.which("convert")
+    if magick:
+        target = os.path.join(workdir, f"{name}_fallback{os.path.splitext(source)[1]}")
+        command = [magick, source, "-resize", f"{size[0]}x{size[1]}!", "-quality", "90", target]
+        mime_type = "image/png" if target.endswith(".png") else "image/jpeg"
+    elif shutil.which("cwebp") and shutil.which("dwebp"):
+        # Lossless WebP is only a carrier for the resize; dwebp writes the PNG
+        carrier = os.path.join(workdir, f"{name}_fallback.webp")
+        target = os.path.join(workdir, f"{name}_fallback.png")
+        resize = ["cwebp", "-quiet", "-lossless", "-exact", "-resize", str(size[0]), str(size[1]), source, "-o", carrier]
+        if subprocess.run(resize, capture_output=True).returncode != 0:
+            return None, None
+        command = ["dwebp", "-quiet", carrier, "-o", target]
+        mime_type = "image/png"
+    else:
+        return None, None
+    if subprocess.run(command, capture_output=True).returncode != 0 or not os.path.exists(target):
+        return None, None
+    with open(target, "rb") as f:
+        return f.read(), mime_type
+
+
+def encode(source, kind, size, formats, workdir, name):
+    """Try each format in turn; (format, bytes) of the first that works, or (None, None)"""
+    for fmt in formats:
+        tool, build = ENCODERS[fmt]
+        if not shutil.which(tool):
+            continue
+        target = os.path.join(workdir, f"{name}.{fmt}")
+        result = subprocess.run(build(source, target, kind, size), capture_output=True)
+        if result.returncode == 0 and os.path.exists(target):
+            with open(target, "rb") as f:
+                return fmt, f.read()
+    return None, None
+
+
+def compress_glb(path, output, options):
+    """Re-encode every embedded PNG/JPEG in one GLB; returns its report"""
+    glb = glbtools.read_glb(path)
+    gltf = glb["json"]
+    # Only retry with formats the game loads, so KTX2 is only ever written on request
+    formats = [options["format"]] + [fmt for fmt in ENCODERS
+                                     if fmt != options["format"] and EXTENSIONS[fmt] in CLIENT_EXTENSIONS]
+    max_size = options["max_size"] or budget_max_size(path)
+    kinds = texture_kinds(gltf)
+
+    # Image index -> kind and the textures that sample it
+    users = {}
+    for texture_index, texture in enumerate(gltf.get("textures", [])):
+        if "source" in texture:
+            kind = kinds.get(texture_index, "color")
+            entry = users.setdefault(texture["source"], {"kind": kind, "textures": []})
+            entry["kind"] = max(entry["kind"], kind, key=KIND_PRIORITY.get)
+            entry["textures"].append(texture)
+
+    textures = []
+    used = set()
+    changed = False
+    with tempfile.TemporaryDirectory() as workdir:
+        for image_index, entry in sorted(users.items()):
+            image = gltf["images"][image_index]
+            data = glbtools.image_bytes(glb, image_index) if "bufferView" in image else None
+            size = glbtools.image_size(data) if data is not None else None
+            report = {"image": image.get("name", f"image_{image_index}"), "kind": entry["kind"]}
+            textures.append(report)
+            if size is None or image.get("mimeType") not in ("image/png", "image/jpeg"):
+                report["result"] = "skipped (not an embedded PNG/JPEG)"
+                continue
+
+            new_size = target_size(size, max_size)
+            name = f"image_{image_index}"
+            source = write_source(data, workdir, name)
+            fmt, encoded = encode(source, entry["kind"], new_size, formats, workdir, name)
+            report.update(size=list(size), bytes_before=len(data), gpu_before=gpu_bytes(size, "rgba8"))
+
+            # Whatever stays as a PNG/JPEG is what clients without the extension
+            # load, so it gets the same cap
+            fallback, fallback_size = data, size
+            if (fmt is None or options["fallback"]) and new_size != size:
+                resized, mime_type = resize_fallback(source, new_size, workdir, name)
+                if resized is None:
+                    report["warning"] = "fallback kept at source size (needs ImageMagick, or cwebp + dwebp)"
+                else:
+                    fallback, fallback_size = resized, new_size
+                    glbtools.set_buffer_view(glb, image["bufferView"], resized)
+                    image["mimeType"] = mime_type
+                    changed = True
+
+            if fmt is None:
+                report.update(result="kept original (no encoder succeeded)", new_size=list(fallback_size),
+                              bytes_after=len(fallback), gpu_after=gpu_bytes(fallback_size, "rgba8"))
+                continue
+
+            if fmt == "webp":
+                gpu_encoding = "rgba8"
+            elif entry["kind"] == "normal":
+                gpu_encoding = "uastc"
+            else:
+                gpu_encoding = "etc1s_alpha" if has_alpha(data) else "etc1s"
+            extension = EXTENSIONS[fmt]
+            loads_extension = extension in CLIENT_EXTENSIONS or not options["fallback"]
+            report.update(
+                result=fmt,
+                new_size=list(new_size),
+                bytes_after=len(encoded) + (len(fallback) if options["fallback"] else 0),
+                gpu_after=gpu_bytes(new_size, gpu_encoding) if loads_extension else gpu_bytes(fallback_size, "rgba8"),
+                gpu_with_extension=gpu_bytes(new_size, gpu_encoding),
+                client_loads=fmt if loads_extension else "fallback",
+            )
+            used.add(fmt)
+            changed = True
+
+            if options["fallback"]:
+                source_index = len(gltf["images"])
+                gltf["images"].append({"name": image.get("name", name), "mimeType": MIME_TYPES[fmt],
+                                       "bufferView": glbtools.add_buffer_view(glb, encoded)})
+            else:
+                # Swap the bytes in place; the image is now only reachable through the extension
+                source_index = image_index
+                glbtools.set_buffer_view(glb, image["bufferView"], encoded)
+                image["mimeType"] = MIME_TYPES[fmt]
+            for texture in entry["textures"]:
+                texture.setdefault("extensions", {})[extension] = {"source": source_index}
+                if not options["fallback"]:
+                    texture.pop("source")
+
+    for fmt in used:
+        extension = EXTENSIONS[fmt]
+        if extension not in gltf.setdefault("extensionsUsed", []):
+            gltf["extensionsUsed"].append(extension)
+        if not options["fallback"] and extension not in gltf.setdefault("extensionsRequired", []):
+            gltf["extensionsRequired"].append(extension)
+
+    file_before = os.path.getsize(path)
+    file_after = glbtools.write_glb(glb, output) if changed else file_before
+    if not changed and output != path:
+        shutil.copyfile(path, output)
+    converted = [t for t in textures if "gpu_before" in t]
+    return {
+        "file": path,
+        "output": output,
+        "max_size": max_size,
+        "textures": textures,
+        "file_bytes_before": file_before,
+        "file_bytes_after": file_after,
+        "gpu_bytes_before": sum(t["gpu_before"] for t in converted),
+        "gpu_bytes_after": sum(t["gpu_after"] for t in converted),
+    }
+
+
+def budget_max_size(path):
+    """max_texture_size from the budgets for files under the public dir"""
+    relative = os.path.relpath(os.path.abspath(path), os.path.abspath(PUBLIC_DIR))
+    if relative.startswith(".."):
+        return DEFAULT_MAX_SIZE
+    return glbtools.budget_for(relative, glbtools.load_budgets()).get("max_texture_size", DEFAULT_MAX_SIZE)
+
+
+def run(job):
+    path, output, options = job
+    try:
+        return compress_glb(path, output, options), None
+    except (OSError, ValueError, KeyError) as e:
+        return None, f"{path}: {e}"
+
+
+def format_bytes(n):
+    return f"{n / 1024 / 1024:.2f} MB" if n >= 1024 * 1024 else f"{n / 1024:.0f} KB"
+
+
+def saving(before, after):
+    return f"{(1 - after / before) * 100:5.1f}%" if before else "    -"
+
+
+def parse_args():
+    args = sys.argv[1:]
+    options = {"paths": [], "format": "webp", "max_size": None, "fallback": True,
+               "output": None, "jobs": None, "json": False}
+    i = 0
+    while i < len(args):
+        if args[i] == "--format" and i + 1 < len(args) and args[i + 1] in ENCODERS:
+            options["format"] = args[i + 1]
+            i += 2
+        elif args[i] == "--max-size" and i + 1 < len(args):
+            options["max_size"] = int(args[i + 1])
+            i += 2
+        elif args[i] == "--no-fallback":
+            options["fallback"] = False
+            i += 1
+        elif args[i] == "--output" and i + 1 < len(args):
+            options["output"] = args[i + 1]
+            i += 2
+        elif args[i] == "--jobs" and i + 1 < len(args):
+            options["jobs"] = int(args[i + 1]) or None
+            i += 2
+        elif args[i] == "--json":
+            options["json"] = True
+            i += 1
+        elif not args[i].startswith("--"):
+            options["paths"].append(args[i])
+            i += 1
+        else:
+            print(__doc__)
+            sys.exit(2)
+    if not options["paths"]:
+        print(__doc__)
+        sys.exit(2)
+    return options
+
+
+def main():
+    options = parse_args()
+    tool = ENCODERS[options["format"]][0]
+    if not shutil.which(tool):
+        print(f"WARNING: {tool} not found on PATH, falling back to the other format where possible")
+    if not options["fallback"] and EXTENSIONS[options["format"]] not in CLIENT_EXTENSIONS:
+        print(f"WARNING: the game cannot load {EXTENSIONS[options['format']]} yet; --no-fallback output will not render")
+
+    paths = glbtools.expand_paths(options["paths"])
+    if options["output"]:
+        os.makedirs(options["output"], exist_ok=True)
+    jobs = [(path, os.path.join(options["output"], os.path.basename(path)) if options["output"] else path,
+             {k: options[k] for k in ("format", "max_size", "fallback")})
+            for path in paths]
+
+    with ProcessPoolExecutor(max_workers=options["jobs"]) as pool:
+        results = list(pool.map(run, jobs))
+    reports = [report for report, _ in results if report]
+    errors = [error for _, error in results if error]
+
+    if options["json"]:
+        print(json.dumps({"files": reports, "errors": errors}, indent=2))
+    else:
+        for report in reports:
+            print(f"\n{report['file']}  (cap {report['max_size']}px)")
+            for texture in report["textures"]:
+                if "gpu_before" not in texture:
+                    print(f"  {texture['image']:<32} {texture['result']}")
+                    continue
+                size = "x".join(map(str, texture["size"]))
+                new_size = "x".join(map(str, texture.get("new_size", texture["size"])))
+                loads = f" (game loads {texture['client_loads']})" if "client_loads" in texture else ""
+                print(f"  {texture['image']:<32} {texture['kind']:<6} {size:>9} -> {new_size:<9} "
+                      f"{texture['result']:<5} {format_bytes(texture['gpu_before']):>9} -> "
+                      f"{format_bytes(texture['gpu_after'])} GPU{loads}")
+                if "warning" in texture:
+                    print(f"    WARNING: {texture['warning']}")
+            print(f"  download {format_bytes(report['file_bytes_before'])} -> {format_bytes(report['file_bytes_after'])}"
+                  f" ({saving(report['file_bytes_before'], report['file_bytes_after'])} saved)")
+            print(f"  GPU      {format_bytes(report['gpu_bytes_before'])} -> {format_bytes(report['gpu_bytes_after'])}"
+                  f" ({saving(report['gpu_bytes_before'], report['gpu_bytes_after'])} saved)")
+        for error in errors:
+            print(f"ERROR: {error}")
+
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,621 @@
+#!/usr/bin/env python3
+"""
+GLB Tools
+=========
+Read binary glTF (.glb) files without Blender: header, JSON chunk, and
+accessors as zero-copy NumPy views over the BIN chunk.
+
+Usage:
+  python scripts/glbtools.py inspect <file.glb> [<file.glb> ...] [--json]
+  python scripts/glbtools.py repack <in.glb> <out.glb>
+  python scripts/glbtools.py check <file.glb> [<file.glb> ...]
+
+Produces the same report as scripts/blender/inspect_mesh.py (meshes,
+armatures, shape keys, materials, vertex/face totals) in milliseconds, so
+it can be run over hundreds of files at once.
+
+Requires NumPy. Blender's bundled Python already ships it, so the Blender
+scripts that import this module need nothing extra; for the system
+interpreter install it with `python3 -m pip install numpy`.
+
+Library use:
+  import glbtools
+  glb = glbtools.read_glb("model.glb")  # memory-mapped, nothing loaded yet
+  positions = glbtools.accessor_array(glb, primitive["attributes"]["POSITION"])
+  glbtools.replace_accessor(glb, index, new_array)
+  glbtools.write_glb(glb, "out.glb")  # streams unchanged buffer views from the map
+"""
+
+import copy
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+
+import numpy as np
+
+GLB_MAGIC = b"glTF"
+CHUNK_JSON = 0x4E4F534A
+CHUNK_BIN = 0x004E4942
+
+COMPONENT_DTYPES = {
+    5120: np.int8,
+    5121: np.uint8,
+    5122: np.int16,
+    5123: np.uint16,
+    5125: np.uint32,
+    5126: np.float32,
+}
+TYPE_COMPONENTS = {
+    "SCALAR": 1, "VEC2": 2, "VEC3": 3, "VEC4": 4,
+    "MAT2": 4, "MAT3": 9, "MAT4": 16,
+}
+
+MODE_TRIANGLES = 4
+MODE_TRIANGLE_STRIP = 5
+MODE_TRIANGLE_FAN = 6
+
+
+# ============================================================
+# READING
+# ============================================================
+
+def parse_glb(data, path=None):
+    """Split GLB bytes into {'json', 'bin', 'path'}; 'bin' is a memoryview into data"""
+    view = memoryview(data)
+    if len(view) < 12:
+        raise ValueError(f"{path}: too short to be a GLB")
+    magic, version, length = struct.unpack_from("<4sII", view, 0)
+    if magic != GLB_MAGIC:
+        raise ValueError(f"{path}: not a GLB file (magic {magic!r})")
+    if version != 2:
+        raise ValueError(f"{path}: unsupported GLB version {version}")
+
+    gltf = None
+    bin_chunk = None
+    bin_offset = None
+    offset = 12
+    while offset + 8 <= min(length, len(view)):
+        chunk_length, chunk_type = struct.unpack_from("<II", view, offset)
+        start = offset + 8
+        if chunk_type == CHUNK_JSON:
+            gltf = json.loads(bytes(view[start:start + chunk_length]))
+        elif chunk_type == CHUNK_BIN and bin_chunk is None:
+            bin_chunk = view[start:start + chunk_length]
+            bin_offset = start
+        offset = start + chunk_length
+
+    if gltf is None:
+        raise ValueError(f"{path}: missing JSON chunk")
+    return {"json": gltf, "bin": bin_chunk, "bin_offset": bin_offset, "path": path}
+
+
+def read_glb(path):
+    """Memory-map a GLB; accessors and buffer views are views into the mapping,
+    so even 200 MB map files are only paged in where they are read"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError(f"{path}: empty file")
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    glb = parse_glb(mapping, path)
+    glb["mmap"] = mapping
+    glb["replaced"] = {}
+    return glb
+
+
+def buffer_view_bytes(glb, index):
+    """Zero-copy memoryview of a bufferView (BIN chunk buffers only)"""
+    if index in glb.get("replaced", {}):
+        return memoryview(glb["replaced"][index])
+    view = glb["json"]["bufferViews"][index]
+    if view.get("buffer", 0) != 0 or glb["bin"] is None:
+        raise ValueError(f"{glb['path']}: bufferView {index} is not in the GLB BIN chunk")
+    start = view.get("byteOffset", 0)
+    return glb["bin"][start:start + view["byteLength"]]
+
+
+def accessor_array(glb, index):
+    """Accessor data as a NumPy array of shape (count,) or (count, components).
+
+    Tightly packed and strided accessors are returned as views over the BIN
+    chunk without copying. Sparse accessors and accessors without a
+    bufferView need a materialized copy.
+    """
+    accessor = glb["json"]["accessors"][index]
+    dtype = np.dtype(COMPONENT_DTYPES[accessor["componentType"]])
+    components = TYPE_COMPONENTS[accessor["type"]]
+    count = accessor["count"]
+    shape = (count,) if components == 1 else (count, components)
+
+    if "bufferView" in accessor:
+        data = buffer_view_bytes(glb, accessor["bufferView"])
+        stride = glb["json"]["bufferViews"][accessor["bufferView"]].get("byteStride") or dtype.itemsize * components
+        strides = (stride,) if components == 1 else (stride, dtype.itemsize)
+        array = np.ndarray(shape, dtype=dtype, buffer=data, offset=accessor.get("byteOffset", 0), strides=strides)
+    else:
+        array = np.zeros(shape, dtype=dtype)
+
+    sparse = accessor.get("sparse")
+    if sparse:
+        array = array.copy()
+        index_dtype = np.dtype(COMPONENT_DTYPES[sparse["indices"]["componentType"]])
+        index_data = buffer_view_bytes(glb, sparse["indices"]["bufferView"])
+        rows = np.frombuffer(index_data, dtype=index_dtype, count=sparse["count"],
+                             offset=sparse["indices"].get("byteOffset", 0))
+        value_data = buffer_view_bytes(glb, sparse["values"]["bufferView"])
+        values = np.frombuffer(value_data, dtype=dtype, count=sparse["count"] * components,
+                               offset=sparse["values"].get("byteOffset", 0))
+        array[rows] = values.reshape((sparse["count"],) + shape[1:])
+
+    return array
+
+
+# ============================================================
+# WRITING
+# ============================================================
+
+def set_buffer_view(glb, index, data):
+    """Replace a buffer view's bytes; written (and resized) on save"""
+    glb.setdefault("replaced", {})[index] = bytes(data)
+
+
+def add_buffer_view(glb, data, target=None, byte_stride=None):
+    """Append a new buffer view holding data; returns its index"""
+    views = glb["json"].setdefault("bufferViews", [])
+    view = {"buffer": 0, "byteOffset": 0, "byteLength": len(data)}
+    if target is not None:
+        view["target"] = target
+    if byte_stride is not None:
+        view["byteStride"] = byte_stride
+    views.append(view)
+    set_buffer_view(glb, len(views) - 1, data)
+    return len(views) - 1
+
+
+def replace_accessor(glb, index, array):
+    """Point an accessor at a new, tightly packed buffer view holding array.
+
+    The old view is dropped on save if nothing else references it.
+    """
+    accessor = glb["json"]["accessors"][index]
+    array = np.ascontiguousarray(array)
+    component_type = next(code for code, dtype in COMPONENT_DTYPES.items() if np.dtype(dtype) == array.dtype)
+    target = glb["json"]["bufferViews"][accessor["bufferView"]].get("target") if "bufferView" in accessor else None
+    accessor["bufferView"] = add_buffer_view(glb, array.tobytes(), target)
+    accessor["componentType"] = component_type
+    accessor["count"] = len(array)
+    accessor.pop("byteOffset", None)
+    accessor.pop("sparse", None)
+    if "min" in accessor or "max" in accessor:
+        flat = array.reshape(len(array), -1)
+        accessor["min"] = flat.min(axis=0).tolist()
+        accessor["max"] = flat.max(axis=0).tolist()
+
+
+def referenced_views(node, found):
+    """Collect every integer 'bufferView' reference anywhere in the JSON"""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key == "bufferView" and isinstance(value, int):
+                found.add(value)
+            else:
+                referenced_views(value, found)
+    elif isinstance(node, list):
+        for value in node:
+            referenced_views(value, found)
+    return found
+
+
+def remap_views(node, mapping):
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key == "bufferView" and isinstance(value, int):
+                node[key] = mapping[value]
+            else:
+                remap_views(value, mapping)
+    elif isinstance(node, list):
+        for value in node:
+            remap_views(value, mapping)
+
+
+def align4(n):
+    return (n + 3) & ~3
+
+
+def write_glb(glb, path):
+    """Write the GLB, streaming unchanged buffer views straight from the input
+    mapping and dropping views nothing references. Chunks and views are
+    4-byte aligned as the spec requires. Safe to overwrite the input path.
+    The handle is left untouched, so it can be read from or written again."""
+    gltf = glb["json"]
+    views = gltf.get("bufferViews", [])
+    keep = sorted(referenced_views({k: v for k, v in gltf.items() if k != "bufferViews"}, set()))
+    mapping = {old: new for new, old in enumerate(keep)}
+
+    # Lay out the kept views in the new BIN chunk
+    pieces = []
+    offset = 0
+    new_views = []
+    for old in keep:
+        data = buffer_view_bytes(glb, old)
+        view = dict(views[old], buffer=0, byteOffset=offset, byteLength=len(data))
+        new_views.append(view)
+        pieces.append((data, align4(len(data)) - len(data)))
+        offset = align4(offset + len(data))
+
+    gltf = copy.deepcopy({k: v for k, v in gltf.items() if k != "bufferViews"})
+    gltf["bufferViews"] = new_views
+    remap_views(gltf, mapping)
+    if new_views:
+        gltf["buffers"] = [{"byteLength": offset}]
+    else:
+        gltf.pop("bufferViews")
+        gltf.pop("buffers", None)
+
+    json_bytes = json.dumps(gltf, separators=(",", ":")).encode("utf-8")
+    json_bytes += b" " * (align4(len(json_bytes)) - len(json_bytes))
+    total = 12 + 8 + len(json_bytes) + (8 + offset if new_views else 0)
+
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(struct.pack("<4sII", GLB_MAGIC, 2, total))
+        f.write(struct.pack("<II", len(json_bytes), CHUNK_JSON))
+        f.write(json_bytes)
+        if new_views:
+            f.write(struct.pack("<II", offset, CHUNK_BIN))
+            for data, padding in pieces:
+                f.write(data)
+                f.write(b"\0" * padding)
+    os.replace(temp_path, path)
+    return total
+
+
+def check_roundtrip(path):
+    """Edit one handle, save it twice and compare. The first accessor is
+    rewritten with its own data so its old view is dropped and the later
+    views shift down. Both saves must be byte-identical, and the handle and
+    the written file must read back every accessor unchanged. Returns a list
+    of problems, empty when the round trip is clean."""
+    glb = read_glb(path)
+    count = len(glb["json"].get("accessors", []))
+    expected = [accessor_array(glb, index).copy() for index in range(count)]
+    if expected:
+        replace_accessor(glb, 0, expected[0])
+    problems = []
+    with tempfile.TemporaryDirectory() as tmp:
+        first, second = os.path.join(tmp, "first.glb"), os.path.join(tmp, "second.glb")
+        write_glb(glb, first)
+        try:
+            write_glb(glb, second)
+        except (ValueError, KeyError) as e:
+            return [f"second save failed: {e}"]
+        with open(first, "rb") as a, open(second, "rb") as b:
+            if a.read() != b.read():
+                problems.append("second save differs from the first")
+        written = read_glb(first)
+        for label, source in (("handle", glb), ("saved file", written)):
+            for index, array in enumerate(expected):
+                try:
+                    same = np.array_equal(accessor_array(source, index), array)
+                except ValueError:
+                    same = False
+                if not same:
+                    problems.append(f"accessor {index} changed in the {label}")
+                    break
+    return problems
+
+
+# ============================================================
+# IMAGES
+# ============================================================
+
+KTX2_MAGIC = b"\xabKTX 20\xbb\r\n\x1a\n"
+
+
+def image_size(data):
+    """(width, height) from the header of PNG, JPEG, WebP or KTX2 bytes; None if unknown"""
+    head = bytes(data[:32])
+    if head.startswith(b"\x89PNG"):
+        return struct.unpack(">II", head[16:24])
+    if head.startswith(KTX2_MAGIC):
+        return struct.unpack("<II", head[20:28])
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        kind = head[12:16]
+        if kind == b"VP8 ":
+            width, height = struct.unpack("<HH", head[26:30])
+            return width & 0x3FFF, height & 0x3FFF
+        if kind == b"VP8L":
+            bits = int.from_bytes(head[21:25], "little")
+            return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if kind == b"VP8X":
+            return int.from_bytes(head[24:27], "little") + 1, int.from_bytes(head[27:30], "little") + 1
+        return None
+    if head.startswith(b"\xff\xd8"):
+        # Walk JPEG segments to the first start-of-frame marker
+        view = memoryview(data)
+        offset = 2
+        while offset + 9 < len(view):
+            if view[offset] != 0xFF:
+                return None
+            marker = view[offset + 1]
+            length = (view[offset + 2] << 8) | view[offset + 3]
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack(">HH", bytes(view[offset + 5:offset + 9]))
+                return width, height
+            offset += 2 + length
+    return None
+
+
+def image_bytes(glb, index):
+    """Encoded bytes of an image: a bufferView slice, or the external file it points to"""
+    image = glb["json"]["images"][index]
+    if "bufferView" in image:
+        return buffer_view_bytes(glb, image["bufferView"])
+    uri = image.get("uri", "")
+    if uri.startswith("data:"):
+        return None
+    path = os.path.join(os.path.dirname(glb["path"] or "."), uri)
+    with open(path, "rb") as f:
+        return f.read()
+
+
+# ============================================================
+# BUDGETS
+# ============================================================
+
+BUDGETS_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "asset-budgets.json")
+
+
+def load_budgets(path=BUDGETS_CONFIG):
+    with open(path) as f:
+        return json.load(f)
+
+
+def budget_for(relative_path, config):
+    """Default budget overridden by the longest matching folder entry"""
+    budget = dict(config["default"])
+    folder = os.path.dirname(relative_path).replace(os.sep, "/")
+    matches = [key for key in config["folders"] if folder == key or folder.startswith(key + "/")]
+    for key in sorted(matches, key=len):
+        budget.update(config["folders"][key])
+    return budget
+
+
+# ============================================================
+# STATISTICS
+# ============================================================
+
+def primitive_vertices(gltf, primitive):
+    position = primitive["attributes"].get("POSITION")
+    return gltf["accessors"][position]["count"] if position is not None else 0
+
+
+def primitive_triangles(gltf, primitive):
+    """Triangle count from accessor counts alone (no buffer reads)"""
+    mode = primitive.get("mode", MODE_TRIANGLES)
+    if "indices" in primitive:
+        count = gltf["accessors"][primitive["indices"]]["count"]
+    else:
+        count = primitive_vertices(gltf, primitive)
+    if mode == MODE_TRIANGLES:
+        return count // 3
+    if mode in (MODE_TRIANGLE_STRIP, MODE_TRIANGLE_FAN):
+        return max(0, count - 2)
+    return 0
+
+
+def mesh_stats(gltf, mesh_index):
+    mesh = gltf["meshes"][mesh_index]
+    return {
+        "vertices": sum(primitive_vertices(gltf, p) for p in mesh["primitives"]),
+        "faces": sum(primitive_triangles(gltf, p) for p in mesh["primitives"]),
+    }
+
+
+def shape_key_names(mesh):
+    """Blender-style shape key names: Basis plus the glTF morph target names"""
+    targets = max((len(p.get("targets", [])) for p in mesh["primitives"]), default=0)
+    if not targets:
+        return []
+    names = mesh.get("extras", {}).get("targetNames") or [f"Key {i + 1}" for i in range(targets)]
+    return ["Basis"] + list(names)
+
+
+def morph_target_bytes(gltf):
+    """Bytes of vertex data held by morph targets across all meshes"""
+    total = 0
+    for mesh in gltf.get("meshes", []):
+        for primitive in mesh["primitives"]:
+            for target in primitive.get("targets", []):
+                for accessor_index in target.values():
+                    accessor = gltf["accessors"][accessor_index]
+                    itemsize = np.dtype(COMPONENT_DTYPES[accessor["componentType"]]).itemsize
+                    total += accessor["count"] * TYPE_COMPONENTS[accessor["type"]] * itemsize
+    return total
+
+
+def asset_stats(filepath):
+    """Budget-relevant numbers for one GLB: triangles, vertices, morph bytes, textures, size"""
+    glb = read_glb(filepath)
+    gltf = glb["json"]
+    triangles = vertices = 0
+    for node in gltf.get("nodes", []):
+        if "mesh" in node:
+            stats = mesh_stats(gltf, node["mesh"])
+            triangles += stats["faces"]
+            vertices += stats["vertices"]
+
+    textures = []
+    for index, image in enumerate(gltf.get("images", [])):
+        try:
+            data = image_bytes(glb, index)
+        except OSError:
+            data = None
+        size = image_size(data) if data is not None else None
+        textures.append({
+            "name": image.get("name") or image.get("uri") or f"image_{index}",
+            "width": size[0] if size else None,
+            "height": size[1] if size else None,
+            "bytes": len(data) if data is not None else None,
+        })
+
+    return {
+        "triangles": triangles,
+        "vertices": vertices,
+        "morph_bytes": morph_target_bytes(gltf),
+        "textures": textures,
+        "file_bytes": os.path.getsize(filepath),
+    }
+
+
+def inspect_glb(filepath):
+    """Same report as scripts/blender/inspect_mesh.py, read straight from the file"""
+    glb = read_glb(filepath)
+    gltf = glb["json"]
+    materials = gltf.get("materials", [])
+
+    report = {
+        "file": filepath,
+        "meshes": [],
+        "armatures": [],
+        "shape_keys": {},
+        "materials": [mat.get("name", f"Material_{i}") for i, mat in enumerate(materials)],
+        "total_vertices": 0,
+        "total_faces": 0,
+    }
+
+    # One entry per node instancing a mesh, as Blender creates one object each
+    for node_index, node in enumerate(gltf.get("nodes", [])):
+        if "mesh" not in node:
+            continue
+        mesh = gltf["meshes"][node["mesh"]]
+        name = node.get("name") or mesh.get("name") or f"Node_{node_index}"
+        stats = mesh_stats(gltf, node["mesh"])
+        material_names = []
+        for primitive in mesh["primitives"]:
+            if "material" in primitive:
+                material_name = report["materials"][primitive["material"]]
+                if material_name not in material_names:
+                    material_names.append(material_name)
+        report["meshes"].append({"name": name, **stats, "materials": material_names})
+        report["total_vertices"] += stats["vertices"]
+        report["total_faces"] += stats["faces"]
+
+        keys = shape_key_names(mesh)
+        if keys:
+            report["shape_keys"][name] = keys
+
+    for skin_index, skin in enumerate(gltf.get("skins", [])):
+        bones = [gltf["nodes"][joint].get("name", f"Bone_{joint}") for joint in skin["joints"]]
+        report["armatures"].append({
+            "name": skin.get("name") or f"Armature_{skin_index}",
+            "bones": bones,
+            "bone_count": len(bones),
+        })
+
+    return report
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+def print_report(report):
+    print("\n" + "=" * 60)
+    print("MESH INSPECTION REPORT")
+    print("=" * 60)
+    print(f"\nFile: {report['file']}")
+    print(f"Total Vertices: {report['total_vertices']}")
+    print(f"Total Faces: {report['total_faces']}")
+
+    print(f"\nMeshes ({len(report['meshes'])}):")
+    for mesh in report["meshes"]:
+        print(f"  - {mesh['name']}: {mesh['vertices']} verts, {mesh['faces']} faces")
+
+    print(f"\nArmatures ({len(report['armatures'])}):")
+    for arm in report["armatures"]:
+        print(f"  - {arm['name']}: {arm['bone_count']} bones")
+        for bone in arm["bones"][:10]:
+            print(f"      {bone}")
+        if len(arm["bones"]) > 10:
+            print(f"      ... and {len(arm['bones']) - 10} more")
+
+    print(f"\nShape Keys:")
+    if report["shape_keys"]:
+        for mesh_name, keys in report["shape_keys"].items():
+            print(f"  {mesh_name}:")
+            for key in keys:
+                print(f"    - {key}")
+    else:
+        print("  NO SHAPE KEYS FOUND - This mesh cannot be customized!")
+
+    print(f"\nMaterials ({len(report['materials'])}):")
+    for mat in report["materials"]:
+        print(f"  - {mat}")
+
+    print("\n" + "=" * 60)
+
+
+def expand_paths(paths):
+    """Files as given, directories walked for .glb files"""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in sorted(files):
+                    if name.lower().endswith(".glb"):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def main():
+    args = sys.argv[1:]
+    if len(args) == 3 and args[0] == "repack":
+        size_before = os.path.getsize(args[1])
+        size_after = write_glb(read_glb(args[1]), args[2])
+        print(f"{args[1]}: {size_before / 1024:.0f} KB -> {size_after / 1024:.0f} KB")
+        return
+
+    if len(args) >= 2 and args[0] == "check":
+        failed = 0
+        for path in expand_paths(args[1:]):
+            problems = check_roundtrip(path)
+            print(f"{path}: {'ok' if not problems else '; '.join(problems)}")
+            failed += bool(problems)
+        sys.exit(1 if failed else 0)
+
+    if len(args) < 2 or args[0] != "inspect":
+        print(__doc__)
+        sys.exit(1)
+
+    as_json = "--json" in args
+    paths = list(expand_paths(a for a in args[1:] if a != "--json"))
+
+    reports = []
+    failed = 0
+    for path in paths:
+        try:
+            reports.append(inspect_glb(path))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"ERROR: {e}" if str(path) in str(e) else f"ERROR: {path}: {e}", file=sys.stderr)
+            failed += 1
+
+    if as_json:
+        print(json.dumps(reports if len(paths) > 1 else reports[0] if reports else {}, indent=2))
+    elif len(reports) == 1:
+        print_report(reports[0])
+    elif reports:
+        print(f"{'File':<60} {'Meshes':>7} {'Verts':>9} {'Faces':>9} {'Bones':>6} {'Keys':>5}")
+        for report in reports:
+            bones = sum(arm["bone_count"] for arm in report["armatures"])
+            keys = max((len(k) for k in report["shape_keys"].values()), default=0)
+            print(f"{report['file'][-60:]:<60} {len(report['meshes']):>7} {report['total_vertices']:>9} "
+                  f"{report['total_faces']:>9} {bones:>6} {keys:>5}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,8 @@ Options:
   --max-tris <count>   Target max triangles (auto-calculates decimate ratio)
   --center             Center model at origin
   --ground             Place model base at Y=0
+  --textures <format>  Compress textures after export: webp or ktx2 (opt-in;
+                       the game has no KTX2Loader yet). Runs compress-glb-textures.py
 
 Examples:
   # Basic merge (no decimation)
@@ -31,6 +33,9 @@ import bpy
 import sys
 import os
 import math
+import subprocess
+
+COMPRESSOR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "compress-glb-textures.py")
 
 def get_args():
     """Parse arguments after '--' """
@@ -51,6 +56,7 @@ def get_args():
         'max_tris': None,
         'center': False,
         'ground': False,
+        'textures': None,
     }
 
     i = 2
@@ -67,6 +73,9 @@ def get_args():
         elif args[i] == '--ground':
             options['ground'] = True
             i += 1
+        elif args[i] == '--textures' and i + 1 < len(args):
+            options['textures'] = args[i + 1]
+            i += 2
         else:
             i += 1
 
@@ -262,6 +271,13 @@ def export_model(filepath, obj):
     print(f"✓ Exported: {filepath} ({size_kb:.1f} KB)")
 
 
+def compress_textures(filepath, texture_format):
+    """Resize and re-encode embedded textures with compress-glb-textures.py"""
+    result = subprocess.run([sys.executable, COMPRESSOR, filepath, "--format", texture_format])
+    if result.returncode != 0:
+        print("⚠ Texture compression failed, keeping uncompressed textures")
+
+
 def main():
     input_file, output_file, options = get_args()
 
@@ -308,6 +324,10 @@ def main():
     # Export
     export_model(output_file, merged)
 
+    # Compress textures if requested
+    if options.get('textures'):
+        compress_textures(output_file, options['textures'])
+
     # Final stats
     final_tris = count_triangles()
     reduction = ((initial_tris - final_tris) / initial_tris * 100) if initial_tris > 0 else 0